@@ -1,42 +1,60 @@
 """API routes."""
 import os
+import asyncio
 import secrets
-import traceback
+import logging
 import json
+import orjson
 from typing import Optional, Annotated, Dict
 from datetime import datetime
-from fastapi import APIRouter, HTTPException, Query, Depends, Response, status
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, Query, Depends, Request, Response, status
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from dotenv import load_dotenv
-from .schemas import ErrorResponse, GeometryOwnerRequest, GeometryOwnerResponse, ExcelReportRequest, PlaceSearchResponse, PointMatrikkelRequest, PointMatrikkelResponse, RouteSegmentsResponse, RouteSegment, RouteInfo, CompleteRouteResponse
-from services.route_service import search_places, get_complete_route
-from services.database import db_connection, get_route_schema, get_teig_schema, quote_identifier, ROUTE_SCHEMA
+from .schemas import ErrorResponse, GeometryOwnerRequest, GeometryOwnerResponse, ExcelReportRequest, PlaceSearchResponse, PlaceSearchResult, PointMatrikkelRequest, PointMatrikkelResponse, RouteSegmentsResponse, RouteSegment, RouteInfo, CompleteRouteResponse, Rutenummer
+from services.route_service import search_places, get_complete_route, get_route_metadata
+from services.route_geometry import get_corrected_route_geometry
+from services.database import db_connection, get_db_connection, get_route_schema, get_teig_schema, quote_identifier, ROUTE_SCHEMA
 from services.excel_report import generate_owners_excel_from_data
 from services.geometry_owner_service import get_owners_for_linestring, GeometryOwnerError
 from services.point_matrikkel_service import get_matrikkelenhet_for_point, PointMatrikkelError
 import psycopg
 from psycopg.rows import dict_row
 
+try:
+    import ormsgpack
+except ImportError:  # Optional: msgpack responses are only offered when installed
+    ormsgpack = None
+
 # Load environment variables from .env file (if present)
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 security = HTTPBasic()
 
+# Include tracebacks in error logs only when DEBUG is set (formatting them is expensive)
+DEBUG = os.getenv("DEBUG", "false").lower() == "true"
+
 # Shared authentication credentials from environment variables
 SHARED_USERNAME = os.getenv("SHARED_USERNAME", "dnt")
 SHARED_PASSWORD = os.getenv("SHARED_PASSWORD", "dnt")
 
 
-@router.get("/search/places", response_model=PlaceSearchResponse)
+# These routes build their models with model_construct from trusted SQL rows and
+# serialize them directly; response_model=None keeps FastAPI from validating and
+# encoding them again, while responses= keeps the schema in the OpenAPI docs
+@router.get("/search/places", response_model=None, responses={200: {"model": PlaceSearchResponse}})
 async def search_places_endpoint(
     q: str = Query(..., min_length=2, description="Søkestreng for stedsnavn, rutepunkt eller rute"),
     limit: int = Query(20, ge=1, le=200, description="Maks antall resultater")
 ):
     """Combined search across ruteinfopunkt, stedsnavn og ruter."""
     results = search_places(q, limit=limit)
-    return PlaceSearchResponse(results=results, total=len(results))
+    # Rows come from our own SQL queries, so skip per-item validation
+    items = [PlaceSearchResult.model_construct(**r) for r in results]
+    return ORJSONResponse(PlaceSearchResponse.model_construct(results=items, total=len(items)).model_dump())
 
 
 def require_shared_login(credentials: HTTPBasicCredentials = Depends(security)):
@@ -133,8 +151,7 @@ async def download_owners_excel(
             detail=str(e)
         )
     except Exception as e:
-        print(f"Error generating Excel report: {str(e)}")
-        print(traceback.format_exc())
+        logger.error("Error generating Excel report: %s", e, exc_info=DEBUG)
         raise HTTPException(
             status_code=500,
             detail=f"Error generating Excel report: {str(e)}"
@@ -169,7 +186,8 @@ async def get_geometry_owners(request: GeometryOwnerRequest):
     - matrikkelenhet_vector: List of property intersections with owner information
     """
     try:
-        result = get_owners_for_linestring(request.geometry)
+        # Owner lookups call the Matrikkel API; keep them off the event loop
+        result = await asyncio.to_thread(get_owners_for_linestring, request.geometry)
         return GeometryOwnerResponse(**result)
     except HTTPException:
         # Re-raise HTTPException - don't catch these
@@ -180,8 +198,7 @@ async def get_geometry_owners(request: GeometryOwnerRequest):
             detail=str(e)
         )
     except Exception as e:
-        print(f"Error getting owners for geometry: {str(e)}")
-        print(traceback.format_exc())
+        logger.error("Error getting owners for geometry: %s", e, exc_info=DEBUG)
         raise HTTPException(
             status_code=500,
             detail=f"Error processing geometry: {str(e)}"
@@ -237,8 +254,7 @@ async def get_point_matrikkelenhet(
             detail=str(e)
         )
     except Exception as e:
-        print(f"Error getting matrikkelenhet for point: {str(e)}")
-        print(traceback.format_exc())
+        logger.error("Error getting matrikkelenhet for point: %s", e, exc_info=DEBUG)
         raise HTTPException(
             status_code=500,
             detail=f"Error processing point: {str(e)}"
@@ -306,6 +322,40 @@ def parse_geometry(geom_data) -> dict:
         return geom_data
 
 
+MSGPACK_MEDIA_TYPE = "application/x-msgpack"
+
+
+def wants_msgpack(request: Request) -> bool:
+    """Return True if the client accepts msgpack and the server can produce it."""
+    return ormsgpack is not None and MSGPACK_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def create_msgpack_response(model) -> Response:
+    """Create a msgpack-encoded Response from a Pydantic model."""
+    return Response(
+        content=ormsgpack.packb(model.model_dump()),
+        media_type=MSGPACK_MEDIA_TYPE
+    )
+
+
+def geometry_fragment(geom_data):
+    """
+    Wrap a GeoJSON geometry string from PostGIS for embedding in an orjson response.
+
+    The string is spliced into the output as-is, so coordinate arrays are never
+    parsed into Python lists and serialized again.
+
+    Args:
+        geom_data: Geometry data from database (string or dict)
+
+    Returns:
+        orjson.Fragment for strings, otherwise the parsed geometry (or None)
+    """
+    if isinstance(geom_data, str):
+        return orjson.Fragment(geom_data)
+    return parse_geometry(geom_data)
+
+
 def build_routes_info_from_arrays(rutenummer_list, rutenavn_list, rutetype_list, vedlikeholdsansvarlig_list):
     """
     Build route info objects from parallel arrays, deduplicating by rutenummer.
@@ -341,8 +391,8 @@ def create_empty_feature_collection() -> dict:
 
 
 def create_feature_collection_response(features: list) -> JSONResponse:
-    """Create a GeoJSON FeatureCollection JSONResponse."""
-    return JSONResponse(
+    """Create a GeoJSON FeatureCollection JSONResponse (serialized with orjson)."""
+    return ORJSONResponse(
         content={"type": "FeatureCollection", "features": features},
         media_type="application/geo+json"
     )
@@ -430,7 +480,8 @@ async def get_links(
                 if col in existing_columns:
                     select_parts.append(f"l.{col}")
 
-            select_parts.append("ST_AsGeoJSON(ST_Transform(l.geom, 4326))::json as geometry")
+            # Keep geometry as GeoJSON text; it is embedded in the response without parsing
+            select_parts.append("ST_AsGeoJSON(ST_Transform(l.geom, 4326)) as geometry")
 
             query = f"""
                 SELECT
@@ -450,8 +501,8 @@ async def get_links(
     # Build GeoJSON FeatureCollection
     features = []
     for row in rows:
-        # Parse geometry (handles both string and dict from PostGIS)
-        geometry = parse_geometry(row["geometry"])
+        # Embed geometry text from PostGIS directly (handles dict fallback too)
+        geometry = geometry_fragment(row["geometry"])
 
         # Build route information from arrays (parallel arrays from database)
         # Arrays might be None if link has no routes or columns don't exist
@@ -533,7 +584,7 @@ async def get_anchor_nodes(
                         navn,
                         navn_kilde,
                         navn_distance_m,
-                        ST_AsGeoJSON(ST_Transform(geom, 4326))::json as geometry
+                        ST_AsGeoJSON(ST_Transform(geom, 4326)) as geometry
                     FROM {full_anchor_nodes_name}
                 """
 
@@ -564,7 +615,7 @@ async def get_anchor_nodes(
         # Build GeoJSON FeatureCollection
         features = []
         for row in rows:
-            geometry = parse_geometry(row.get("geometry"))
+            geometry = geometry_fragment(row.get("geometry"))
             if not geometry:
                 continue  # Skip nodes without geometry
 
@@ -588,14 +639,15 @@ async def get_anchor_nodes(
         return create_feature_collection_response([])
 
 
-@router.get("/routes/segments", response_model=RouteSegmentsResponse)
+@router.get("/routes/segments", response_model=None, responses={200: {"model": RouteSegmentsResponse}})
 async def get_route_segments(
+    request: Request,
     rutenummer_prefix: Annotated[Optional[str], Query(description="Filter by route number prefix (e.g., 'bre')")] = None,
     vedlikeholdsansvarlig: Annotated[Optional[str], Query(description="Filter by organization (pattern match, e.g., 'DNT Oslo' or 'DNT')")] = None,
     limit: Annotated[int, Query(ge=1, le=1000, description="Maximum number of results")] = 100,
     offset: Annotated[int, Query(ge=0, description="Offset for pagination")] = 0,
     include_geometry: Annotated[bool, Query(description="Include GeoJSON geometry in response")] = False
-) -> RouteSegmentsResponse:
+) -> Response:
     """
     Get route segments filtered by rutenummer prefix and/or vedlikeholdsansvarlig.
 
@@ -690,8 +742,8 @@ async def get_route_segments(
                     if include_geometry and row.get("geometry"):
                         segments_dict[objid]["geometry"] = parse_geometry(row["geometry"])
 
-                # Add route information to the segment
-                route_info = RouteInfo(
+                # Add route information to the segment (trusted SQL row, skip validation)
+                route_info = RouteInfo.model_construct(
                     rutenummer=row["rutenummer"],
                     rutenavn=row.get("rutenavn"),
                     vedlikeholdsansvarlig=row.get("vedlikeholdsansvarlig")
@@ -703,38 +755,42 @@ async def get_route_segments(
                     segments_dict[objid]["routes"].append(route_info)
 
             # Convert to list of RouteSegment objects
-            segments = []
-            for objid, segment_data in segments_dict.items():
-                segment = RouteSegment(
-                    objid=segment_data["objid"],
-                    routes=segment_data["routes"],
-                    length_meters=segment_data["length_meters"],
-                    geometry=segment_data["geometry"]
-                )
-                segments.append(segment)
+            segments = [
+                RouteSegment.model_construct(**segment_data)
+                for segment_data in segments_dict.values()
+            ]
 
-            return RouteSegmentsResponse(
+            response = RouteSegmentsResponse.model_construct(
                 segments=segments,
                 total=total_count,
                 limit=limit,
                 offset=offset
             )
+            if wants_msgpack(request):
+                return create_msgpack_response(response)
+            return ORJSONResponse(response.model_dump())
 
     except HTTPException:
         # Re-raise HTTPException - don't catch these
         raise
     except Exception as e:
-        print(f"Error querying route segments: {str(e)}")
-        print(traceback.format_exc())
+        logger.error("Error querying route segments: %s", e, exc_info=DEBUG)
         raise HTTPException(
             status_code=500,
             detail=f"Error querying route segments: {str(e)}"
         )
 
 
+def _load_route_metadata(rutenummer: str):
+    """Load route metadata on a dedicated connection (run in threadpool)."""
+    with db_connection() as conn:
+        return get_route_metadata(conn, rutenummer)
+
+
 @router.get("/routes/{rutenummer}/complete", response_model=CompleteRouteResponse, responses={404: {"model": ErrorResponse}, 500: {"model": ErrorResponse}})
 async def get_complete_route_endpoint(
-    rutenummer: str,
+    request: Request,
+    rutenummer: Rutenummer,
     include_geometry: Annotated[bool, Query(description="Include GeoJSON geometry in response")] = True,
     include_segments: Annotated[bool, Query(description="Include individual segment details")] = False,
     include_endpoint_names: Annotated[bool, Query(description="Lookup and include from/to place names")] = True
@@ -759,29 +815,56 @@ async def get_complete_route_endpoint(
     - 404 if rutenummer not found
     """
     try:
-        with db_connection() as conn:
-            route_data = get_complete_route(
-                conn,
-                rutenummer,
-                include_geometry=include_geometry,
-                include_segments=include_segments,
-                include_endpoint_names=include_endpoint_names
+        # Route metadata and the (heavy) geometry reconstruction are independent reads,
+        # so run them concurrently in the threadpool on separate connections. The
+        # geometry connection is opened off the event loop and reused for the rest.
+        conn = await asyncio.to_thread(get_db_connection)
+        try:
+            results = await asyncio.gather(
+                asyncio.to_thread(_load_route_metadata, rutenummer),
+                asyncio.to_thread(get_corrected_route_geometry, conn, rutenummer),
+                return_exceptions=True,  # Wait for both, so conn is idle before it is closed
             )
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+            route_metadata, corrected_geometry = results
 
-            if route_data is None:
+            if route_metadata is None:
                 raise HTTPException(
                     status_code=404,
                     detail=f"Route with rutenummer '{rutenummer}' not found"
                 )
 
-            return CompleteRouteResponse(**route_data)
+            route_data = await asyncio.to_thread(
+                get_complete_route,
+                conn,
+                rutenummer,
+                include_geometry=include_geometry,
+                include_segments=include_segments,
+                include_endpoint_names=include_endpoint_names,
+                route_metadata=route_metadata,
+                route_data=corrected_geometry
+            )
+        finally:
+            conn.close()
+
+        if route_data is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Route with rutenummer '{rutenummer}' not found"
+            )
+
+        response = CompleteRouteResponse(**route_data)
+        if wants_msgpack(request):
+            return create_msgpack_response(response)
+        return response
 
     except HTTPException:
         # Re-raise HTTPException (404, etc.) - don't catch these
         raise
     except Exception as e:
-        print(f"Error getting complete route: {str(e)}")
-        print(traceback.format_exc())
+        logger.error("Error getting complete route '%s': %s", rutenummer, e, exc_info=DEBUG)
         raise HTTPException(
             status_code=500,
             detail=f"Error processing complete route: {str(e)}"
@@ -1,6 +1,11 @@
 """Pydantic schemas for API request/response."""
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, StringConstraints
+from typing import Annotated, List, Optional, Dict, Any
+
+
+# Route number path parameter (e.g. "bre10", "bre-1"). Constraints are compiled once
+# at import time, and malformed values are rejected before any database access.
+Rutenummer = Annotated[str, StringConstraints(min_length=1, max_length=64, pattern=r'^[\w-]+$')]
 
 
 class MatrikkelenhetItem(BaseModel):
@@ -1,8 +1,47 @@
 """API client for route segments endpoint."""
+import asyncio
+import atexit
+import copy
+import os
+import time
 import requests
-from typing import Optional, Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+from urllib3.util.retry import Retry
+from typing import Optional, Dict, Any, Iterator, List, Union
 from .config import CLIConfig
 
+try:
+    import ormsgpack
+except ImportError:  # Optional: fall back to JSON responses
+    ormsgpack = None
+
+try:
+    import orjson
+except ImportError:  # Optional: fall back to response.json()
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # Optional: get_segments_stream falls back to get_segments
+    ijson = None
+
+MSGPACK_MEDIA_TYPE = "application/x-msgpack"
+
+# Ask for msgpack (cheaper to decode) when available; the API falls back to JSON
+ACCEPT_HEADER = f"{MSGPACK_MEDIA_TYPE}, application/json;q=0.9" if ormsgpack else "application/json"
+
+# Complete-route responses are cached in-process; set STIFLYT_NO_CACHE=1 to disable
+ROUTE_CACHE_TTL = 300  # seconds
+ROUTE_CACHE_MAXSIZE = 256
+
+# Connections kept per host by build_session (bounds useful request concurrency)
+POOL_MAXSIZE = 20
+
+# Fail fast on an unreachable host; config.timeout still bounds each read
+CONNECT_TIMEOUT = 3.05  # seconds
+
 
 class APIError(Exception):
     """Base exception for API errors."""
@@ -27,19 +66,171 @@ class APIResponseError(APIError):
         self.response = response
 
 
+def _safe_detail(response: Any, default: str) -> str:
+    """
+    Extract the error detail from an error response without assuming a JSON body.
+
+    Proxies and load balancers often return HTML error pages, so the body is
+    only parsed when the server says it is JSON.
+
+    Args:
+        response: requests or httpx response object
+        default: Detail to use when the body has none
+
+    Returns:
+        Error detail string
+    """
+    if response.headers.get("content-type", "").startswith("application/json"):
+        try:
+            return response.json().get("detail", default)
+        except (ValueError, AttributeError):
+            pass
+    return response.text[:200] or default
+
+
+def _parse_json(response: Any) -> Dict[str, Any]:
+    """
+    Parse a successful JSON (or msgpack, if negotiated) response.
+
+    Raises:
+        APIResponseError: If the body is empty or cannot be decoded
+    """
+    if response.headers.get("content-length") == "0":
+        raise APIResponseError("Invalid JSON response: empty body", status_code=response.status_code)
+    if ormsgpack is not None and response.headers.get("content-type", "").startswith(MSGPACK_MEDIA_TYPE):
+        try:
+            return ormsgpack.unpackb(response.content)
+        except ormsgpack.MsgpackDecodeError as e:
+            raise APIResponseError(f"Invalid msgpack response: {e}")
+    try:
+        return orjson.loads(response.content) if orjson is not None else response.json()
+    except ValueError as e:  # orjson.JSONDecodeError is a ValueError
+        raise APIResponseError(f"Invalid JSON response: {e}")
+
+
+# Status code -> exception factory(response, not_found_detail)
+_ERROR_FACTORIES = {
+    401: lambda response, not_found_detail: AuthenticationError("Authentication failed. Check your credentials."),
+    400: lambda response, not_found_detail: APIResponseError(
+        f"Bad request: {_safe_detail(response, 'Bad request')}", status_code=400
+    ),
+    404: lambda response, not_found_detail: APIResponseError(
+        "Endpoint not found. Check API URL." if not_found_detail is None
+        else _safe_detail(response, not_found_detail),
+        status_code=404
+    ),
+}
+
+
+def _raise_for_status(response: Any, not_found_detail: Optional[str] = None):
+    """
+    Raise the matching APIError for an unsuccessful response.
+
+    Args:
+        response: requests or httpx response object
+        not_found_detail: Fallback detail for 404 responses; if None, a 404 is
+            reported as an unknown endpoint
+
+    Raises:
+        AuthenticationError: If authentication fails
+        APIResponseError: If API returns an error
+    """
+    status_code = response.status_code
+    if status_code < 400:
+        return
+    factory = _ERROR_FACTORIES.get(status_code)
+    if factory is not None:
+        raise factory(response, not_found_detail)
+    if status_code >= 500:
+        error_detail = _safe_detail(response, "Server error")
+        raise APIResponseError(f"Server error: {error_detail}", status_code=status_code)
+    raise APIResponseError(f"API returned status {status_code}", status_code=status_code)
+
+
+def build_session(config: CLIConfig) -> requests.Session:
+    """
+    Create a requests.Session with pooled, retrying connections and auth bound once.
+
+    Args:
+        config: CLIConfig instance with API settings
+
+    Returns:
+        Configured requests.Session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=POOL_MAXSIZE,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.2,
+            status_forcelist=(502, 503, 504),
+            raise_on_status=False,  # Return the last response so 5xx errors are reported normally
+        ),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.auth = config.auth
+    session.headers.update({
+        "Accept": ACCEPT_HEADER,
+        # gzip/deflate, plus br when a brotli decoder is installed
+        "Accept-Encoding": make_headers(accept_encoding=True)["accept-encoding"],
+        "Connection": "keep-alive",
+    })
+    return session
+
+
 class RouteSegmentsClient:
     """Client for querying route segments from the API."""
 
-    def __init__(self, config: CLIConfig):
+    def __init__(self, config: CLIConfig, session: Optional[requests.Session] = None):
         """
         Initialize API client.
 
         Args:
             config: CLIConfig instance with API settings
+            session: Optional pre-built session to share; by default a new one is created
         """
         self.config = config
         self.base_url = config.api_url.rstrip('/')
 
+        # Persistent session so consecutive calls reuse pooled keep-alive connections
+        self.session = session if session is not None else build_session(config)
+        self.timeout = (CONNECT_TIMEOUT, config.timeout)  # (connect, read)
+
+        # Complete-route cache: key -> (fetched_at, data)
+        self._route_cache: Dict[tuple, tuple] = {}
+        self.cache_enabled = os.getenv("STIFLYT_NO_CACHE", "") != "1"
+
+    def refresh_auth(self, username: Optional[str] = None, password: Optional[str] = None):
+        """
+        Rebind credentials on the session, e.g. after a credential rotation.
+
+        Args:
+            username: New HTTP Basic Auth username (defaults to the current config)
+            password: New HTTP Basic Auth password (defaults to the current config)
+        """
+        old_key = _client_key(self.config)
+        self.config.set_credentials(username, password)
+        self.session.auth = self.config.auth
+
+        # A shared client is keyed by its credentials; move it to the new key
+        if _default_clients.get(old_key) is self:
+            del _default_clients[old_key]
+            _default_clients.setdefault(_client_key(self.config), self)
+
+    def close(self):
+        """Close the underlying HTTP session."""
+        self.session.close()
+
+    def __enter__(self):
+        """Context manager entry."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit - cleanup."""
+        self.close()
+
     def get_segments(
         self,
         rutenummer_prefix: Optional[str] = None,
@@ -85,43 +276,16 @@ class RouteSegmentsClient:
         # Build full URL
         url = f"{self.base_url}/routes/segments"
 
-        # Prepare request
-        auth = self.config.get_auth()
-        headers = {
-            "Accept": "application/json"
-        }
-
         try:
-            response = requests.get(
+            response = self.session.get(
                 url,
                 params=params,
-                auth=auth,
-                headers=headers,
-                timeout=self.config.timeout
+                timeout=self.timeout
             )
-
-            # Handle HTTP errors
-            if response.status_code == 401:
-                raise AuthenticationError("Authentication failed. Check your credentials.")
-            elif response.status_code == 400:
-                error_detail = response.json().get("detail", "Bad request")
-                raise APIResponseError(f"Bad request: {error_detail}", status_code=400)
-            elif response.status_code == 404:
-                raise APIResponseError("Endpoint not found. Check API URL.", status_code=404)
-            elif response.status_code >= 500:
-                error_detail = response.json().get("detail", "Server error")
-                raise APIResponseError(f"Server error: {error_detail}", status_code=response.status_code)
-            elif not response.ok:
-                raise APIResponseError(
-                    f"API returned status {response.status_code}",
-                    status_code=response.status_code
-                )
+            _raise_for_status(response)
 
             # Parse JSON response
-            try:
-                return response.json()
-            except ValueError as e:
-                raise APIResponseError(f"Invalid JSON response: {e}")
+            return _parse_json(response)
 
         except requests.exceptions.ConnectionError as e:
             raise ConnectionError(f"Could not connect to API at {self.base_url}: {e}")
@@ -130,6 +294,131 @@ class RouteSegmentsClient:
         except requests.exceptions.RequestException as e:
             raise ConnectionError(f"Request failed: {e}")
 
+    def get_segments_stream(
+        self,
+        rutenummer_prefix: Optional[str] = None,
+        vedlikeholdsansvarlig: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0,
+        include_geometry: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Query route segments, yielding them one at a time as the response is parsed.
+
+        Uses ijson to parse the body incrementally, so large responses (especially with
+        geometry) are never held in memory as a whole. Without ijson installed this
+        falls back to get_segments.
+
+        Args:
+            rutenummer_prefix: Filter by route number prefix (e.g., "bre")
+            vedlikeholdsansvarlig: Filter by organization (e.g., "DNT Oslo")
+            limit: Maximum number of results (default: 100, max: 1000)
+            offset: Pagination offset (default: 0)
+            include_geometry: Include GeoJSON geometry in response (default: False)
+
+        Yields:
+            Segment dictionaries
+
+        Raises:
+            ConnectionError: If connection to API fails
+            AuthenticationError: If authentication fails
+            APIResponseError: If API returns an error
+        """
+        if ijson is None:
+            yield from self.get_segments(
+                rutenummer_prefix=rutenummer_prefix,
+                vedlikeholdsansvarlig=vedlikeholdsansvarlig,
+                limit=limit,
+                offset=offset,
+                include_geometry=include_geometry
+            ).get("segments", [])
+            return
+
+        if not rutenummer_prefix and not vedlikeholdsansvarlig:
+            raise ValueError("At least one filter must be provided: rutenummer_prefix or vedlikeholdsansvarlig")
+
+        params = {
+            "limit": min(limit, 1000),
+            "offset": max(offset, 0),
+            "include_geometry": include_geometry
+        }
+        if rutenummer_prefix:
+            params["rutenummer_prefix"] = rutenummer_prefix
+        if vedlikeholdsansvarlig:
+            params["vedlikeholdsansvarlig"] = vedlikeholdsansvarlig
+
+        url = f"{self.base_url}/routes/segments"
+
+        try:
+            # Streaming parse needs JSON, so don't negotiate msgpack here
+            with self.session.get(
+                url,
+                params=params,
+                headers={"Accept": "application/json"},
+                timeout=self.timeout,
+                stream=True
+            ) as response:
+                _raise_for_status(response)
+                response.raw.decode_content = True  # Undo gzip transparently
+                # use_float avoids Decimal objects for coordinates and lengths
+                yield from ijson.items(response.raw, "segments.item", use_float=True)
+
+        except ijson.JSONError as e:
+            raise APIResponseError(f"Invalid JSON response: {e}")
+        except requests.exceptions.ConnectionError as e:
+            raise ConnectionError(f"Could not connect to API at {self.base_url}: {e}")
+        except requests.exceptions.Timeout as e:
+            raise ConnectionError(f"Request to API timed out: {e}")
+        except requests.exceptions.RequestException as e:
+            raise ConnectionError(f"Request failed: {e}")
+
+    def iter_all_segments(
+        self,
+        rutenummer_prefix: Optional[str] = None,
+        vedlikeholdsansvarlig: Optional[str] = None,
+        include_geometry: bool = False,
+        page_size: int = 1000,
+        workers: int = 8
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over all matching segments, fetching pages concurrently.
+
+        The first page is fetched to learn the total; remaining pages are
+        requested in parallel over the shared session and yielded in offset order.
+
+        Args:
+            rutenummer_prefix: Filter by route number prefix (e.g., "bre")
+            vedlikeholdsansvarlig: Filter by organization (e.g., "DNT Oslo")
+            include_geometry: Include GeoJSON geometry in response (default: False)
+            page_size: Segments per request (default: 1000, max: 1000)
+            workers: Maximum number of concurrent page requests (default: 8)
+
+        Yields:
+            Segment dictionaries
+
+        Raises:
+            Same as get_segments
+        """
+        def fetch_page(offset: int) -> Dict[str, Any]:
+            return self.get_segments(
+                rutenummer_prefix=rutenummer_prefix,
+                vedlikeholdsansvarlig=vedlikeholdsansvarlig,
+                limit=page_size,
+                offset=offset,
+                include_geometry=include_geometry
+            )
+
+        first_page = fetch_page(0)
+        yield from first_page.get("segments", [])
+
+        offsets = range(page_size, first_page.get("total", 0), page_size)
+        if not offsets:
+            return
+
+        with ThreadPoolExecutor(max_workers=min(workers, len(offsets))) as executor:
+            for page in executor.map(fetch_page, offsets):
+                yield from page.get("segments", [])
+
     def get_complete_route(
         self,
         rutenummer: str,
@@ -140,6 +429,9 @@ class RouteSegmentsClient:
         """
         Get a complete route by combining all segments with the same rutenummer.
 
+        Responses are cached in-process for ROUTE_CACHE_TTL seconds (disable with
+        STIFLYT_NO_CACHE=1). Each call returns its own copy, so callers may modify it.
+
         Args:
             rutenummer: Route number (e.g., "bre10")
             include_geometry: Include GeoJSON geometry in response (default: True)
@@ -154,6 +446,11 @@ class RouteSegmentsClient:
             AuthenticationError: If authentication fails
             APIResponseError: If API returns an error (including 404 if route not found)
         """
+        cache_key = (rutenummer, include_geometry, include_segments, include_endpoint_names)
+        cached = self._route_cache.get(cache_key) if self.cache_enabled else None
+        if cached is not None and time.monotonic() - cached[0] < ROUTE_CACHE_TTL:
+            return copy.deepcopy(cached[1])
+
         # Build query parameters
         params = {
             "include_geometry": include_geometry,
@@ -164,44 +461,17 @@ class RouteSegmentsClient:
         # Build full URL
         url = f"{self.base_url}/routes/{rutenummer}/complete"
 
-        # Prepare request
-        auth = self.config.get_auth()
-        headers = {
-            "Accept": "application/json"
-        }
-
         try:
-            response = requests.get(
+            response = self.session.get(
                 url,
                 params=params,
-                auth=auth,
-                headers=headers,
-                timeout=self.config.timeout
+                timeout=self.timeout
             )
 
-            # Handle HTTP errors
-            if response.status_code == 401:
-                raise AuthenticationError("Authentication failed. Check your credentials.")
-            elif response.status_code == 404:
-                error_detail = response.json().get("detail", f"Route '{rutenummer}' not found")
-                raise APIResponseError(error_detail, status_code=404)
-            elif response.status_code == 400:
-                error_detail = response.json().get("detail", "Bad request")
-                raise APIResponseError(f"Bad request: {error_detail}", status_code=400)
-            elif response.status_code >= 500:
-                error_detail = response.json().get("detail", "Server error")
-                raise APIResponseError(f"Server error: {error_detail}", status_code=response.status_code)
-            elif not response.ok:
-                raise APIResponseError(
-                    f"API returned status {response.status_code}",
-                    status_code=response.status_code
-                )
+            _raise_for_status(response, not_found_detail=f"Route '{rutenummer}' not found")
 
             # Parse JSON response
-            try:
-                return response.json()
-            except ValueError as e:
-                raise APIResponseError(f"Invalid JSON response: {e}")
+            data = _parse_json(response)
 
         except requests.exceptions.ConnectionError as e:
             raise ConnectionError(f"Could not connect to API at {self.base_url}: {e}")
@@ -210,3 +480,246 @@ class RouteSegmentsClient:
         except requests.exceptions.RequestException as e:
             raise ConnectionError(f"Request failed: {e}")
 
+        if self.cache_enabled:
+            if len(self._route_cache) >= ROUTE_CACHE_MAXSIZE and cache_key not in self._route_cache:
+                # Evict the oldest entry
+                oldest = min(self._route_cache, key=lambda k: self._route_cache[k][0])
+                del self._route_cache[oldest]
+            self._route_cache[cache_key] = (time.monotonic(), copy.deepcopy(data))
+        return data
+
+
+# Clients shared across the process, keyed by connection settings
+_default_clients: Dict[tuple, RouteSegmentsClient] = {}
+
+
+def _client_key(config: CLIConfig) -> tuple:
+    """Key for _default_clients: the settings a shared client is bound to."""
+    return (config.api_url, config.username, config.password, config.timeout)
+
+
+def get_default_client(config: CLIConfig) -> RouteSegmentsClient:
+    """
+    Get a process-wide RouteSegmentsClient for the given configuration.
+
+    Repeated calls with the same API URL, credentials and timeout share one
+    client (and its connection pool). Shared clients are closed at exit.
+
+    Args:
+        config: CLIConfig instance with API settings
+
+    Returns:
+        Shared RouteSegmentsClient
+    """
+    key = _client_key(config)
+    client = _default_clients.get(key)
+    if client is None:
+        client = RouteSegmentsClient(config)
+        _default_clients[key] = client
+    return client
+
+
+def _close_default_clients():
+    """Close all shared clients (registered with atexit)."""
+    for client in _default_clients.values():
+        client.close()
+    _default_clients.clear()
+
+
+atexit.register(_close_default_clients)
+
+
+class AsyncRouteSegmentsClient:
+    """Async client for querying route segments from the API.
+
+    Uses a shared httpx.AsyncClient so concurrent requests reuse pooled
+    keep-alive connections. Requires the optional ``httpx`` dependency
+    (``pip install -e ".[async]"``).
+    """
+
+    def __init__(self, config: CLIConfig, max_connections: int = 20):
+        """
+        Initialize async API client.
+
+        Args:
+            config: CLIConfig instance with API settings
+            max_connections: Maximum number of pooled keep-alive connections
+        """
+        try:
+            import httpx
+        except ImportError as e:
+            raise ImportError(
+                "AsyncRouteSegmentsClient requires httpx. Install with: pip install -e \".[async]\""
+            ) from e
+
+        self._httpx = httpx
+        self.config = config
+        self.base_url = config.api_url.rstrip('/')
+        try:
+            import h2  # noqa: F401
+            http2 = True
+        except ImportError:
+            http2 = False
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            auth=config.auth,
+            headers={"Accept": ACCEPT_HEADER},
+            timeout=httpx.Timeout(config.timeout, connect=CONNECT_TIMEOUT),
+            http2=http2,
+            limits=httpx.Limits(max_keepalive_connections=max_connections),
+        )
+
+    async def _get(self, path: str, params: Dict[str, Any], not_found_detail: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Perform a GET request and translate errors to APIError subclasses.
+
+        Args:
+            path: Path relative to the API base URL
+            params: Query parameters
+            not_found_detail: Fallback detail for 404 responses; if None, a 404 is
+                reported as an unknown endpoint
+
+        Returns:
+            Parsed JSON response
+        """
+        httpx = self._httpx
+        # httpx serializes booleans as "true"/"false", same as requests
+        try:
+            response = await self._client.get(path, params=params)
+        except httpx.ConnectError as e:
+            raise ConnectionError(f"Could not connect to API at {self.base_url}: {e}")
+        except httpx.TimeoutException as e:
+            raise ConnectionError(f"Request to API timed out: {e}")
+        except httpx.HTTPError as e:
+            raise ConnectionError(f"Request failed: {e}")
+
+        _raise_for_status(response, not_found_detail)
+
+        # Parse JSON response
+        return _parse_json(response)
+
+    async def get_segments(
+        self,
+        rutenummer_prefix: Optional[str] = None,
+        vedlikeholdsansvarlig: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0,
+        include_geometry: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Query route segments from the API.
+
+        See RouteSegmentsClient.get_segments for arguments and errors.
+        """
+        if not rutenummer_prefix and not vedlikeholdsansvarlig:
+            raise ValueError("At least one filter must be provided: rutenummer_prefix or vedlikeholdsansvarlig")
+
+        params = {
+            "limit": min(limit, 1000),
+            "offset": max(offset, 0),
+            "include_geometry": include_geometry
+        }
+        if rutenummer_prefix:
+            params["rutenummer_prefix"] = rutenummer_prefix
+        if vedlikeholdsansvarlig:
+            params["vedlikeholdsansvarlig"] = vedlikeholdsansvarlig
+
+        return await self._get("/routes/segments", params)
+
+    async def get_complete_route(
+        self,
+        rutenummer: str,
+        include_geometry: bool = True,
+        include_segments: bool = False,
+        include_endpoint_names: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Get a complete route by combining all segments with the same rutenummer.
+
+        See RouteSegmentsClient.get_complete_route for arguments and errors.
+        """
+        params = {
+            "include_geometry": include_geometry,
+            "include_segments": include_segments,
+            "include_endpoint_names": include_endpoint_names
+        }
+        return await self._get(
+            f"/routes/{rutenummer}/complete",
+            params,
+            not_found_detail=f"Route '{rutenummer}' not found"
+        )
+
+    async def get_complete_routes(
+        self,
+        rutenummer_list: List[str],
+        max_concurrency: int = 32,
+        **kwargs
+    ) -> List[Union[Dict[str, Any], APIError]]:
+        """
+        Get complete routes for several rutenummer concurrently.
+
+        Args:
+            rutenummer_list: List of route numbers
+            max_concurrency: Maximum number of requests in flight
+            **kwargs: Extra arguments passed to get_complete_route
+
+        Returns:
+            List in the same order as rutenummer_list, where each entry is either the
+            route dictionary or the APIError raised for that route
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def get_one(rutenummer: str) -> Union[Dict[str, Any], APIError]:
+            async with semaphore:
+                try:
+                    return await self.get_complete_route(rutenummer, **kwargs)
+                except APIError as e:
+                    return e
+
+        return await asyncio.gather(*(get_one(rutenummer) for rutenummer in rutenummer_list))
+
+    async def get_segments_for_prefixes(self, prefixes: List[str], **kwargs) -> List[Dict[str, Any]]:
+        """
+        Query segments for several rutenummer prefixes concurrently.
+
+        Args:
+            prefixes: List of route number prefixes
+            **kwargs: Extra arguments passed to get_segments
+
+        Returns:
+            List of responses in the same order as prefixes
+        """
+        return await asyncio.gather(
+            *(self.get_segments(rutenummer_prefix=prefix, **kwargs) for prefix in prefixes)
+        )
+
+    async def aclose(self):
+        """Close pooled connections."""
+        await self._client.aclose()
+
+    async def __aenter__(self):
+        """Async context manager entry."""
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit - cleanup."""
+        await self.aclose()
+
+
+def get_complete_routes(config: CLIConfig, rutenummer_list: List[str], **kwargs) -> List[Union[Dict[str, Any], APIError]]:
+    """
+    Synchronous wrapper around AsyncRouteSegmentsClient.get_complete_routes.
+
+    Args:
+        config: CLIConfig instance with API settings
+        rutenummer_list: List of route numbers
+        **kwargs: Extra arguments passed to AsyncRouteSegmentsClient.get_complete_routes
+
+    Returns:
+        List of route dictionaries or APIError instances, in input order
+    """
+    async def run():
+        async with AsyncRouteSegmentsClient(config) as client:
+            return await client.get_complete_routes(rutenummer_list, **kwargs)
+
+    return asyncio.run(run())
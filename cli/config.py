@@ -1,5 +1,6 @@
 """Configuration management for CLI."""
 import os
+from functools import cached_property
 from typing import Optional
 from dotenv import load_dotenv
 
@@ -31,9 +32,30 @@ class CLIConfig:
         self.password = password or os.getenv("STIFLYT_PASSWORD")
         self.timeout = timeout
 
-    def get_auth(self) -> Optional[tuple]:
-        """Get HTTP Basic Auth tuple if credentials are available."""
+    @cached_property
+    def auth(self) -> Optional[tuple]:
+        """HTTP Basic Auth tuple if credentials are available (computed once)."""
         if self.username and self.password:
             return (self.username, self.password)
         return None
 
+    def set_credentials(self, username: Optional[str] = None, password: Optional[str] = None):
+        """
+        Update the credentials and drop the cached auth tuple.
+
+        Args:
+            username: New HTTP Basic Auth username (unchanged if None)
+            password: New HTTP Basic Auth password (unchanged if None)
+        """
+        if username is not None:
+            self.username = username
+        if password is not None:
+            self.password = password
+        try:
+            del self.auth  # Recomputed from the new credentials on next access
+        except AttributeError:
+            pass  # Not computed yet
+
+    def get_auth(self) -> Optional[tuple]:
+        """Get HTTP Basic Auth tuple if credentials are available."""
+        return self.auth
@@ -1,61 +1,106 @@
 """Find available route numbers for a given prefix."""
-import re
-from typing import Dict, Set, List, Tuple, Optional
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Set, Optional
 from services.database import db_connection, get_route_schema, quote_identifier
 from psycopg.rows import dict_row
 
+# Results per database and prefix, reused while fotruteinfo is unchanged; set
+# STIFLYT_NO_CACHE=1 to disable
+AVAILABLE_CACHE_FILE = Path(os.getenv("XDG_CACHE_HOME", Path.home() / ".cache")) / "stiflyt" / "available.json"
+AVAILABLE_CACHE_MAXSIZE = 64
 
-def parse_rutenummer(rutenummer: str) -> Optional[Tuple[str, int, Optional[str]]]:
+
+def _query_existing_numbers(conn, prefix: str) -> Set[int]:
     """
-    Parse rutenummer into prefix, number, and optional letter.
+    Get the route numbers (without letters) in use for the given prefix.
 
-    Format: 3-letter prefix + number + optional letter (e.g., "bre26a")
+    The number is extracted in the database, so only distinct integers are
+    transferred instead of every rutenummer string.
 
     Args:
-        rutenummer: Route number string (e.g., "bre26", "bre26a")
+        conn: Database connection
+        prefix: 3-letter prefix (e.g., "bre")
 
     Returns:
-        Tuple of (prefix, number, letter) or None if invalid format
+        Set of existing numbers
+    """
+    route_schema = get_route_schema(conn)
+    schema_quoted = quote_identifier(route_schema)
+
+    # The LIKE prefix match becomes an index range scan with:
+    #   CREATE INDEX fotruteinfo_rutenummer_lower_idx
+    #   ON <schema>.fotruteinfo (LOWER(rutenummer) text_pattern_ops);
+    query = rf"""
+        SELECT DISTINCT substring(LOWER(rutenummer) FROM '^[a-z]{{3}}(\d+)')::int AS num
+        FROM {schema_quoted}.fotruteinfo
+        WHERE LOWER(rutenummer) LIKE LOWER(%s)
+          AND LOWER(rutenummer) ~ '^[a-z]{{3}}\d+[a-z]?$'
+          AND LEFT(LOWER(rutenummer), 3) = LOWER(%s)
     """
-    # Pattern: 3 lowercase letters + digits + optional lowercase letter
-    pattern = r'^([a-z]{3})(\d+)([a-z]?)$'
-    match = re.match(pattern, rutenummer.lower())
-
-    if not match:
-        return None
-
-    prefix = match.group(1)
-    number = int(match.group(2))
-    letter = match.group(3) if match.group(3) else None
 
-    return (prefix, number, letter)
+    with conn.cursor(row_factory=dict_row) as cur:
+        cur.execute(query, (f"{prefix}%", prefix))
+        return {row["num"] for row in cur.fetchall() if row["num"] is not None}
 
 
-def get_existing_rutenummer(prefix: str) -> List[str]:
+def get_fotruteinfo_fingerprint(conn) -> Optional[Dict[str, str]]:
     """
-    Get all existing rutenummer with the given prefix from database.
+    Identify the database and the current contents of fotruteinfo.
+
+    Combines the row count with the newest row version (max(xmin)), so any
+    committed insert, update or delete gives a new fingerprint. It is read
+    before the lookup, so a write committed in between only causes a miss.
 
     Args:
-        prefix: 3-letter prefix (e.g., "bre")
+        conn: Database connection
 
     Returns:
-        List of rutenummer strings
+        Dict with 'database' and 'fingerprint', or None if it could not be
+        computed and results must not be cached
     """
-    with db_connection() as conn:
-        route_schema = get_route_schema(conn)
-        schema_quoted = quote_identifier(route_schema)
-
-        query = f"""
-            SELECT DISTINCT rutenummer
-            FROM {schema_quoted}.fotruteinfo
-            WHERE LOWER(rutenummer) LIKE LOWER(%s)
-            ORDER BY rutenummer
-        """
-
-        with conn.cursor(row_factory=dict_row) as cur:
-            cur.execute(query, (f"{prefix}%",))
-            rows = cur.fetchall()
-            return [row["rutenummer"] for row in rows]
+    schema_quoted = quote_identifier(get_route_schema(conn))
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"""
+                SELECT current_database() || '@' || COALESCE(inet_server_addr()::text, 'local'),
+                       count(*) || ':' || COALESCE(max(xmin::text::bigint), 0)
+                FROM {schema_quoted}.fotruteinfo
+            """)
+            row = cur.fetchone()
+    except Exception:
+        conn.rollback()
+        return None
+    if not row:
+        return None
+    return {"database": row[0], "fingerprint": row[1]}
+
+
+def _load_available_cache() -> Dict[str, Any]:
+    """Read the find-available cache file (empty dict if missing or unreadable)."""
+    try:
+        with open(AVAILABLE_CACHE_FILE, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def _save_available_cache(cache: Dict[str, Any]) -> None:
+    """Write the cache, keeping the AVAILABLE_CACHE_MAXSIZE most recently stored prefixes."""
+    if len(cache) > AVAILABLE_CACHE_MAXSIZE:
+        newest = sorted(cache.items(), key=lambda item: item[1].get("stored_at", 0), reverse=True)
+        cache = dict(newest[:AVAILABLE_CACHE_MAXSIZE])
+    try:
+        AVAILABLE_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = AVAILABLE_CACHE_FILE.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, AVAILABLE_CACHE_FILE)
+    except OSError:
+        pass  # Caching is best effort
 
 
 def analyze_available_numbers(prefix: str) -> Dict:
@@ -75,43 +120,31 @@ def analyze_available_numbers(prefix: str) -> Dict:
         - next_available: next available number
         - suggestions: list of suggested available numbers (gaps first)
     """
-    # Get all existing rutenummer
-    existing_rutenummer = get_existing_rutenummer(prefix)
-
-    # Parse and organize by number (ignore letters)
-    existing_numbers: Set[int] = set()
-    max_number = 0
-
-    for rutenummer in existing_rutenummer:
-        parsed = parse_rutenummer(rutenummer)
-        if not parsed:
-            continue
-
-        parsed_prefix, number, letter = parsed
-
-        # Only process if prefix matches
-        if parsed_prefix != prefix.lower():
-            continue
-
-        # Add number to set (ignore letter)
-        existing_numbers.add(number)
-        max_number = max(max_number, number)
-
-    # Find gaps in sequence
+    # Get existing numbers (letters ignored, parsed in the database); a cached
+    # result for this database and prefix is reused while fotruteinfo is unchanged
+    use_cache = os.getenv("STIFLYT_NO_CACHE", "") != "1"
+    with db_connection() as conn:
+        fingerprint = get_fotruteinfo_fingerprint(conn) if use_cache else None
+        if fingerprint is not None:
+            cache_key = f"{fingerprint['database']}:{prefix}"
+            cache = _load_available_cache()
+            cached = cache.get(cache_key)
+            if cached and cached.get("fingerprint") == fingerprint["fingerprint"]:
+                return cached["result"]
+        existing_numbers = _query_existing_numbers(conn, prefix)
+
+    max_number = max(existing_numbers, default=0)
+
+    # Find gaps in sequence (sorted)
     gaps = []
     if existing_numbers:
         min_number = min(existing_numbers)
-        for num in range(min_number, max_number + 1):
-            if num not in existing_numbers:
-                gaps.append(num)
-    else:
-        # No existing numbers, suggest starting from 1
-        gaps = []
+        gaps = sorted(set(range(min_number, max_number + 1)).difference(existing_numbers))
 
     # Find next available number
     next_available = None
     if gaps:
-        next_available = min(gaps)
+        next_available = gaps[0]
     elif existing_numbers:
         # Check if max_number + 1 is available
         if max_number + 1 not in existing_numbers:
@@ -124,7 +157,7 @@ def analyze_available_numbers(prefix: str) -> Dict:
     suggestions = []
 
     # Add gaps (up to 10)
-    for gap in sorted(gaps)[:10]:
+    for gap in gaps[:10]:
         suggestions.append(f"{prefix}{gap}")
 
     # If we have less than 10 suggestions and next_available is beyond max, add it
@@ -132,14 +165,20 @@ def analyze_available_numbers(prefix: str) -> Dict:
         if next_available not in [int(s[len(prefix):]) for s in suggestions]:
             suggestions.append(f"{prefix}{next_available}")
 
-    return {
+    result = {
         "prefix": prefix,
         "existing": sorted(existing_numbers),
-        "gaps": sorted(gaps),
+        "gaps": gaps,
         "next_available": next_available,
         "suggestions": suggestions[:10]  # Limit to 10 suggestions
     }
 
+    if fingerprint is not None:
+        cache[cache_key] = {"fingerprint": fingerprint["fingerprint"], "stored_at": time.time(), "result": result}
+        _save_available_cache(cache)
+
+    return result
+
 
 def format_available_numbers(result: Dict) -> str:
     """
@@ -1,23 +1,182 @@
 """Output formatters for CLI."""
 import json
 import csv
-from typing import List, Dict, Any, Optional
+import sys
+from functools import lru_cache
+from itertools import chain
+from operator import methodcaller
+from typing import List, Dict, Any, Iterable, Optional, TextIO, Tuple
 from io import StringIO
 
+try:
+    import orjson
+except ImportError:  # Optional: fall back to the stdlib json module
+    orjson = None
 
-def format_json(data: Dict[str, Any]) -> str:
+
+def format_json(data: Dict[str, Any], compact: bool = False) -> str:
     """
     Format data as pretty-printed JSON.
 
     Args:
         data: Dictionary to format
+        compact: Emit compact JSON without indentation or spaces (for piping to tools)
 
     Returns:
         JSON string
     """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS if compact else orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        return orjson.dumps(data, option=option).decode()
+    if compact:
+        return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
     return json.dumps(data, indent=2, ensure_ascii=False)
 
 
+def format_json_bytes(data: Dict[str, Any], compact: bool = False) -> bytes:
+    """
+    Format data as UTF-8 encoded JSON, ready to write to a binary stream.
+
+    With orjson the bytes come straight from the serializer, skipping the
+    str round trip and the encode on write.
+
+    Args:
+        data: Dictionary to format
+        compact: Emit compact JSON without indentation or spaces
+
+    Returns:
+        UTF-8 encoded JSON
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS if compact else orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        return orjson.dumps(data, option=option)
+    return format_json(data, compact=compact).encode("utf-8")
+
+
+_get_rutenummer = methodcaller("get", "rutenummer", "")
+
+
+def _route_columns(routes: List[Any]) -> Tuple[List[str], List[Optional[str]], List[Optional[str]]]:
+    """
+    Split a segment's routes into rutenummer, rutenavn and vedlikeholdsansvarlig lists.
+
+    Routes are dicts per the API contract, so the type is checked once on the first
+    entry rather than per route; lists of plain values are treated as rutenummer only.
+
+    Args:
+        routes: List of route dictionaries
+
+    Returns:
+        Tuple of (rutenummer list, rutenavn list, vedlikeholdsansvarlig list)
+    """
+    if routes and not isinstance(routes[0], dict):
+        return [str(r) for r in routes], [None] * len(routes), [None] * len(routes)
+
+    # One pass over routes filling all three columns
+    rutenummer_list, rutenavn_list, org_list = [], [], []
+    add_rutenummer, add_rutenavn, add_org = rutenummer_list.append, rutenavn_list.append, org_list.append
+    for r in routes:
+        get = r.get
+        add_rutenummer(get("rutenummer", ""))
+        add_rutenavn(get("rutenavn"))
+        add_org(get("vedlikeholdsansvarlig"))
+    return rutenummer_list, rutenavn_list, org_list
+
+
+# Serialized geometries remembered per format_csv_stream call
+GEOMETRY_CACHE_SIZE = 256
+
+
+def _geometry_fingerprint(geometry: Dict[str, Any]) -> Optional[tuple]:
+    """
+    Cheap content key for a GeoJSON geometry: type, coordinate count and end positions.
+
+    Returns:
+        Hashable fingerprint, or None for geometries not worth caching (e.g. points)
+    """
+    coords = geometry.get("coordinates")
+    if not coords:
+        return None
+    first, last = coords[0], coords[-1]
+    # Descend to the first/last position of multi-part geometries
+    while isinstance(first, list) and first and isinstance(first[0], list):
+        first = first[0]
+    while isinstance(last, list) and last and isinstance(last[-1], list):
+        last = last[-1]
+    try:
+        return (geometry.get("type"), len(coords), tuple(first), tuple(last))
+    except TypeError:
+        return None
+
+
+def _orgs_str(org_list: List[Optional[str]]) -> str:
+    """
+    Unique non-empty organizations as a sorted, comma-separated string.
+
+    Most segments have a single organization, which needs neither sorting nor a
+    cache lookup. Otherwise names are interned (the vocabulary is small and repeated
+    across thousands of segments) and the sorted join is memoized per combination,
+    so each distinct set is sorted only once.
+
+    Args:
+        org_list: vedlikeholdsansvarlig values of a segment's routes
+
+    Returns:
+        Joined organizations, or an empty string if there are none
+    """
+    orgs = frozenset(filter(None, org_list))
+    if len(orgs) <= 1:
+        return next(iter(orgs), "")
+    return _join_orgs(frozenset(map(sys.intern, orgs)))
+
+
+@lru_cache(maxsize=4096)
+def _join_orgs(orgs: frozenset) -> str:
+    """Sorted, comma-separated organizations; memoized since few distinct combinations occur."""
+    return ", ".join(sorted(orgs))
+
+
+# Table column headers, in cell order
+_TABLE_HEADERS = ("objid", "rutenummer", "rutenavn", "vedlikeholdsansvarlig", "length (m)")
+
+
+def _segment_table_cells(segment: Dict[str, Any]) -> Tuple[str, str, str, str, str]:
+    """
+    Build the table cells for one segment, walking its routes list once.
+
+    Args:
+        segment: Segment dictionary with routes as list
+
+    Returns:
+        Tuple of cell strings in _TABLE_HEADERS order
+    """
+    routes = segment.get("routes") or []
+    if not routes:
+        rutenummer_str = rutenavn_str = vedlikeholdsansvarlig_str = ""
+    elif len(routes) == 1 and isinstance(routes[0], dict):
+        # Fast path for the usual single-route segment: no lists, set or sort
+        route = routes[0]
+        rutenummer_str = route.get("rutenummer", "")
+        rutenavn = route.get("rutenavn")
+        rutenavn_str = rutenavn if rutenavn and rutenavn != "Ukjent" else ""
+        vedlikeholdsansvarlig_str = route.get("vedlikeholdsansvarlig") or "N/A"
+    else:
+        rutenummer_list, rutenavn_list, org_list = _route_columns(routes)
+        rutenummer_str = ", ".join(rutenummer_list)
+        # Only include names that are not "Ukjent" and not empty
+        rutenavn_str = ", ".join(navn for navn in rutenavn_list if navn and navn != "Ukjent")
+        vedlikeholdsansvarlig_str = _orgs_str(org_list) or "N/A"
+
+    length_meters = segment.get("length_meters")
+    return (
+        str(segment.get("objid", "")),
+        rutenummer_str,
+        rutenavn_str,
+        vedlikeholdsansvarlig_str,
+        f"{length_meters:.1f}" if length_meters is not None else "N/A",
+    )
+
+
 def format_table(segments: List[Dict[str, Any]], show_geometry: bool = False) -> str:
     """
     Format segments as a human-readable table.
@@ -32,131 +191,164 @@ def format_table(segments: List[Dict[str, Any]], show_geometry: bool = False) ->
     if not segments:
         return "No segments found."
 
-    lines = []
+    # Build each row's cells once, then reduce column widths (minimum 8) column-wise;
+    # max(map(len, ...)) over the transposed cells runs in C and beats a per-cell loop
+    rows = list(map(_segment_table_cells, segments))
+    col_widths = [
+        max(len(header), 8, max(map(len, column)))
+        for header, column in zip(_TABLE_HEADERS, zip(*rows))
+    ]
 
-    # Calculate column widths - need to handle routes as list
-    def get_routes_str(routes_list):
-        """Format routes list as comma-separated string of rutenummer."""
-        if not routes_list:
-            return ""
-        route_strs = [r.get("rutenummer", "") if isinstance(r, dict) else str(r) for r in routes_list]
-        return ", ".join(route_strs)
-
-    def get_rutenavn_str(routes_list):
-        """Get rutenavn values from routes, excluding 'Ukjent'."""
-        if not routes_list:
-            return ""
-        navn_list = []
-        for r in routes_list:
-            if isinstance(r, dict):
-                rutenavn = r.get("rutenavn", "")
-                # Only include if not "Ukjent" and not empty
-                if rutenavn and rutenavn != "Ukjent":
-                    navn_list.append(rutenavn)
-        return ", ".join(navn_list) if navn_list else ""
-
-    def get_vedlikeholdsansvarlig_str(routes_list):
-        """Get unique vedlikeholdsansvarlig values from routes."""
-        if not routes_list:
-            return ""
-        orgs = set()
-        for r in routes_list:
-            if isinstance(r, dict):
-                org = r.get("vedlikeholdsansvarlig")
-                if org:
-                    orgs.add(org)
-        return ", ".join(sorted(orgs)) if orgs else "N/A"
-
-    col_widths = {
-        "objid": max(len("objid"), max(len(str(s.get("objid", ""))) for s in segments)),
-        "rutenummer": max(len("rutenummer"), max(len(get_routes_str(s.get("routes", []))) for s in segments)),
-        "rutenavn": max(len("rutenavn"), max(len(get_rutenavn_str(s.get("routes", []))) for s in segments)),
-        "vedlikeholdsansvarlig": max(len("vedlikeholdsansvarlig"), max(len(get_vedlikeholdsansvarlig_str(s.get("routes", []))) for s in segments)),
-        "length_meters": max(len("length (m)"), max(len(f"{s.get('length_meters', 0):.1f}") if s.get('length_meters') else len("N/A") for s in segments)),
-    }
-
-    # Ensure minimum widths
-    for key in col_widths:
-        col_widths[key] = max(col_widths[key], 8)
-
-    # Build header
-    header = (
-        f"{'objid':<{col_widths['objid']}} | "
-        f"{'rutenummer':<{col_widths['rutenummer']}} | "
-        f"{'rutenavn':<{col_widths['rutenavn']}} | "
-        f"{'vedlikeholdsansvarlig':<{col_widths['vedlikeholdsansvarlig']}} | "
-        f"{'length (m)':>{col_widths['length_meters']}}"
-    )
-    lines.append(header)
-    lines.append("-" * len(header))
-
-    # Build rows
-    for segment in segments:
-        objid = str(segment.get("objid", ""))
-        routes = segment.get("routes", [])
-        rutenummer_str = get_routes_str(routes)
-        rutenavn_str = get_rutenavn_str(routes)
-        vedlikeholdsansvarlig_str = get_vedlikeholdsansvarlig_str(routes)
-        length_meters = segment.get("length_meters")
-        length_str = f"{length_meters:.1f}" if length_meters is not None else "N/A"
-
-        row = (
-            f"{objid:<{col_widths['objid']}} | "
-            f"{rutenummer_str:<{col_widths['rutenummer']}} | "
-            f"{rutenavn_str:<{col_widths['rutenavn']}} | "
-            f"{vedlikeholdsansvarlig_str:<{col_widths['vedlikeholdsansvarlig']}} | "
-            f"{length_str:>{col_widths['length_meters']}}"
-        )
-        lines.append(row)
+    # printf-style template built once with the widths baked in; length is right-aligned.
+    # Applying it with % measured faster than both str.format and ljust/rjust + join.
+    w_objid, w_rutenummer, w_rutenavn, w_org, w_length = col_widths
+    row_template = f"%-{w_objid}s | %-{w_rutenummer}s | %-{w_rutenavn}s | %-{w_org}s | %{w_length}s"
+
+    header = row_template % _TABLE_HEADERS
+    lines = [header, "-" * len(header)]
+    lines.extend([row_template % cells for cells in rows])
 
     return "\n".join(lines)
 
 
-def format_csv(segments: List[Dict[str, Any]], include_geometry: bool = False) -> str:
+def format_csv(segments: Iterable[Dict[str, Any]], include_geometry: bool = False) -> str:
     """
     Format segments as CSV.
 
     Creates one row per segment with routes as comma-separated lists.
 
     Args:
-        segments: List of segment dictionaries with routes as list
+        segments: Iterable of segment dictionaries with routes as list
         include_geometry: Whether to include geometry column
 
     Returns:
         CSV string
     """
-    if not segments:
-        return ""
-
     output = StringIO()
+    format_csv_stream(segments, output, include_geometry=include_geometry)
+    return output.getvalue()
+
+
+def format_csv_stream(segments: Iterable[Dict[str, Any]], fileobj: TextIO, include_geometry: bool = False) -> int:
+    """
+    Write segments as CSV directly to a text file object.
+
+    Segments are consumed in a single pass and each row is written as soon as it is
+    formatted, so a streaming iterator never has to be materialized. Nothing is
+    written when there are no segments.
+
+    Args:
+        segments: Iterable of segment dictionaries with routes as list
+        fileobj: Open text file (e.g. sys.stdout), ideally opened with newline=''
+        include_geometry: Whether to include geometry column
+
+    Returns:
+        Number of segment rows written
+    """
+    segments = iter(segments)
+    first = next(segments, None)
+    if first is None:
+        return 0
+    segments = chain((first,), segments)
+
     fieldnames = ["objid", "rutenummer", "rutenavn", "vedlikeholdsansvarlig", "length_meters"]
     if include_geometry:
         fieldnames.append("geometry")
 
-    writer = csv.DictWriter(output, fieldnames=fieldnames, extrasaction='ignore')
-    writer.writeheader()
-
-    for segment in segments:
-        routes = segment.get("routes", [])
-        rutenummer_list = [r.get("rutenummer", "") if isinstance(r, dict) else str(r) for r in routes]
-        rutenavn_list = [r.get("rutenavn", "") if isinstance(r, dict) else "" for r in routes]
-        vedlikeholdsansvarlig_list = [r.get("vedlikeholdsansvarlig", "") if isinstance(r, dict) else "" for r in routes]
-
-        # Get unique organizations
-        orgs = set(org for org in vedlikeholdsansvarlig_list if org)
-
-        row = {
-            "objid": segment.get("objid"),
-            "rutenummer": ", ".join(rutenummer_list),
-            "rutenavn": ", ".join(rutenavn_list),
-            "vedlikeholdsansvarlig": ", ".join(sorted(orgs)) if orgs else "",
-            "length_meters": segment.get("length_meters", ""),
-        }
-        if include_geometry and segment.get("geometry"):
-            row["geometry"] = json.dumps(segment.get("geometry"))
-        writer.writerow(row)
+    # Plain csv.writer with tuples in fieldnames order avoids a dict per row
+    writer = csv.writer(fileobj)
+    writer.writerow(fieldnames)
+
+    geometry_cache: Dict[tuple, Tuple[Any, str]] = {}
+    count = 0
+
+    def rows():
+        nonlocal count
+        for segment in segments:
+            routes = segment.get("routes") or []
+            if not routes:
+                rutenummer_str = rutenavn_str = vedlikeholdsansvarlig_str = ""
+            elif len(routes) == 1 and isinstance(routes[0], dict):
+                # Fast path for the usual single-route segment
+                route = routes[0]
+                rutenummer_str = route.get("rutenummer", "")
+                rutenavn_str = route.get("rutenavn") or ""
+                vedlikeholdsansvarlig_str = route.get("vedlikeholdsansvarlig") or ""
+            else:
+                rutenummer_list, rutenavn_list, vedlikeholdsansvarlig_list = _route_columns(routes)
+                rutenummer_str = ", ".join(rutenummer_list)
+                rutenavn_str = ", ".join(navn or "" for navn in rutenavn_list)
+                vedlikeholdsansvarlig_str = _orgs_str(vedlikeholdsansvarlig_list)
+
+            row = (
+                segment.get("objid"),
+                rutenummer_str,
+                rutenavn_str,
+                vedlikeholdsansvarlig_str,
+                segment.get("length_meters", ""),
+            )
+            if include_geometry:
+                geometry = segment.get("geometry")
+                if not geometry:
+                    geometry_str = ""
+                else:
+                    # Geometries recur (shared objects, or equal ones across pages); serialize
+                    # each only once. Hits are verified, so fingerprint collisions are harmless.
+                    key = _geometry_fingerprint(geometry)
+                    cached = geometry_cache.get(key) if key is not None else None
+                    if cached is not None and (cached[0] is geometry or cached[0] == geometry):
+                        geometry_str = cached[1]
+                    else:
+                        if orjson is not None:
+                            geometry_str = orjson.dumps(geometry).decode()
+                        else:
+                            geometry_str = json.dumps(geometry, separators=(",", ":"))
+                        if key is not None:
+                            if len(geometry_cache) >= GEOMETRY_CACHE_SIZE:
+                                del geometry_cache[next(iter(geometry_cache))]  # Evict oldest
+                            geometry_cache[key] = (geometry, geometry_str)
+                row += (geometry_str,)
+            count += 1
+            yield row
+
+    # writerows drives the generator from C instead of one writerow call per segment
+    writer.writerows(rows())
+
+    return count
+
+
+def format_ndjson_stream(segments: Iterable[Dict[str, Any]], fileobj: TextIO, flush: bool = False) -> int:
+    """
+    Write segments as newline-delimited JSON, one compact object per line.
 
-    return output.getvalue()
+    Each segment is written as soon as it is serialized, so consumers can start
+    parsing immediately and a streaming iterator never has to be materialized.
+
+    Args:
+        segments: Iterable of segment dictionaries
+        fileobj: Open text file (e.g. sys.stdout)
+        flush: Flush after every line, so a reader on a pipe sees each segment
+            as soon as it arrives instead of when the buffer fills
+
+    Returns:
+        Number of segments written
+    """
+    count = 0
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+        for segment in segments:
+            fileobj.write(orjson.dumps(segment, option=option).decode())
+            if flush:
+                fileobj.flush()
+            count += 1
+    else:
+        for segment in segments:
+            fileobj.write(json.dumps(segment, separators=(",", ":"), ensure_ascii=False))
+            fileobj.write("\n")
+            if flush:
+                fileobj.flush()
+            count += 1
+    return count
 
 
 def format_text_summary(response: Dict[str, Any]) -> str:
@@ -183,6 +375,16 @@ def format_text_summary(response: Dict[str, Any]) -> str:
     return "\n".join(lines)
 
 
+def _format_route_segment_line(seg: Dict[str, Any]) -> str:
+    """Format one segment line for the SEGMENTER section of a complete route."""
+    length_m = seg.get("length_meters")
+    length_str = f"{length_m:.1f} m" if length_m is not None else "N/A"
+    routes = seg.get("routes") or []
+    # Routes are homogeneous: sniff the type once; non-dict routes are not listed
+    rutenummer_str = ", ".join(map(_get_rutenummer, routes)) if routes and isinstance(routes[0], dict) else ""
+    return f"  objid {seg.get('objid', 'N/A')}: {length_str} ({rutenummer_str})"
+
+
 def format_complete_route_table(route: Dict[str, Any]) -> str:
     """
     Format a complete route as a human-readable table.
@@ -260,13 +462,11 @@ def format_complete_route_table(route: Dict[str, Any]) -> str:
         lines.append("-" * 60)
         lines.append("KOMPONENTER")
         lines.append("-" * 60)
-        for comp in components:
-            index = comp.get("index", 0)
-            segment_count_comp = comp.get("segment_count", 0)
-            length_km = comp.get("length_meters", 0.0) / 1000.0
-            is_main = comp.get("is_main", False)
-            main_str = " (Hovedrute)" if is_main else ""
-            lines.append(f"  Komponent {index}: {segment_count_comp} segmenter, {length_km:.2f} km{main_str}")
+        lines.extend(
+            f"  Komponent {comp.get('index', 0)}: {comp.get('segment_count', 0)} segmenter, "
+            f"{comp.get('length_meters', 0.0) / 1000.0:.2f} km{' (Hovedrute)' if comp.get('is_main', False) else ''}"
+            for comp in components
+        )
         lines.append("")
 
     # Segments (if included)
@@ -275,13 +475,7 @@ def format_complete_route_table(route: Dict[str, Any]) -> str:
         lines.append("-" * 60)
         lines.append("SEGMENTER")
         lines.append("-" * 60)
-        for seg in segments:
-            objid = seg.get("objid", "N/A")
-            length_m = seg.get("length_meters")
-            length_str = f"{length_m:.1f} m" if length_m is not None else "N/A"
-            routes = seg.get("routes", [])
-            rutenummer_str = ", ".join([r.get("rutenummer", "") for r in routes if isinstance(r, dict)])
-            lines.append(f"  objid {objid}: {length_str} ({rutenummer_str})")
+        lines.extend(map(_format_route_segment_line, segments))
         lines.append("")
 
     lines.append("=" * 60)
@@ -308,31 +502,30 @@ def format_complete_route_csv(route: Dict[str, Any]) -> str:
         "to_name", "to_source", "to_distance_meters", "to_tilrettelegging"
     ]
 
-    writer = csv.DictWriter(output, fieldnames=fieldnames, extrasaction='ignore')
-    writer.writeheader()
-
-    from_name = route.get("from_name")
-    to_name = route.get("to_name")
-
-    row = {
-        "rutenummer": route.get("rutenummer"),
-        "rutenavn": route.get("rutenavn"),
-        "vedlikeholdsansvarlig": route.get("vedlikeholdsansvarlig"),
-        "total_length_km": route.get("total_length_km"),
-        "total_length_meters": route.get("total_length_meters"),
-        "segment_count": route.get("segment_count"),
-        "component_count": route.get("component_count"),
-        "is_connected": route.get("is_connected"),
-        "from_name": from_name.get("name") if from_name else None,
-        "from_source": from_name.get("source") if from_name else None,
-        "from_distance_meters": from_name.get("distance_meters") if from_name else None,
-        "from_tilrettelegging": from_name.get("tilrettelegging") if from_name else None,
-        "to_name": to_name.get("name") if to_name else None,
-        "to_source": to_name.get("source") if to_name else None,
-        "to_distance_meters": to_name.get("distance_meters") if to_name else None,
-        "to_tilrettelegging": to_name.get("tilrettelegging") if to_name else None,
-    }
-    writer.writerow(row)
+    # Missing endpoint names give empty cells, like missing route fields
+    from_name = route.get("from_name") or {}
+    to_name = route.get("to_name") or {}
+
+    writer = csv.writer(output)
+    writer.writerow(fieldnames)
+    writer.writerow((
+        route.get("rutenummer"),
+        route.get("rutenavn"),
+        route.get("vedlikeholdsansvarlig"),
+        route.get("total_length_km"),
+        route.get("total_length_meters"),
+        route.get("segment_count"),
+        route.get("component_count"),
+        route.get("is_connected"),
+        from_name.get("name"),
+        from_name.get("source"),
+        from_name.get("distance_meters"),
+        from_name.get("tilrettelegging"),
+        to_name.get("name"),
+        to_name.get("source"),
+        to_name.get("distance_meters"),
+        to_name.get("tilrettelegging"),
+    ))
 
     return output.getvalue()
 
@@ -3,6 +3,10 @@
 
 This CLI tool provides a command-line interface to query route segments
 filtered by rutenummer prefix and/or vedlikeholdsansvarlig.
+
+Each subcommand imports its own dependencies (the HTTP client, formatters, or
+psycopg and the database settings) when it runs, so `--help` and other
+subcommands stay fast.
 """
 
 import argparse
@@ -10,501 +14,792 @@ import sys
 from pathlib import Path
 from typing import Optional
 
-from .api_client import RouteSegmentsClient, APIError, ConnectionError, AuthenticationError, APIResponseError
-from .config import CLIConfig
-from .formatters import format_json, format_table, format_csv, format_text_summary, format_complete_route_table, format_complete_route_csv
-from .find_available_numbers import analyze_available_numbers, format_available_numbers
+# Text formatters (in cli.formatters) for --complete-route output; JSON formats are
+# handled separately. Looked up by name so formatters is only imported when used.
+COMPLETE_ROUTE_FORMATTERS = {
+    "table": "format_complete_route_table",
+    "csv": "format_complete_route_csv",
+}
 
+# Large write buffer so streamed output is flushed in few, big syscalls
+OUTPUT_BUFFER_SIZE = 1 << 20
 
-def main():
-    """Main CLI entry point."""
+
+def write_json_output(data, args, compact=False):
+    """
+    Write data as JSON bytes to args.output (or stdout) without a str encode pass.
+
+    Args:
+        data: Dictionary to write
+        args: Parsed command line arguments
+        compact: Emit compact JSON without indentation
+    """
+    from .formatters import format_json_bytes
+
+    payload = format_json_bytes(data, compact=compact)
+    if not args.output:
+        sys.stdout.flush()
+        sys.stdout.buffer.write(payload + b"\n")
+        sys.stdout.buffer.flush()
+        return
+
+    try:
+        with open(args.output, 'wb', buffering=OUTPUT_BUFFER_SIZE) as f:
+            f.write(payload)
+    except OSError as e:
+        print(f"Error writing to file {args.output}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def write_text_output(chunks, args, announce=True):
+    """
+    Write text chunks to args.output (or stdout, followed by a newline).
+
+    All text outputs go through here, so the file is opened once with the large
+    buffer and the chunks (e.g. summary and table) are written without joining them.
+
+    Args:
+        chunks: Iterable of strings
+        args: Parsed command line arguments
+        announce: Print "Results written to ..." to stderr after writing a file
+    """
+    if not args.output:
+        sys.stdout.writelines(chunks)
+        sys.stdout.write("\n")
+        return
+
+    try:
+        with open(args.output, 'w', encoding='utf-8', buffering=OUTPUT_BUFFER_SIZE) as f:
+            f.writelines(chunks)
+    except OSError as e:
+        print(f"Error writing to file {args.output}: {e}", file=sys.stderr)
+        sys.exit(1)
+    if announce:
+        print(f"Results written to {args.output}", file=sys.stderr)
+
+
+def write_stream_output(segments, args):
+    """
+    Stream segments as CSV or NDJSON to args.output (or stdout) without building the whole document.
+
+    NDJSON on stdout is flushed per segment, so downstream tools (e.g. jq) get the
+    first rows while later pages or --batch prefixes are still being fetched.
+
+    Args:
+        segments: Iterable of segment dictionaries
+        args: Parsed command line arguments (args.format is "csv" or "ndjson")
+    """
+    from .formatters import format_csv_stream, format_ndjson_stream
+
+    def write(fileobj, flush=False):
+        if args.format == "ndjson":
+            format_ndjson_stream(segments, fileobj, flush=flush)
+        else:
+            format_csv_stream(segments, fileobj, include_geometry=args.include_geometry)
+
+    if not args.output:
+        write(sys.stdout, flush=True)
+        return
+
+    try:
+        f = open(args.output, 'w', encoding='utf-8', newline='', buffering=OUTPUT_BUFFER_SIZE)
+    except OSError as e:
+        print(f"Error writing to file {args.output}: {e}", file=sys.stderr)
+        sys.exit(1)
+    with f:
+        write(f)
+    if args.format == "csv" and not args.no_summary:
+        print(f"Results written to {args.output}", file=sys.stderr)
+
+
+def make_config(args):
+    """
+    Create the API client configuration from parsed command line arguments.
+
+    Args:
+        args: Parsed command line arguments
+
+    Returns:
+        CLIConfig instance
+    """
+    from .config import CLIConfig
+
+    return CLIConfig(
+        api_url=args.api_url,
+        username=args.username,
+        password=args.password,
+        timeout=args.timeout
+    )
+
+
+def run_test_point(args, parser):
+    """Handle the test-point subcommand (debug name lookup for a coordinate)."""
+    lon = args.lon
+    lat = args.lat
+
+    from services.database import db_connection
+    from services.route_endpoints import lookup_name_in_ruteinfopunkt, lookup_name_in_stedsnavn, lookup_name_in_anchor_nodes
+
+    print(f"Testing name lookup for point: ({lon}, {lat})")
+    print(f"Search radius: {args.test_radius} m")
+    if args.rutenummer_prefix:
+        print(f"Filtering by rutenummer: {args.rutenummer_prefix}*")
+    print("")
+
+    with db_connection() as conn:
+        # Test anchor nodes
+        print("1. Checking anchor_nodes...")
+        anchor_result = lookup_name_in_anchor_nodes(conn, lon, lat, search_radius_meters=args.test_radius)
+        if anchor_result:
+            print(f"   ✓ Found: {anchor_result.get('name')} (source: {anchor_result.get('source')}, distance: {anchor_result.get('distance_meters'):.2f} m)")
+        else:
+            print("   ✗ Not found")
+
+        # Test ruteinfopunkt
+        print("\n2. Checking ruteinfopunkt...")
+        rutenummer = args.rutenummer_prefix if args.rutenummer_prefix else None
+        # Check if view exists and has data
+        from services.database import ROUTE_SCHEMA, quote_identifier
+        from services.projection import wgs84_to_utm33
+        from services.route_endpoints import build_ruteinfopunkt_query
+        from psycopg.rows import dict_row
+        with conn.cursor(row_factory=dict_row) as cur:
+            cur.execute("""
+                SELECT EXISTS (
+                    SELECT FROM information_schema.views
+                    WHERE table_schema = %s AND table_name = 'ruteinfopunkt'
+                ) as exists
+            """, (ROUTE_SCHEMA,))
+            result = cur.fetchone()
+            view_exists = result.get('exists') if result else False
+            print(f"   View exists: {view_exists}")
+
+            if view_exists:
+                # Count total ruteinfopunkt
+                cur.execute(f"SELECT COUNT(*) as count FROM {quote_identifier(ROUTE_SCHEMA)}.ruteinfopunkt")
+                result = cur.fetchone()
+                total_count = result['count'] if result else 0
+                print(f"   Total ruteinfopunkt in view: {total_count}")
+
+                # Count with names (using informasjon column)
+                cur.execute(f"SELECT COUNT(*) as count FROM {quote_identifier(ROUTE_SCHEMA)}.ruteinfopunkt WHERE informasjon IS NOT NULL")
+                result = cur.fetchone()
+                with_names = result['count'] if result else 0
+                print(f"   Ruteinfopunkt with informasjon: {with_names}")
+
+                # Try query (filtered to hytter and parkering only, prioritized)
+                cur.execute(
+                    build_ruteinfopunkt_query(quote_identifier(ROUTE_SCHEMA)),
+                    (*wgs84_to_utm33(lon, lat), args.test_radius, 5)
+                )
+                results = cur.fetchall()
+                print(f"   Found {len(results)} ruteinfopunkt (hytter/parkering only) within {args.test_radius}m:")
+                for r in results:
+                    tilrettelegging = r.get('tilrettelegging', 'N/A')
+                    print(f"     - objid: {r.get('objid')}, navn: {r.get('navn')}, tilrettelegging: {tilrettelegging}, distance: {r.get('distance_meters'):.2f} m")
+
+        ruteinfopunkt_result = lookup_name_in_ruteinfopunkt(conn, lon, lat, rutenummer, search_radius_meters=args.test_radius)
+        if ruteinfopunkt_result:
+            print(f"   ✓ Found: {ruteinfopunkt_result.get('name')} (source: {ruteinfopunkt_result.get('source')}, distance: {ruteinfopunkt_result.get('distance_meters'):.2f} m)")
+        else:
+            print("   ✗ Not found")
+
+        # Test stedsnavn
+        print("\n3. Checking stedsnavn...")
+        stedsnavn_result = lookup_name_in_stedsnavn(conn, lon, lat, search_radius_meters=args.test_radius)
+        if stedsnavn_result:
+            print(f"   ✓ Found: {stedsnavn_result.get('name')} (source: {stedsnavn_result.get('source')}, distance: {stedsnavn_result.get('distance_meters'):.2f} m)")
+        else:
+            print("   ✗ Not found")
+
+        # Test combined lookup
+        print("\n4. Combined lookup (lookup_endpoint_name)...")
+        from services.route_endpoints import lookup_endpoint_name
+        combined_result = lookup_endpoint_name(conn, lon, lat, rutenummer)
+        if combined_result:
+            print(f"   ✓ Result: {combined_result.get('name')} (source: {combined_result.get('source')}, distance: {combined_result.get('distance_meters'):.2f} m)")
+        else:
+            print("   ✗ Not found")
+
+        if args.format == "json":
+            result = {
+                "coordinates": [lon, lat],
+                "search_radius_meters": args.test_radius,
+                "rutenummer_filter": rutenummer,
+                "anchor_node": anchor_result,
+                "ruteinfopunkt": ruteinfopunkt_result,
+                "stedsnavn": stedsnavn_result,
+                "combined_result": combined_result
+            }
+            from .formatters import format_json_bytes
+
+            print()
+            sys.stdout.flush()
+            sys.stdout.buffer.write(format_json_bytes(result) + b"\n")
+            sys.stdout.buffer.flush()
+
+    sys.exit(0)
+
+
+def run_find_available(args, parser):
+    """Handle the find-available subcommand."""
+    # Validate prefix format (3 letters)
+    if len(args.rutenummer_prefix) != 3 or not args.rutenummer_prefix.isalpha():
+        parser.error("--rutenummer-prefix must be exactly 3 letters (e.g., 'bre')")
+
+    # Imported here: it pulls in psycopg and the database settings, which API-only runs never need
+    from .find_available_numbers import analyze_available_numbers, format_available_numbers
+
+    try:
+        result = analyze_available_numbers(args.rutenummer_prefix.lower())
+
+        if args.format in ("json", "ndjson"):
+            write_json_output(result, args, compact=args.json_compact or args.format == "ndjson")
+            sys.exit(0)
+
+        write_text_output((format_available_numbers(result),), args, announce=False)
+        sys.exit(0)
+    except Exception as e:
+        print(f"Error finding available numbers: {e}", file=sys.stderr)
+        if args.verbose:
+            import traceback
+            traceback.print_exc()
+        sys.exit(1)
+
+
+def run_complete_route(args, parser):
+    """Handle the complete-route subcommand."""
+    from .api_client import get_default_client, APIError, ConnectionError, AuthenticationError, APIResponseError
+
+    config = make_config(args)
+
+    # Query API for complete route
+    try:
+        client = get_default_client(config)
+        route = client.get_complete_route(
+            rutenummer=args.rutenummer,
+            include_geometry=not args.no_geometry,
+            include_segments=args.include_segments,
+            include_endpoint_names=not args.no_endpoint_names
+        )
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    except ConnectionError as e:
+        print(f"Connection error: {e}", file=sys.stderr)
+        if args.verbose:
+            print(f"API URL: {config.api_url}", file=sys.stderr)
+        sys.exit(1)
+    except AuthenticationError as e:
+        print(f"Authentication error: {e}", file=sys.stderr)
+        sys.exit(1)
+    except APIResponseError as e:
+        if e.status_code == 404:
+            print(f"Route not found: {e}", file=sys.stderr)
+        else:
+            print(f"API error: {e}", file=sys.stderr)
+        if args.verbose and e.response:
+            print(f"Response: {e.response}", file=sys.stderr)
+        sys.exit(1)
+    except APIError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    # Format output
+    if args.format in ("json", "ndjson"):
+        # A complete route is a single object: NDJSON is one compact line
+        write_json_output(route, args, compact=args.json_compact or args.format == "ndjson")
+        sys.exit(0)
+
+    from . import formatters
+
+    output_text = getattr(formatters, COMPLETE_ROUTE_FORMATTERS[args.format])(route)
+
+    write_text_output((output_text,), args)
+
+    # Exit successfully
+    sys.exit(0)
+
+
+def read_batch_prefixes(path):
+    """
+    Read newline-delimited rutenummer prefixes for --batch ("-" reads stdin).
+
+    Blank lines and lines starting with "#" are skipped.
+
+    Args:
+        path: File path, or "-" for stdin
+
+    Returns:
+        List of prefixes in file order
+    """
+    try:
+        if path == "-":
+            lines = sys.stdin.readlines()
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+    except OSError as e:
+        print(f"Error reading batch file {path}: {e}", file=sys.stderr)
+        sys.exit(1)
+    return [line for line in map(str.strip, lines) if line and not line.startswith("#")]
+
+
+def iter_batch_segments(client, prefixes, args):
+    """
+    Query each prefix against one shared client, yielding segments in prefix order.
+
+    With --parallel N > 1 up to N prefixes are fetched concurrently (capped at the
+    session's connection pool size), while output order still follows the file.
+
+    Args:
+        client: RouteSegmentsClient shared by all queries
+        prefixes: Rutenummer prefixes to query
+        args: Parsed command line arguments
+
+    Yields:
+        Segment dictionaries
+    """
+    from .api_client import POOL_MAXSIZE
+
+    def fetch(prefix):
+        if args.all:
+            return list(client.iter_all_segments(
+                rutenummer_prefix=prefix,
+                vedlikeholdsansvarlig=args.vedlikeholdsansvarlig,
+                include_geometry=args.include_geometry
+            ))
+        return client.get_segments(
+            rutenummer_prefix=prefix,
+            vedlikeholdsansvarlig=args.vedlikeholdsansvarlig,
+            limit=args.limit,
+            offset=args.offset,
+            include_geometry=args.include_geometry
+        ).get("segments", [])
+
+    workers = min(args.parallel, POOL_MAXSIZE, len(prefixes))
+    if workers <= 1:
+        for prefix in prefixes:
+            yield from fetch(prefix)
+        return
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for segments in executor.map(fetch, prefixes):
+            yield from segments
+
+
+def run_query(args, parser):
+    """Handle the query subcommand (segments filtered by prefix and/or organization)."""
+    # Validate that at least one filter is provided
+    if not args.rutenummer_prefix and not args.vedlikeholdsansvarlig and not args.batch:
+        parser.error("At least one filter must be provided: --rutenummer-prefix, --batch or --vedlikeholdsansvarlig")
+
+    # Validate parallelism
+    if args.parallel < 1:
+        parser.error("--parallel must be >= 1")
+
+    # Validate limit
+    if args.limit < 1 or args.limit > 1000:
+        parser.error("--limit must be between 1 and 1000")
+
+    # Validate offset
+    if args.offset < 0:
+        parser.error("--offset must be >= 0")
+
+    from .api_client import get_default_client, APIError, ConnectionError, AuthenticationError, APIResponseError
+
+    config = make_config(args)
+
+    # Query API
+    try:
+        client = get_default_client(config)
+        if args.batch:
+            segments_stream = iter_batch_segments(client, read_batch_prefixes(args.batch), args)
+        elif args.all:
+            segments_stream = client.iter_all_segments(
+                rutenummer_prefix=args.rutenummer_prefix,
+                vedlikeholdsansvarlig=args.vedlikeholdsansvarlig,
+                include_geometry=args.include_geometry
+            )
+        elif args.format in ("csv", "ndjson"):
+            segments_stream = client.get_segments_stream(
+                rutenummer_prefix=args.rutenummer_prefix,
+                vedlikeholdsansvarlig=args.vedlikeholdsansvarlig,
+                limit=args.limit,
+                offset=args.offset,
+                include_geometry=args.include_geometry
+            )
+        else:
+            segments_stream = None
+            response = client.get_segments(
+                rutenummer_prefix=args.rutenummer_prefix,
+                vedlikeholdsansvarlig=args.vedlikeholdsansvarlig,
+                limit=args.limit,
+                offset=args.offset,
+                include_geometry=args.include_geometry
+            )
+
+        if segments_stream is not None:
+            if args.format in ("csv", "ndjson"):
+                # CSV/NDJSON need neither totals nor column widths, so rows are written as segments arrive
+                write_stream_output(segments_stream, args)
+                sys.exit(0)
+            all_segments = list(segments_stream)
+            response = {
+                "segments": all_segments,
+                "total": len(all_segments),
+                "limit": len(all_segments),
+                "offset": 0
+            }
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    except ConnectionError as e:
+        print(f"Connection error: {e}", file=sys.stderr)
+        if args.verbose:
+            print(f"API URL: {config.api_url}", file=sys.stderr)
+        sys.exit(1)
+    except AuthenticationError as e:
+        print(f"Authentication error: {e}", file=sys.stderr)
+        sys.exit(1)
+    except APIResponseError as e:
+        print(f"API error: {e}", file=sys.stderr)
+        if args.verbose and e.response:
+            print(f"Response: {e.response}", file=sys.stderr)
+        sys.exit(1)
+    except APIError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    # Format output
+    if args.format == "json":
+        # JSON output
+        write_json_output(response, args, compact=args.json_compact)
+        sys.exit(0)
+
+    from .formatters import format_table, format_text_summary
+
+    # Table output (default); summary and table are written separately rather than
+    # concatenated, so the (possibly large) table string is not copied again
+    output_text = format_table(response.get("segments", []), show_geometry=args.include_geometry)
+    if args.no_summary:
+        write_text_output((output_text,), args, announce=False)
+    else:
+        write_text_output((format_text_summary(response), "\n", output_text), args)
+
+    # Exit successfully
+    sys.exit(0)
+
+
+# Subcommand name -> handler
+SUBCOMMANDS = {
+    "query": run_query,
+    "complete-route": run_complete_route,
+    "find-available": run_find_available,
+    "test-point": run_test_point,
+}
+
+# Legacy mode flags -> (subcommand, number of values the flag takes)
+LEGACY_MODE_FLAGS = {
+    "--test-ruteinfopunkt": ("test-point", 2),
+    "--complete-route": ("complete-route", 1),
+    "--find-available": ("find-available", 0),
+}
+
+
+def translate_legacy_argv(argv):
+    """
+    Map the old single-parser flags (e.g. "--complete-route bre10") to a subcommand.
+
+    Arguments that already start with a subcommand (or ask for top-level help) are
+    returned unchanged; anything else without a mode flag is treated as "query".
+
+    Args:
+        argv: Command line arguments (without the program name)
+
+    Returns:
+        Argument list starting with a subcommand name
+    """
+    if not argv or argv[0] in SUBCOMMANDS or argv[0] in ("-h", "--help"):
+        return argv
+
+    argv = list(argv)
+    for i, arg in enumerate(argv):
+        flag, sep, value = arg.partition("=")
+        if flag not in LEGACY_MODE_FLAGS:
+            continue
+        command, nargs = LEGACY_MODE_FLAGS[flag]
+        if sep:
+            values = [value]
+            del argv[i]
+        else:
+            values = argv[i + 1:i + 1 + nargs]
+            del argv[i:i + 1 + nargs]
+        return [command, *values, *argv]
+    return ["query", *argv]
+
+
+def build_parser():
+    """
+    Build the argument parser with one subcommand per mode.
+
+    Returns:
+        argparse.ArgumentParser
+    """
     parser = argparse.ArgumentParser(
         description='Query route segments from Stiflyt backend API',
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 Examples:
   # Query segments with rutenummer starting with "bre" and vedlikeholdsansvarlig "DNT Oslo"
-  %(prog)s --rutenummer-prefix bre --vedlikeholdsansvarlig "DNT Oslo"
+  %(prog)s query --rutenummer-prefix bre --vedlikeholdsansvarlig "DNT Oslo"
 
   # Query with just rutenummer prefix
-  %(prog)s --rutenummer-prefix bre
+  %(prog)s query --rutenummer-prefix bre
 
   # Get complete route (combines all segments)
-  %(prog)s --complete-route bre10
+  %(prog)s complete-route bre10
 
   # Complete route with JSON output
-  %(prog)s --complete-route bre10 --format json
+  %(prog)s complete-route bre10 --format json
 
   # Complete route without geometry
-  %(prog)s --complete-route bre10 --no-geometry
+  %(prog)s complete-route bre10 --no-geometry
 
   # Complete route with segment details
-  %(prog)s --complete-route bre10 --include-segments
+  %(prog)s complete-route bre10 --include-segments
 
   # JSON output
-  %(prog)s --rutenummer-prefix bre --vedlikeholdsansvarlig "DNT Oslo" --format json
+  %(prog)s query --rutenummer-prefix bre --vedlikeholdsansvarlig "DNT Oslo" --format json
 
   # CSV output with geometry
-  %(prog)s --rutenummer-prefix bre --vedlikeholdsansvarlig "DNT Oslo" --format csv --include-geometry --output results.csv
+  %(prog)s query --rutenummer-prefix bre --vedlikeholdsansvarlig "DNT Oslo" --format csv --include-geometry --output results.csv
 
   # Custom API URL
-  %(prog)s --rutenummer-prefix bre --api-url http://production.example.com/api/v1
+  %(prog)s query --rutenummer-prefix bre --api-url http://production.example.com/api/v1
 
   # Pagination
-  %(prog)s --rutenummer-prefix bre --limit 50 --offset 100
+  %(prog)s query --rutenummer-prefix bre --limit 50 --offset 100
+
+  # All matching segments (pages fetched in parallel)
+  %(prog)s query --rutenummer-prefix bre --all --format csv --output bre.csv
+
+  # Batch of prefixes from a file, 4 at a time, streamed as CSV
+  %(prog)s query --batch prefixes.txt --parallel 4 --format csv --output batch.csv
 
   # Find available route numbers
-  %(prog)s --rutenummer-prefix bre --find-available
+  %(prog)s find-available --rutenummer-prefix bre
 
   # Test ruteinfopunkt lookup (debug)
-  %(prog)s --test-ruteinfopunkt 7.710764899 61.809237843 --rutenummer bre9
+  %(prog)s test-point 7.710764899 61.809237843 --rutenummer-prefix bre9
+
+The old flag style (e.g. "--complete-route bre10", "--find-available") is still accepted.
         """
     )
 
-    # Complete route mode
-    parser.add_argument(
-        '--complete-route',
+    # Shared option groups, attached to the subcommands that need them
+    api_options = argparse.ArgumentParser(add_help=False)
+    api_group = api_options.add_argument_group('API connection')
+    api_group.add_argument(
+        '--api-url',
         type=str,
-        metavar='RUTENUMMER',
-        help='Get complete route by combining all segments with the same rutenummer (e.g., "bre10")'
+        help='API base URL (default: http://localhost:8000/api/v1 or STIFLYT_API_URL env var)'
+    )
+    api_group.add_argument(
+        '--username',
+        type=str,
+        help='HTTP Basic Auth username (or STIFLYT_USERNAME env var)'
+    )
+    api_group.add_argument(
+        '--password',
+        type=str,
+        help='HTTP Basic Auth password (or STIFLYT_PASSWORD env var)'
+    )
+    api_group.add_argument(
+        '--timeout',
+        type=int,
+        default=30,
+        help='Read timeout in seconds (default: 30); connecting gives up after about 3 seconds'
     )
 
-    # Filters (at least one required for segment query mode)
-    parser.add_argument(
+    output_options = argparse.ArgumentParser(add_help=False)
+    output_group = output_options.add_argument_group('output')
+    output_group.add_argument(
+        '--output',
+        type=Path,
+        help='Write output to file instead of stdout'
+    )
+    output_group.add_argument(
+        '--json-compact',
+        action='store_true',
+        help='Emit compact JSON without indentation (json format only; faster and smaller when piping)'
+    )
+    output_group.add_argument(
+        '--verbose',
+        action='store_true',
+        help='Show verbose error messages'
+    )
+
+    subparsers = parser.add_subparsers(dest='cmd', metavar='COMMAND')
+    subparsers.required = True
+
+    # Segment query
+    query_parser = subparsers.add_parser(
+        'query',
+        parents=[api_options, output_options],
+        help='Query route segments by rutenummer prefix and/or vedlikeholdsansvarlig'
+    )
+    filter_group = query_parser.add_argument_group('filters (at least one required)')
+    prefix_group = filter_group.add_mutually_exclusive_group()
+    prefix_group.add_argument(
         '--rutenummer-prefix',
         type=str,
         help='Filter by route number prefix (e.g., "bre")'
     )
-    parser.add_argument(
+    prefix_group.add_argument(
+        '--batch',
+        type=str,
+        metavar='FILE',
+        help='Query every prefix listed in FILE (one per line, "-" for stdin) over one connection pool'
+    )
+    filter_group.add_argument(
         '--vedlikeholdsansvarlig',
         type=str,
         help='Filter by organization (e.g., "DNT Oslo")'
     )
-
-    # Output options
-    parser.add_argument(
+    query_parser.add_argument(
         '--format',
-        choices=['json', 'table', 'csv'],
+        choices=['json', 'table', 'csv', 'ndjson'],
         default='table',
-        help='Output format (default: table)'
+        help='Output format (default: table); ndjson streams one segment per line'
     )
-    parser.add_argument(
+    query_parser.add_argument(
         '--include-geometry',
         action='store_true',
         help='Include GeoJSON geometry in response (only for JSON format)'
     )
-    parser.add_argument(
-        '--no-geometry',
-        action='store_true',
-        help='Exclude GeoJSON geometry from response (for complete route mode)'
-    )
-    parser.add_argument(
-        '--include-segments',
-        action='store_true',
-        help='Include individual segment details (for complete route mode)'
-    )
-    parser.add_argument(
-        '--no-endpoint-names',
-        action='store_true',
-        help='Skip lookup of from/to place names (for complete route mode)'
-    )
-    parser.add_argument(
-        '--output',
-        type=Path,
-        help='Write output to file instead of stdout'
-    )
-    parser.add_argument(
+    query_parser.add_argument(
         '--no-summary',
         action='store_true',
         help='Do not show summary information (table format only)'
     )
-
-    # Pagination
-    parser.add_argument(
+    pagination_group = query_parser.add_argument_group('pagination')
+    pagination_group.add_argument(
         '--limit',
         type=int,
         default=100,
         help='Maximum number of results (default: 100, max: 1000)'
     )
-    parser.add_argument(
+    pagination_group.add_argument(
         '--offset',
         type=int,
         default=0,
         help='Offset for pagination (default: 0)'
     )
+    pagination_group.add_argument(
+        '--all',
+        action='store_true',
+        help='Fetch all matching segments (pages are fetched in parallel; ignores --limit/--offset)'
+    )
+    query_parser.add_argument(
+        '--parallel',
+        type=int,
+        default=1,
+        metavar='N',
+        help='Number of --batch prefixes to query concurrently (default: 1)'
+    )
 
-    # Configuration
-    parser.add_argument(
-        '--api-url',
-        type=str,
-        help='API base URL (default: http://localhost:8000/api/v1 or STIFLYT_API_URL env var)'
+    # Complete route
+    complete_parser = subparsers.add_parser(
+        'complete-route',
+        parents=[api_options, output_options],
+        help='Get complete route by combining all segments with the same rutenummer'
     )
-    parser.add_argument(
-        '--username',
-        type=str,
-        help='HTTP Basic Auth username (or STIFLYT_USERNAME env var)'
+    complete_parser.add_argument(
+        'rutenummer',
+        metavar='RUTENUMMER',
+        help='Route number (e.g., "bre10")'
     )
-    parser.add_argument(
-        '--password',
-        type=str,
-        help='HTTP Basic Auth password (or STIFLYT_PASSWORD env var)'
+    complete_parser.add_argument(
+        '--format',
+        choices=['json', 'table', 'csv', 'ndjson'],
+        default='table',
+        help='Output format (default: table)'
     )
-    parser.add_argument(
-        '--timeout',
-        type=int,
-        default=30,
-        help='Request timeout in seconds (default: 30)'
+    complete_parser.add_argument(
+        '--no-geometry',
+        action='store_true',
+        help='Exclude GeoJSON geometry from response'
     )
-
-    # Verbosity
-    parser.add_argument(
-        '--verbose',
+    complete_parser.add_argument(
+        '--include-segments',
         action='store_true',
-        help='Show verbose error messages'
+        help='Include individual segment details'
     )
-
-    # Find available numbers
-    parser.add_argument(
-        '--find-available',
+    complete_parser.add_argument(
+        '--no-endpoint-names',
         action='store_true',
-        help='Find available route numbers for the given prefix (requires --rutenummer-prefix)'
+        help='Skip lookup of from/to place names'
+    )
+
+    # Find available numbers (reads the database directly). The API options are
+    # accepted and ignored, as they were with the old "--find-available" flag
+    available_parser = subparsers.add_parser(
+        'find-available',
+        parents=[api_options, output_options],
+        help='Find available route numbers for a prefix (requires database access)'
+    )
+    available_parser.add_argument(
+        '--rutenummer-prefix',
+        type=str,
+        required=True,
+        help='Route number prefix, exactly 3 letters (e.g., "bre")'
+    )
+    available_parser.add_argument(
+        '--format',
+        choices=['json', 'table', 'csv', 'ndjson'],
+        default='table',
+        help='Output format (default: table); csv prints the table'
     )
 
-    # Debug/test options
-    parser.add_argument(
-        '--test-ruteinfopunkt',
-        nargs=2,
-        metavar=('LON', 'LAT'),
-        help='Test ruteinfopunkt lookup for given coordinates (lon lat)'
+    # Debug: name lookup for a coordinate (reads the database directly; API options ignored)
+    test_parser = subparsers.add_parser(
+        'test-point',
+        parents=[api_options],
+        help='Test ruteinfopunkt/stedsnavn name lookup for a coordinate (debug, requires database access)'
     )
-    parser.add_argument(
-        '--test-radius',
+    test_parser.add_argument('lon', type=float, metavar='LON', help='Longitude (WGS84)')
+    test_parser.add_argument('lat', type=float, metavar='LAT', help='Latitude (WGS84)')
+    test_parser.add_argument(
+        '--test-radius', '--radius',
+        dest='test_radius',
         type=float,
         default=500.0,
-        help='Search radius in meters for test-ruteinfopunkt (default: 500.0)'
-    )
-
-    args = parser.parse_args()
-
-    # Handle test-ruteinfopunkt mode
-    if args.test_ruteinfopunkt:
-        try:
-            lon = float(args.test_ruteinfopunkt[0])
-            lat = float(args.test_ruteinfopunkt[1])
-        except ValueError:
-            parser.error("--test-ruteinfopunkt requires valid numeric coordinates (lon lat)")
-
-        from services.database import db_connection
-        from services.route_endpoints import lookup_name_in_ruteinfopunkt, lookup_name_in_stedsnavn, lookup_name_in_anchor_nodes
-        import json
-
-        print(f"Testing name lookup for point: ({lon}, {lat})")
-        print(f"Search radius: {args.test_radius} m")
-        if args.rutenummer_prefix:
-            print(f"Filtering by rutenummer: {args.rutenummer_prefix}*")
-        print("")
-
-        with db_connection() as conn:
-            # Test anchor nodes
-            print("1. Checking anchor_nodes...")
-            anchor_result = lookup_name_in_anchor_nodes(conn, lon, lat, search_radius_meters=args.test_radius)
-            if anchor_result:
-                print(f"   ✓ Found: {anchor_result.get('name')} (source: {anchor_result.get('source')}, distance: {anchor_result.get('distance_meters'):.2f} m)")
-            else:
-                print("   ✗ Not found")
-
-            # Test ruteinfopunkt
-            print("\n2. Checking ruteinfopunkt...")
-            rutenummer = args.rutenummer_prefix if args.rutenummer_prefix else None
-            # Check if view exists and has data
-            from services.database import ROUTE_SCHEMA
-            from psycopg.rows import dict_row
-            with conn.cursor(row_factory=dict_row) as cur:
-                cur.execute("""
-                    SELECT EXISTS (
-                        SELECT FROM information_schema.views
-                        WHERE table_schema = %s AND table_name = 'ruteinfopunkt'
-                    ) as exists
-                """, (ROUTE_SCHEMA,))
-                result = cur.fetchone()
-                view_exists = result.get('exists') if result else False
-                print(f"   View exists: {view_exists}")
-
-                if view_exists:
-                    # Count total ruteinfopunkt
-                    cur.execute(f"SELECT COUNT(*) as count FROM {ROUTE_SCHEMA}.ruteinfopunkt")
-                    result = cur.fetchone()
-                    total_count = result['count'] if result else 0
-                    print(f"   Total ruteinfopunkt in view: {total_count}")
-
-                    # Count with names (using informasjon column)
-                    cur.execute(f"SELECT COUNT(*) as count FROM {ROUTE_SCHEMA}.ruteinfopunkt WHERE informasjon IS NOT NULL")
-                    result = cur.fetchone()
-                    with_names = result['count'] if result else 0
-                    print(f"   Ruteinfopunkt with informasjon: {with_names}")
-
-                    # Try query (filtered to hytter and parkering only, prioritized)
-                    filter_values = ['12', '42', '43', '44', '22']
-                    cur.execute(f"""
-                        SELECT
-                            objid,
-                            informasjon as navn,
-                            tilrettelegging,
-                            ST_Distance(
-                                ST_Transform(ST_SetSRID(ST_MakePoint(%s, %s), 4326), 25833),
-                                ST_Transform(posisjon::geometry, 25833)
-                            ) as distance_meters
-                        FROM {ROUTE_SCHEMA}.ruteinfopunkt
-                        WHERE ST_DWithin(
-                            ST_Transform(posisjon::geometry, 25833),
-                            ST_Transform(ST_SetSRID(ST_MakePoint(%s, %s), 4326), 25833),
-                            %s
-                        )
-                        AND informasjon IS NOT NULL
-                        AND tilrettelegging = ANY(%s)
-                        ORDER BY
-                            CASE
-                                WHEN tilrettelegging IN ('12', '42', '43', '44') THEN 1  -- Hytter first
-                                WHEN tilrettelegging = '22' THEN 2  -- Parkeringsplass last
-                                ELSE 3
-                            END,
-                            distance_meters ASC
-                        LIMIT 5
-                    """, (lon, lat, lon, lat, args.test_radius, filter_values))
-                    results = cur.fetchall()
-                    print(f"   Found {len(results)} ruteinfopunkt (hytter/parkering only) within {args.test_radius}m:")
-                    for r in results:
-                        tilrettelegging = r.get('tilrettelegging', 'N/A')
-                        print(f"     - objid: {r.get('objid')}, navn: {r.get('navn')}, tilrettelegging: {tilrettelegging}, distance: {r.get('distance_meters'):.2f} m")
-
-            ruteinfopunkt_result = lookup_name_in_ruteinfopunkt(conn, lon, lat, rutenummer, search_radius_meters=args.test_radius)
-            if ruteinfopunkt_result:
-                print(f"   ✓ Found: {ruteinfopunkt_result.get('name')} (source: {ruteinfopunkt_result.get('source')}, distance: {ruteinfopunkt_result.get('distance_meters'):.2f} m)")
-            else:
-                print("   ✗ Not found")
-
-            # Test stedsnavn
-            print("\n3. Checking stedsnavn...")
-            stedsnavn_result = lookup_name_in_stedsnavn(conn, lon, lat, search_radius_meters=args.test_radius)
-            if stedsnavn_result:
-                print(f"   ✓ Found: {stedsnavn_result.get('name')} (source: {stedsnavn_result.get('source')}, distance: {stedsnavn_result.get('distance_meters'):.2f} m)")
-            else:
-                print("   ✗ Not found")
-
-            # Test combined lookup
-            print("\n4. Combined lookup (lookup_endpoint_name)...")
-            from services.route_endpoints import lookup_endpoint_name
-            combined_result = lookup_endpoint_name(conn, lon, lat, rutenummer)
-            if combined_result:
-                print(f"   ✓ Result: {combined_result.get('name')} (source: {combined_result.get('source')}, distance: {combined_result.get('distance_meters'):.2f} m)")
-            else:
-                print("   ✗ Not found")
-
-            if args.format == "json":
-                result = {
-                    "coordinates": [lon, lat],
-                    "search_radius_meters": args.test_radius,
-                    "rutenummer_filter": rutenummer,
-                    "anchor_node": anchor_result,
-                    "ruteinfopunkt": ruteinfopunkt_result,
-                    "stedsnavn": stedsnavn_result,
-                    "combined_result": combined_result
-                }
-                print("\n" + json.dumps(result, indent=2, ensure_ascii=False))
-
-        sys.exit(0)
-
-    # Handle find-available mode
-    if args.find_available:
-        if not args.rutenummer_prefix:
-            parser.error("--find-available requires --rutenummer-prefix")
-
-        # Validate prefix format (3 letters)
-        if len(args.rutenummer_prefix) != 3 or not args.rutenummer_prefix.isalpha():
-            parser.error("--rutenummer-prefix must be exactly 3 letters (e.g., 'bre')")
-
-        try:
-            result = analyze_available_numbers(args.rutenummer_prefix.lower())
-            output = format_available_numbers(result)
-
-            if args.format == "json":
-                import json
-                output = json.dumps(result, indent=2, ensure_ascii=False)
-
-            if args.output:
-                with open(args.output, 'w', encoding='utf-8') as f:
-                    f.write(output)
-            else:
-                print(output)
-
-            sys.exit(0)
-        except Exception as e:
-            print(f"Error finding available numbers: {e}", file=sys.stderr)
-            if args.verbose:
-                import traceback
-                traceback.print_exc()
-            sys.exit(1)
-
-    # Handle complete route mode
-    if args.complete_route:
-        # Complete route mode - validate arguments
-        if args.rutenummer_prefix or args.vedlikeholdsansvarlig:
-            parser.error("--complete-route cannot be used with --rutenummer-prefix or --vedlikeholdsansvarlig")
-
-        # Create configuration
-        config = CLIConfig(
-            api_url=args.api_url,
-            username=args.username,
-            password=args.password,
-            timeout=args.timeout
-        )
-
-        # Create API client
-        client = RouteSegmentsClient(config)
-
-        # Query API for complete route
-        try:
-            route = client.get_complete_route(
-                rutenummer=args.complete_route,
-                include_geometry=not args.no_geometry,
-                include_segments=args.include_segments,
-                include_endpoint_names=not args.no_endpoint_names
-            )
-        except ValueError as e:
-            print(f"Error: {e}", file=sys.stderr)
-            sys.exit(1)
-        except ConnectionError as e:
-            print(f"Connection error: {e}", file=sys.stderr)
-            if args.verbose:
-                print(f"API URL: {config.api_url}", file=sys.stderr)
-            sys.exit(1)
-        except AuthenticationError as e:
-            print(f"Authentication error: {e}", file=sys.stderr)
-            sys.exit(1)
-        except APIResponseError as e:
-            if e.status_code == 404:
-                print(f"Route not found: {e}", file=sys.stderr)
-            else:
-                print(f"API error: {e}", file=sys.stderr)
-            if args.verbose and e.response:
-                print(f"Response: {e.response}", file=sys.stderr)
-            sys.exit(1)
-        except APIError as e:
-            print(f"Error: {e}", file=sys.stderr)
-            sys.exit(1)
-
-        # Format output
-        if args.format == "json":
-            output_text = format_json(route)
-        elif args.format == "csv":
-            output_text = format_complete_route_csv(route)
-        else:
-            # Table output (default)
-            output_text = format_complete_route_table(route)
-
-        # Write output
-        if args.output:
-            try:
-                with open(args.output, 'w', encoding='utf-8') as f:
-                    f.write(output_text)
-                if args.format != "json":
-                    print(f"Results written to {args.output}", file=sys.stderr)
-            except Exception as e:
-                print(f"Error writing to file {args.output}: {e}", file=sys.stderr)
-                sys.exit(1)
-        else:
-            print(output_text)
-
-        # Exit successfully
-        sys.exit(0)
-
-    # Segment query mode - validate that at least one filter is provided
-    if not args.rutenummer_prefix and not args.vedlikeholdsansvarlig:
-        parser.error("At least one filter must be provided: --rutenummer-prefix or --vedlikeholdsansvarlig")
-
-    # Validate limit
-    if args.limit < 1 or args.limit > 1000:
-        parser.error("--limit must be between 1 and 1000")
-
-    # Validate offset
-    if args.offset < 0:
-        parser.error("--offset must be >= 0")
-
-    # Create configuration
-    config = CLIConfig(
-        api_url=args.api_url,
-        username=args.username,
-        password=args.password,
-        timeout=args.timeout
+        help='Search radius in meters (default: 500.0)'
+    )
+    test_parser.add_argument(
+        '--rutenummer-prefix',
+        type=str,
+        help='Filter by rutenummer'
+    )
+    test_parser.add_argument(
+        '--format',
+        choices=['json', 'table', 'csv'],
+        default='table',
+        help='Also print the results as JSON (default: table); csv prints the table only'
     )
 
-    # Create API client
-    client = RouteSegmentsClient(config)
-
-    # Query API
-    try:
-        response = client.get_segments(
-            rutenummer_prefix=args.rutenummer_prefix,
-            vedlikeholdsansvarlig=args.vedlikeholdsansvarlig,
-            limit=args.limit,
-            offset=args.offset,
-            include_geometry=args.include_geometry
-        )
-    except ValueError as e:
-        print(f"Error: {e}", file=sys.stderr)
-        sys.exit(1)
-    except ConnectionError as e:
-        print(f"Connection error: {e}", file=sys.stderr)
-        if args.verbose:
-            print(f"API URL: {config.api_url}", file=sys.stderr)
-        sys.exit(1)
-    except AuthenticationError as e:
-        print(f"Authentication error: {e}", file=sys.stderr)
-        sys.exit(1)
-    except APIResponseError as e:
-        print(f"API error: {e}", file=sys.stderr)
-        if args.verbose and e.response:
-            print(f"Response: {e.response}", file=sys.stderr)
-        sys.exit(1)
-    except APIError as e:
-        print(f"Error: {e}", file=sys.stderr)
-        sys.exit(1)
-
-    # Format output
-    segments = response.get("segments", [])
-    output_lines = []
+    return parser
 
-    if args.format == "json":
-        # JSON output
-        output_lines.append(format_json(response))
-    elif args.format == "csv":
-        # CSV output
-        output_lines.append(format_csv(segments, include_geometry=args.include_geometry))
-    else:
-        # Table output (default)
-        if not args.no_summary:
-            output_lines.append(format_text_summary(response))
-        output_lines.append(format_table(segments, show_geometry=args.include_geometry))
-
-    output_text = "\n".join(output_lines)
-
-    # Write output
-    if args.output:
-        try:
-            with open(args.output, 'w', encoding='utf-8') as f:
-                f.write(output_text)
-            if not args.format == "json" and not args.no_summary:
-                print(f"Results written to {args.output}", file=sys.stderr)
-        except Exception as e:
-            print(f"Error writing to file {args.output}: {e}", file=sys.stderr)
-            sys.exit(1)
-    else:
-        print(output_text)
 
-    # Exit successfully
-    sys.exit(0)
+def main(argv=None):
+    """Main CLI entry point."""
+    parser = build_parser()
+    args = parser.parse_args(translate_legacy_argv(sys.argv[1:] if argv is None else argv))
+    SUBCOMMANDS[args.cmd](args, parser)
 
 
 if __name__ == '__main__':
     main()
-
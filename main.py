@@ -1,38 +1,55 @@
 """FastAPI application main entry point."""
+import asyncio
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from pathlib import Path
 from api.routes import router
 from services.startup_checks import run_startup_checks
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    One-time startup work before serving requests.
+
+    - Runs database validation and aborts if required tables are missing, so we
+      fail fast if the database import is incomplete or inconsistent.
+    - Builds the OpenAPI schema up front so the first /docs or /openapi.json
+      request doesn't pay for generating it.
+    """
+    # This function raises RuntimeError if validation fails, which prevents the app from starting
+    await asyncio.to_thread(run_startup_checks)
+    app.openapi()
+    yield
+
+
 app = FastAPI(
     title="Stiflyt Route API",
     description="Backend API for processing routes from turrutebasen and mapping matrikkelenhet",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
-
-@app.on_event("startup")
-async def startup_event() -> None:
-    """
-    Run database validation on startup and abort if required tables are missing.
-
-    This ensures we fail fast if the database import is incomplete or inconsistent.
-    """
-    # This function raises RuntimeError if validation fails, which prevents the app from starting
-    run_startup_checks()
+# Comma-separated allowed origins (e.g. "https://stiflyt.example.org"); "*" allows any.
+# An explicit list lets the CORS middleware answer from a set lookup per request.
+CORS_ORIGINS = [origin.strip() for origin in os.getenv("CORS_ORIGINS", "*").split(",") if origin.strip()]
 
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # In production, specify exact origins
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+# Compress responses (GeoJSON payloads compress very well)
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=6)
+
 app.include_router(router, prefix="/api/v1", tags=["routes"])
 
 # Serve frontend static files
@@ -49,11 +66,14 @@ if frontend_path.exists():
     if images_path.exists():
         app.mount("/images", StaticFiles(directory=str(images_path)), name="images")
 
+    # Checked once at startup instead of with a stat() on every request
+    index_path = frontend_path / "index.html"
+    index_exists = index_path.exists()
+
     @app.get("/")
     async def serve_frontend():
         """Serve frontend index.html."""
-        index_path = frontend_path / "index.html"
-        if index_path.exists():
+        if index_exists:
             return FileResponse(str(index_path))
         return {"message": "Stiflyt Route API", "version": "0.1.0", "docs": "/docs"}
 
@@ -1,4 +1,13 @@
 """Matrikkel integration package."""
-from .matrikkel_client import MatrikkelClient, MatrikkelConfig, MatrikkelIdent, OwnerInfo
 
 __all__ = ['MatrikkelClient', 'MatrikkelConfig', 'MatrikkelIdent', 'OwnerInfo']
+
+
+# Imported lazily on first access using __getattr__: matrikkel_client pulls in
+# zeep/lxml/requests, which `matrikkel-cli --help` does not need
+def __getattr__(name):
+    """Lazy import of the client classes."""
+    if name in __all__:
+        from . import matrikkel_client
+        return getattr(matrikkel_client, name)
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
@@ -9,33 +9,76 @@ import argparse
 import sys
 import json
 import csv
-from typing import List, Dict, Any, Optional, Tuple
+import textwrap
+from datetime import date, time
+from itertools import chain, islice
+from operator import attrgetter
+from typing import TYPE_CHECKING, List, Dict, Any, Iterable, Iterator, Optional, TextIO, Tuple
 from pathlib import Path
 import os
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+try:
+    import orjson
+except ImportError:  # Optional: fall back to the stdlib json module
+    orjson = None
 
-from matrikkel.matrikkel_client import (
-    MatrikkelClient,
-    MatrikkelConfig,
-    MatrikkelIdent,
-    OwnerInfo
-)
-from services.matrikkel_owner_service import (
-    parse_matrikkelenhet_string,
-    get_matrikkel_config
-)
+if TYPE_CHECKING:
+    from matrikkel.matrikkel_client import MatrikkelClient, MatrikkelConfig, MatrikkelIdent, OwnerInfo
 
+# The Matrikkel client (zeep, lxml, requests) and dotenv are imported lazily,
+# only once a lookup actually runs, so --help and argument errors return fast
 
-def serialize_zeep_object(obj: Any, max_depth: int = 3, current_depth: int = 0) -> Any:
+# Number of idents looked up (and written out) at a time in batch mode
+BATCH_CHUNK_SIZE = 100
+
+# OwnerInfo fields copied into each result's owners list, in output order
+OWNER_FIELDS = ('navn', 'adresse', 'eierId', 'fraDato', 'tilDato', 'andel', 'eierforhold_type')
+_get_owner_fields = attrgetter(*OWNER_FIELDS)
+
+
+def _json_default(value: Any) -> Any:
+    """Encode values JSON cannot represent: dates as ISO 8601, anything else with str()."""
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    return str(value)
+
+
+def dumps_json(data: Any) -> str:
+    """Serialize data as indented JSON, with orjson when it is installed.
+
+    Raw zeep dumps are deeply nested; orjson encodes them much faster than
+    the stdlib encoder. Both encoders use _json_default for values JSON
+    cannot represent, so dates are written in ISO 8601 (e.g.
+    "2020-01-02T03:04:05") and Decimals with str() either way.
+
+    Args:
+        data: Data to serialize
+
+    Returns:
+        JSON string indented by 2 spaces
+    """
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        return orjson.dumps(data, default=_json_default, option=option).decode()
+    return json.dumps(data, indent=2, ensure_ascii=False, default=_json_default)
+
+
+def serialize_zeep_object(
+    obj: Any,
+    max_depth: int = 3,
+    current_depth: int = 0,
+    _cache: Optional[Dict[Tuple[int, int], Any]] = None
+) -> Any:
     """Recursively serialize a zeep object to show all its data.
 
     Args:
         obj: The object to serialize
         max_depth: Maximum recursion depth
         current_depth: Current recursion depth
+        _cache: Serialized objects keyed by (id, remaining depth), so sub-objects
+            shared between several parents are only walked once. Pass the same
+            dict to several calls to share it; the objects must stay alive
+            while it is in use.
 
     Returns:
         Serialized representation (dict, list, or primitive)
@@ -43,50 +86,53 @@ def serialize_zeep_object(obj: Any, max_depth: int = 3, current_depth: int = 0)
     if current_depth >= max_depth:
         return str(obj)
 
-    if obj is None:
-        return None
+    if _cache is None:
+        _cache = {}
+
+    # Fast path: exact type checks for the common leaf and container types
+    t = type(obj)
+    if obj is None or t is str or t is int or t is float or t is bool:
+        return obj
+    if t is list or t is tuple:
+        return [serialize_zeep_object(item, max_depth, current_depth + 1, _cache) for item in obj]
 
-    # Handle primitives
+    # Handle subclasses of primitives (e.g. enums)
     if isinstance(obj, (str, int, float, bool)):
         return obj
 
-    # Handle lists and tuples
+    # Handle subclasses of lists and tuples
     if isinstance(obj, (list, tuple)):
-        return [serialize_zeep_object(item, max_depth, current_depth + 1) for item in obj]
-
-    # Handle zeep objects and other complex objects
-    if hasattr(obj, '__dict__') or hasattr(obj, '__class__'):
-        result = {}
-
-        # Try to get all attributes
-        for attr in dir(obj):
-            if attr.startswith('_'):
-                continue
-
-            try:
-                value = getattr(obj, attr)
-                if callable(value):
-                    continue
-
-                # Recursively serialize
-                result[attr] = serialize_zeep_object(value, max_depth, current_depth + 1)
-            except Exception:
-                # Skip attributes that can't be accessed
-                continue
-
-        # Also try to access as dict if it's a zeep object
-        try:
-            if hasattr(obj, '__dict__'):
-                for key, value in obj.__dict__.items():
-                    if not key.startswith('_'):
-                        result[key] = serialize_zeep_object(value, max_depth, current_depth + 1)
-        except Exception:
-            pass
-
-        return result
+        return [serialize_zeep_object(item, max_depth, current_depth + 1, _cache) for item in obj]
+
+    # The result only depends on the object and how much depth is left
+    cache_key = (id(obj), max_depth - current_depth)
+    if cache_key in _cache:
+        return _cache[cache_key]
+
+    # Handle zeep objects and other complex objects. zeep CompoundValue keeps
+    # its fields in __values__; plain objects use __dict__ or __slots__.
+    # Reading the field dict directly avoids a dir()/getattr()/callable() scan
+    # per attribute (and serializing __dict__ entries a second time).
+    fields = getattr(obj, '__values__', None)
+    if fields is None and isinstance(obj, dict):
+        fields = obj
+    if fields is None:
+        fields = getattr(obj, '__dict__', None)
+    if fields is None and hasattr(obj, '__slots__'):
+        fields = {slot: getattr(obj, slot) for slot in obj.__slots__ if hasattr(obj, slot)}
+
+    if fields is not None:
+        result = {
+            key: serialize_zeep_object(value, max_depth, current_depth + 1, _cache)
+            for key, value in fields.items()
+            if not key.startswith('_')
+        }
+    else:
+        # Fallback to string representation
+        result = str(obj)
 
-    # Fallback to string representation
-    return str(obj)
+    _cache[cache_key] = result
+    return result
 
 
 def extract_matrikkelenhet_data(matrikkelenhet_obj: Any) -> Dict[str, Any]:
@@ -98,49 +144,16 @@ def extract_matrikkelenhet_data(matrikkelenhet_obj: Any) -> Dict[str, Any]:
     Returns:
         Dictionary with all available fields from the object
     """
-    data = {}
-
     if not matrikkelenhet_obj:
-        return data
+        return {}
 
-    # Common attributes to check
-    attributes_to_check = [
-        'id', 'kommune', 'gardsnummer', 'bruksnummer', 'festenummer', 'seksjonsnummer',
-        'bruksnavn', 'matrikkelnummertekst', 'arealmerknadtekst', 'lagretberegnetareal',
-        'geometri', 'koordinater', 'eierforhold', 'status', 'oppdatert', 'opprettet'
-    ]
-
-    # Try to extract all attributes
-    for attr in dir(matrikkelenhet_obj):
-        if attr.startswith('_'):
-            continue
-
-        try:
-            value = getattr(matrikkelenhet_obj, attr)
-            if not callable(value):
-                # Try to serialize the value
-                if hasattr(value, '__dict__'):
-                    # Complex object - try to convert to dict
-                    try:
-                        value = {k: v for k, v in value.__dict__.items() if not k.startswith('_')}
-                    except:
-                        value = str(value)
-                elif isinstance(value, (list, tuple)):
-                    # List - try to serialize items
-                    try:
-                        value = [str(item) for item in value]
-                    except:
-                        value = str(value)
-
-                data[attr] = value
-        except Exception:
-            # Skip attributes that can't be accessed
-            continue
+    # zeep walks the WSDL field list itself and keeps dates/decimals typed
+    from zeep.helpers import serialize_object
 
-    return data
+    return serialize_object(matrikkelenhet_obj, dict) or {}
 
 
-def format_matrikkelenhet_string(ident: MatrikkelIdent) -> str:
+def format_matrikkelenhet_string(ident: "MatrikkelIdent") -> str:
     """Format MatrikkelIdent as a string.
 
     Args:
@@ -157,9 +170,75 @@ def format_matrikkelenhet_string(ident: MatrikkelIdent) -> str:
     return "/".join(parts) if len(parts) > 1 else parts[0]
 
 
+def fetch_matrikkelenhet_details(
+    client: "MatrikkelClient",
+    matrikkel_id_value: int,
+    verbose: bool = False,
+    raw: bool = False
+) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """Fetch the full Matrikkelenhet object and build verbose and/or raw data.
+
+    Args:
+        client: Open MatrikkelClient
+        matrikkel_id_value: Numeric matrikkelenhet ID
+        verbose: If True, extract all available data from the Matrikkelenhet object
+        raw: If True, include raw API objects (Matrikkelenhet, eierforhold, Person)
+
+    Returns:
+        Tuple of (verbose_data, raw_data); each is None if not requested
+
+    Raises:
+        Exception: If the Matrikkelenhet object cannot be fetched
+    """
+    store_client = client._get_store_client()
+    matrikkel_id_obj = client._make_matrikkelenhet_id(matrikkel_id_value)
+
+    ctx = client._get_store_context()
+    matrikkelenhet_obj = store_client.service.getObject(matrikkel_id_obj, ctx)
+
+    verbose_data = extract_matrikkelenhet_data(matrikkelenhet_obj) if verbose else None
+
+    raw_data = None
+    if raw:
+        # One cache for all raw dumps: eierforhold and persons share sub-objects
+        cache = {}
+        raw_data = {
+            'matrikkelenhet_raw': serialize_zeep_object(matrikkelenhet_obj, max_depth=5, _cache=cache),
+            'eierforhold_raw': [],
+            'person_raw': []
+        }
+
+        # Extract eierforhold (owner relationships) - raw
+        eierforhold_list = client._get_field(matrikkelenhet_obj, 'eierforhold', 'getEierforhold')
+
+        if eierforhold_list:
+            items = client._extract_list_items(eierforhold_list)
+            eier_ids = []
+            for eierforhold in items:
+                # Serialize eierforhold
+                raw_data['eierforhold_raw'].append(serialize_zeep_object(eierforhold, max_depth=5, _cache=cache))
+
+                # Get eierId; Person objects are fetched below in one call
+                eier_id = client._get_field(eierforhold, 'eierId', 'getEierId')
+
+                if eier_id:
+                    eier_ids.append(eier_id)
+
+            for eier_id, person in zip(eier_ids, client.get_objects(eier_ids, ctx)):
+                if isinstance(person, Exception):
+                    raw_data['person_raw'].append({
+                        'error': str(person),
+                        'eierId': serialize_zeep_object(eier_id, max_depth=3, _cache=cache)
+                    })
+                else:
+                    raw_data['person_raw'].append(serialize_zeep_object(person, max_depth=5, _cache=cache))
+
+    return verbose_data, raw_data
+
+
 def lookup_matrikkelenhet(
-    ident: MatrikkelIdent,
-    config: MatrikkelConfig,
+    ident: "MatrikkelIdent",
+    config: "MatrikkelConfig",
     verbose: bool = False,
     debug: bool = False,
     raw: bool = False,
@@ -177,21 +256,9 @@ def lookup_matrikkelenhet(
     Returns:
         Dictionary with lookup results
     """
-    result = {
-        'matrikkelenhet': format_matrikkelenhet_string(ident),
-        'ident': {
-            'kommune': ident.kommune,
-            'gardsnummer': ident.gardsnummer,
-            'bruksnummer': ident.bruksnummer,
-            'festenummer': ident.festenummer,
-            'seksjonsnummer': ident.seksjonsnummer
-        },
-        'matrikkelenhet_id': None,
-        'owners': [],
-        'error': None,
-        'verbose_data': {} if verbose else None,
-        'raw_data': {} if raw else None
-    }
+    from matrikkel.matrikkel_client import MatrikkelClient
+
+    result = new_result(ident, verbose=verbose, raw=raw)
 
     try:
         with MatrikkelClient(config) as client:
@@ -200,80 +267,15 @@ def lookup_matrikkelenhet(
             matrikkel_id_value = client._extract_id_value(matrikkelenhet_id)
             result['matrikkelenhet_id'] = matrikkel_id_value
 
-            store_client = client._get_store_client()
-            matrikkelenhet_client = client._get_matrikkelenhet_client()
-
-            MatrikkelenhetId = matrikkelenhet_client.get_type("ns1:MatrikkelenhetId")
-            try:
-                matrikkel_id_obj = MatrikkelenhetId(id=int(matrikkel_id_value), objectType='Matrikkelenhet')
-            except (TypeError, AttributeError):
-                try:
-                    matrikkel_id_obj = MatrikkelenhetId(value=int(matrikkel_id_value))
-                except (TypeError, AttributeError):
-                    matrikkel_id_obj = MatrikkelenhetId(int(matrikkel_id_value))
-
-            ctx = client._create_matrikkel_context(store_client)
-            matrikkelenhet_obj = store_client.service.getObject(matrikkel_id_obj, ctx)
-
-            # If raw mode, capture raw objects
-            if raw:
-                raw_data = {
-                    'matrikkelenhet_raw': serialize_zeep_object(matrikkelenhet_obj, max_depth=5),
-                    'eierforhold_raw': [],
-                    'person_raw': []
-                }
-
-                # Extract eierforhold (owner relationships) - raw
-                eierforhold_list = None
-                if hasattr(matrikkelenhet_obj, 'eierforhold'):
-                    eierforhold_list = matrikkelenhet_obj.eierforhold
-                elif hasattr(matrikkelenhet_obj, 'getEierforhold'):
-                    eierforhold_list = matrikkelenhet_obj.getEierforhold()
-
-                if eierforhold_list:
-                    items = client._extract_list_items(eierforhold_list)
-                    for eierforhold in items:
-                        # Serialize eierforhold
-                        raw_data['eierforhold_raw'].append(serialize_zeep_object(eierforhold, max_depth=5))
-
-                        # Get eierId and fetch Person object
-                        eier_id = None
-                        if hasattr(eierforhold, 'eierId'):
-                            eier_id = eierforhold.eierId
-                        elif hasattr(eierforhold, 'getEierId'):
-                            eier_id = eierforhold.getEierId()
-
-                        if eier_id:
-                            try:
-                                person = store_client.service.getObject(eier_id, ctx)
-                                raw_data['person_raw'].append(serialize_zeep_object(person, max_depth=5))
-                            except Exception as e:
-                                raw_data['person_raw'].append({
-                                    'error': str(e),
-                                    'eierId': serialize_zeep_object(eier_id, max_depth=3)
-                                })
-
-                result['raw_data'] = raw_data
-
             # Get owner information (processed)
             owners = client.get_owner_information(matrikkelenhet_id, debug=debug, include_historical=include_historical)
-            result['owners'] = [
-                {
-                    'navn': owner.navn,
-                    'adresse': owner.adresse,
-                    'eierId': owner.eierId,
-                    'fraDato': owner.fraDato,
-                    'tilDato': owner.tilDato,
-                    'andel': owner.andel,
-                    'eierforhold_type': owner.eierforhold_type,
-                    'is_current': owner.tilDato is None  # Current owner if tilDato is None
-                }
-                for owner in owners
-            ]
+            result['owners'] = [owner_to_dict(owner) for owner in owners]
 
-            # If verbose, get full Matrikkelenhet object
-            if verbose:
-                result['verbose_data'] = extract_matrikkelenhet_data(matrikkelenhet_obj)
+            # If verbose or raw, get full Matrikkelenhet object
+            if verbose or raw:
+                result['verbose_data'], result['raw_data'] = fetch_matrikkelenhet_details(
+                    client, matrikkel_id_value, verbose=verbose, raw=raw
+                )
 
     except Exception as e:
         result['error'] = str(e)
@@ -284,191 +286,174 @@ def lookup_matrikkelenhet(
     return result
 
 
-def batch_lookup(
-    idents: List[MatrikkelIdent],
-    config: MatrikkelConfig,
+def owner_to_dict(owner: "OwnerInfo") -> Dict[str, Any]:
+    """Convert an OwnerInfo to the owner dict used in results.
+
+    Args:
+        owner: OwnerInfo object
+
+    Returns:
+        Dict with the OWNER_FIELDS values and is_current
+    """
+    values = _get_owner_fields(owner)
+    owner_dict = dict(zip(OWNER_FIELDS, values))
+    owner_dict['is_current'] = owner.tilDato is None  # Current owner if tilDato is None
+    return owner_dict
+
+
+def new_result(ident: "MatrikkelIdent", verbose: bool = False, raw: bool = False) -> Dict[str, Any]:
+    """Create an empty result dictionary for an ident.
+
+    Args:
+        ident: MatrikkelIdent object
+        verbose: If True, reserve verbose_data
+        raw: If True, reserve raw_data
+
+    Returns:
+        Result dictionary with no owners and no error
+    """
+    return {
+        'matrikkelenhet': format_matrikkelenhet_string(ident),
+        'ident': {
+            'kommune': ident.kommune,
+            'gardsnummer': ident.gardsnummer,
+            'bruksnummer': ident.bruksnummer,
+            'festenummer': ident.festenummer,
+            'seksjonsnummer': ident.seksjonsnummer
+        },
+        'matrikkelenhet_id': None,
+        'owners': [],
+        'error': None,
+        'verbose_data': {} if verbose else None,
+        'raw_data': {} if raw else None
+    }
+
+
+def lookup_chunk(
+    client: "MatrikkelClient",
+    idents: List["MatrikkelIdent"],
     verbose: bool = False,
     debug: bool = False,
-    continue_on_error: bool = True,
     raw: bool = False,
     include_historical: bool = False
 ) -> List[Dict[str, Any]]:
-    """Look up multiple matrikkelenheter in batch.
+    """Look up one chunk of matrikkelenheter with concurrent API calls.
 
     Args:
+        client: Open MatrikkelClient
         idents: List of MatrikkelIdent objects
-        config: MatrikkelConfig with API credentials
         verbose: If True, include all available data
         debug: If True, enable debug output
-        continue_on_error: If True, continue processing on errors
         raw: If True, include raw API objects
+        include_historical: If True, include historical owners
 
     Returns:
-        List of result dictionaries
+        List of result dictionaries, in the same order as idents
     """
-    results = []
+    results = [new_result(ident, verbose=verbose, raw=raw) for ident in idents]
+
+    # Find matrikkelenhet IDs in batch (results are in the same order as idents)
+    found = []
+    for result, (_, matrikkelenhet_id, error) in zip(results, client.find_matrikkelenhet_ids_batch(idents)):
+        if matrikkelenhet_id and error is None:
+            result['matrikkelenhet_id'] = client._extract_id_value(matrikkelenhet_id)
+            found.append((result, matrikkelenhet_id))
+        else:
+            result['error'] = str(error)
 
-    try:
-        with MatrikkelClient(config) as client:
-            # Find matrikkelenhet IDs in batch
-            matrikkelenhet_id_results = client.find_matrikkelenhet_ids_batch(idents)
+    # Get owners in batch
+    owner_results = client.get_owners_batch(
+        [matrikkelenhet_id for _, matrikkelenhet_id in found],
+        debug=debug,
+        include_historical=include_historical
+    )
 
-            # Map results to idents
-            ident_to_matrikkelenhet_id = {}
-            ident_to_error = {}
+    pending_details = []
+    for (result, _), (_, owners, error) in zip(found, owner_results):
+        if owners is None or error is not None:
+            result['error'] = str(error)
+            continue
 
-            for ident, matrikkelenhet_id, error in matrikkelenhet_id_results:
-                if matrikkelenhet_id and error is None:
-                    ident_to_matrikkelenhet_id[ident] = matrikkelenhet_id
-                else:
-                    ident_to_error[ident] = error
+        result['owners'] = [owner_to_dict(owner) for owner in owners]
 
-            # Get owners in batch
-            unique_matrikkelenhet_ids = list(ident_to_matrikkelenhet_id.values())
-            owner_results = client.get_owners_batch(unique_matrikkelenhet_ids, debug=debug, include_historical=include_historical)
+        # If verbose or raw, get full object (this requires individual calls)
+        if verbose or raw:
+            pending_details.append(result)
 
-            # Map owner results back to matrikkelenhet IDs
-            matrikkelenhet_id_to_owners = {}
-            matrikkelenhet_id_to_error = {}
+    # The getObject calls are independent round trips; run them concurrently
+    def fetch_details(result: Dict[str, Any]) -> None:
+        try:
+            result['verbose_data'], result['raw_data'] = fetch_matrikkelenhet_details(
+                client, result['matrikkelenhet_id'], verbose=verbose, raw=raw
+            )
+        except Exception as e:
+            if debug:
+                print(f"Warning: Could not get verbose/raw data for {result['matrikkelenhet']}: {e}")
+
+    if pending_details:
+        client._map_concurrently(fetch_details, pending_details)
+
+    return results
 
-            for matrikkelenhet_id, owners, error in owner_results:
-                if owners is not None and error is None:
-                    matrikkelenhet_id_to_owners[matrikkelenhet_id] = owners
-                else:
-                    matrikkelenhet_id_to_error[matrikkelenhet_id] = error
-
-            # Build results for each ident
-            for ident in idents:
-                result = {
-                    'matrikkelenhet': format_matrikkelenhet_string(ident),
-                    'ident': {
-                        'kommune': ident.kommune,
-                        'gardsnummer': ident.gardsnummer,
-                        'bruksnummer': ident.bruksnummer,
-                        'festenummer': ident.festenummer,
-                        'seksjonsnummer': ident.seksjonsnummer
-                    },
-                    'matrikkelenhet_id': None,
-                    'owners': [],
-                    'error': None,
-                    'verbose_data': {} if verbose else None,
-                    'raw_data': {} if raw else None
-                }
-
-                if ident in ident_to_error:
-                    result['error'] = str(ident_to_error[ident])
-                elif ident in ident_to_matrikkelenhet_id:
-                    matrikkelenhet_id = ident_to_matrikkelenhet_id[ident]
-                    matrikkel_id_value = client._extract_id_value(matrikkelenhet_id)
-                    result['matrikkelenhet_id'] = matrikkel_id_value
-
-                    if matrikkelenhet_id in matrikkelenhet_id_to_error:
-                        result['error'] = str(matrikkelenhet_id_to_error[matrikkelenhet_id])
-                    elif matrikkelenhet_id in matrikkelenhet_id_to_owners:
-                        owners = matrikkelenhet_id_to_owners[matrikkelenhet_id]
-                        result['owners'] = [
-                            {
-                                'navn': owner.navn,
-                                'adresse': owner.adresse,
-                                'eierId': owner.eierId,
-                                'fraDato': owner.fraDato,
-                                'tilDato': owner.tilDato,
-                                'andel': owner.andel,
-                                'eierforhold_type': owner.eierforhold_type,
-                                'is_current': owner.tilDato is None  # Current owner if tilDato is None
-                            }
-                            for owner in owners
-                        ]
-
-                        # If verbose or raw, get full object (this requires individual calls)
-                        if verbose or raw:
-                            try:
-                                store_client = client._get_store_client()
-                                matrikkelenhet_client = client._get_matrikkelenhet_client()
-
-                                MatrikkelenhetId = matrikkelenhet_client.get_type("ns1:MatrikkelenhetId")
-                                try:
-                                    matrikkel_id_obj = MatrikkelenhetId(id=int(matrikkel_id_value), objectType='Matrikkelenhet')
-                                except (TypeError, AttributeError):
-                                    try:
-                                        matrikkel_id_obj = MatrikkelenhetId(value=int(matrikkel_id_value))
-                                    except (TypeError, AttributeError):
-                                        matrikkel_id_obj = MatrikkelenhetId(int(matrikkel_id_value))
-
-                                ctx = client._create_matrikkel_context(store_client)
-                                matrikkelenhet_obj = store_client.service.getObject(matrikkel_id_obj, ctx)
-
-                                if verbose:
-                                    result['verbose_data'] = extract_matrikkelenhet_data(matrikkelenhet_obj)
-
-                                if raw:
-                                    raw_data = {
-                                        'matrikkelenhet_raw': serialize_zeep_object(matrikkelenhet_obj, max_depth=5),
-                                        'eierforhold_raw': [],
-                                        'person_raw': []
-                                    }
-
-                                    # Extract eierforhold (owner relationships) - raw
-                                    eierforhold_list = None
-                                    if hasattr(matrikkelenhet_obj, 'eierforhold'):
-                                        eierforhold_list = matrikkelenhet_obj.eierforhold
-                                    elif hasattr(matrikkelenhet_obj, 'getEierforhold'):
-                                        eierforhold_list = matrikkelenhet_obj.getEierforhold()
-
-                                    if eierforhold_list:
-                                        items = client._extract_list_items(eierforhold_list)
-                                        for eierforhold in items:
-                                            # Serialize eierforhold
-                                            raw_data['eierforhold_raw'].append(serialize_zeep_object(eierforhold, max_depth=5))
-
-                                            # Get eierId and fetch Person object
-                                            eier_id = None
-                                            if hasattr(eierforhold, 'eierId'):
-                                                eier_id = eierforhold.eierId
-                                            elif hasattr(eierforhold, 'getEierId'):
-                                                eier_id = eierforhold.getEierId()
-
-                                            if eier_id:
-                                                try:
-                                                    person = store_client.service.getObject(eier_id, ctx)
-                                                    raw_data['person_raw'].append(serialize_zeep_object(person, max_depth=5))
-                                                except Exception as e:
-                                                    raw_data['person_raw'].append({
-                                                        'error': str(e),
-                                                        'eierId': serialize_zeep_object(eier_id, max_depth=3)
-                                                    })
-
-                                    result['raw_data'] = raw_data
-                            except Exception as e:
-                                if debug:
-                                    print(f"Warning: Could not get verbose/raw data for {result['matrikkelenhet']}: {e}")
-
-                results.append(result)
 
+def batch_lookup(
+    idents: Iterable["MatrikkelIdent"],
+    config: "MatrikkelConfig",
+    verbose: bool = False,
+    debug: bool = False,
+    continue_on_error: bool = True,
+    raw: bool = False,
+    include_historical: bool = False
+) -> Iterator[Dict[str, Any]]:
+    """Look up multiple matrikkelenheter in batch.
+
+    Idents are processed BATCH_CHUNK_SIZE at a time and each chunk's results
+    are yielded before the next chunk is read and fetched, so output can be
+    written while the lookup is still running.
+
+    Args:
+        idents: MatrikkelIdent objects (a list, or a generator reading a file)
+        config: MatrikkelConfig with API credentials
+        verbose: If True, include all available data
+        debug: If True, enable debug output
+        continue_on_error: If True, continue processing on errors
+        raw: If True, include raw API objects
+
+    Yields:
+        Result dictionaries, in the same order as idents
+
+    Raises:
+        InputReadError: If reading idents from the input file fails; lookup
+            errors are reported in the results instead
+    """
+    from matrikkel.matrikkel_client import MatrikkelClient
+
+    idents = iter(idents)
+    chunk: List["MatrikkelIdent"] = []
+    done = 0  # Results yielded from the current chunk
+    try:
+        with MatrikkelClient(config) as client:
+            while True:
+                chunk = list(islice(idents, BATCH_CHUNK_SIZE))
+                if not chunk:
+                    break
+                done = 0
+                for result in lookup_chunk(client, chunk, verbose=verbose, debug=debug, raw=raw, include_historical=include_historical):
+                    yield result
+                    done += 1
+
+    except InputReadError:
+        raise
     except Exception as e:
-        # If there's a general error, create error results for all idents
-        for ident in idents:
-            results.append({
-                'matrikkelenhet': format_matrikkelenhet_string(ident),
-                'ident': {
-                    'kommune': ident.kommune,
-                    'gardsnummer': ident.gardsnummer,
-                    'bruksnummer': ident.bruksnummer,
-                    'festenummer': ident.festenummer,
-                    'seksjonsnummer': ident.seksjonsnummer
-                },
-                'matrikkelenhet_id': None,
-                'owners': [],
-                'error': str(e),
-                'verbose_data': {} if verbose else None,
-                'raw_data': {} if raw else None
-            })
+        # If there's a general error, create error results for the remaining idents
+        for ident in chain(chunk[done:], idents):
+            result = new_result(ident, verbose=verbose, raw=raw)
+            result['error'] = str(e)
+            yield result
         if debug:
             import traceback
             traceback.print_exc()
 
-    return results
-
 
 def format_output_text(result: Dict[str, Any], verbose: bool = False, raw: bool = False) -> str:
     """Format result as human-readable text.
@@ -484,28 +469,30 @@ def format_output_text(result: Dict[str, Any], verbose: bool = False, raw: bool
     lines = []
 
     if result['error']:
-        lines.append(f"Matrikkelenhet: {result['matrikkelenhet']}")
-        lines.append(f"Error: {result['error']}")
-        return "\n".join(lines)
+        return f"Matrikkelenhet: {result['matrikkelenhet']}\nError: {result['error']}"
 
     lines.append(f"Matrikkelenhet: {result['matrikkelenhet']}")
 
     if verbose and result['matrikkelenhet_id']:
-        lines.append(f"Matrikkelenhet ID: {result['matrikkelenhet_id']}")
-        lines.append(f"Kommune: {result['ident']['kommune']}")
-        lines.append(f"Gårdsnummer: {result['ident']['gardsnummer']}")
-        lines.append(f"Bruksnummer: {result['ident']['bruksnummer']}")
-        if result['ident']['festenummer']:
-            lines.append(f"Festenummer: {result['ident']['festenummer']}")
-        if result['ident']['seksjonsnummer']:
-            lines.append(f"Seksjonsnummer: {result['ident']['seksjonsnummer']}")
+        ident = result['ident']
+        lines.extend([
+            f"Matrikkelenhet ID: {result['matrikkelenhet_id']}",
+            f"Kommune: {ident['kommune']}",
+            f"Gårdsnummer: {ident['gardsnummer']}",
+            f"Bruksnummer: {ident['bruksnummer']}",
+        ])
+        if ident['festenummer']:
+            lines.append(f"Festenummer: {ident['festenummer']}")
+        if ident['seksjonsnummer']:
+            lines.append(f"Seksjonsnummer: {ident['seksjonsnummer']}")
 
         if result.get('verbose_data'):
-            lines.append("")
-            lines.append("Additional Information:")
-            for key, value in sorted(result['verbose_data'].items()):
-                if key not in ['eierforhold']:  # Skip eierforhold, we show owners separately
-                    lines.append(f"  {key}: {value}")
+            lines.extend(["", "Additional Information:"])
+            lines.extend(
+                f"  {key}: {value}"
+                for key, value in sorted(result['verbose_data'].items())
+                if key != 'eierforhold'  # Skip eierforhold, we show owners separately
+            )
 
     lines.append("")
     if result['owners']:
@@ -528,20 +515,8 @@ def format_output_text(result: Dict[str, Any], verbose: bool = False, raw: bool
                 if owner.get('fraDato'):
                     period_parts.append(f"fra {owner['fraDato']}")
                 if owner.get('andel'):
-                    # Format andel nicely (e.g., "1/2" instead of dict string)
-                    andel_str = owner['andel']
-                    if isinstance(andel_str, str) and '{' in andel_str:
-                        # Try to parse dict-like string
-                        try:
-                            import ast
-                            andel_dict = ast.literal_eval(andel_str.replace('\n', '').replace(' ', ''))
-                            if isinstance(andel_dict, dict):
-                                teller = andel_dict.get('teller', '')
-                                nevner = andel_dict.get('nevner', '')
-                                andel_str = f"{teller}/{nevner}" if teller and nevner else andel_str
-                        except:
-                            pass
-                    period_parts.append(f"andel: {andel_str}")
+                    # andel is already formatted as "teller/nevner" by the client
+                    period_parts.append(f"andel: {owner['andel']}")
                 if owner.get('eierforhold_type'):
                     period_parts.append(f"type: {owner['eierforhold_type']}")
 
@@ -555,8 +530,7 @@ def format_output_text(result: Dict[str, Any], verbose: bool = False, raw: bool
                     lines.append(f"  {i}. (Owner ID: {owner['eierId']}{period_str})")
 
         if historical_owners:
-            lines.append("")
-            lines.append(f"Historical Owners ({len(historical_owners)}):")
+            lines.extend(["", f"Historical Owners ({len(historical_owners)}):"])
             for i, owner in enumerate(historical_owners, 1):
                 owner_parts = []
                 if owner.get('navn'):
@@ -589,33 +563,24 @@ def format_output_text(result: Dict[str, Any], verbose: bool = False, raw: bool
 
     # Raw data section
     if raw and result.get('raw_data'):
-        lines.append("")
-        lines.append("=" * 80)
-        lines.append("RAW API DATA")
-        lines.append("=" * 80)
-        lines.append("")
+        raw_data = result['raw_data']
+        lines.extend(["", "=" * 80, "RAW API DATA", "=" * 80, ""])
 
         # Matrikkelenhet raw
-        if result['raw_data'].get('matrikkelenhet_raw'):
-            lines.append("Raw Matrikkelenhet Object:")
-            lines.append(json.dumps(result['raw_data']['matrikkelenhet_raw'], indent=2, ensure_ascii=False))
-            lines.append("")
+        if raw_data.get('matrikkelenhet_raw'):
+            lines.extend(["Raw Matrikkelenhet Object:", dumps_json(raw_data['matrikkelenhet_raw']), ""])
 
         # Eierforhold raw
-        if result['raw_data'].get('eierforhold_raw'):
-            lines.append(f"Raw Eierforhold Objects ({len(result['raw_data']['eierforhold_raw'])}):")
-            for i, eierforhold in enumerate(result['raw_data']['eierforhold_raw'], 1):
-                lines.append(f"  Eierforhold {i}:")
-                lines.append(json.dumps(eierforhold, indent=4, ensure_ascii=False))
-                lines.append("")
+        if raw_data.get('eierforhold_raw'):
+            lines.append(f"Raw Eierforhold Objects ({len(raw_data['eierforhold_raw'])}):")
+            for i, eierforhold in enumerate(raw_data['eierforhold_raw'], 1):
+                lines.extend([f"  Eierforhold {i}:", dumps_json(eierforhold), ""])
 
         # Person raw
-        if result['raw_data'].get('person_raw'):
-            lines.append(f"Raw Person Objects ({len(result['raw_data']['person_raw'])}):")
-            for i, person in enumerate(result['raw_data']['person_raw'], 1):
-                lines.append(f"  Person {i}:")
-                lines.append(json.dumps(person, indent=4, ensure_ascii=False))
-                lines.append("")
+        if raw_data.get('person_raw'):
+            lines.append(f"Raw Person Objects ({len(raw_data['person_raw'])}):")
+            for i, person in enumerate(raw_data['person_raw'], 1):
+                lines.extend([f"  Person {i}:", dumps_json(person), ""])
 
     return "\n".join(lines)
 
@@ -629,22 +594,20 @@ def format_output_json(result: Dict[str, Any]) -> str:
     Returns:
         JSON string
     """
-    return json.dumps(result, indent=2, ensure_ascii=False)
+    return dumps_json(result)
 
 
-def format_output_csv(results: List[Dict[str, Any]]) -> List[List[str]]:
-    """Format results as CSV rows.
+def iter_csv_rows(results: Iterable[Dict[str, Any]]) -> Iterator[List[str]]:
+    """Generate CSV rows for results, one row at a time.
 
     Args:
-        results: List of result dictionaries
+        results: Result dictionaries
 
-    Returns:
-        List of CSV rows (list of strings)
+    Yields:
+        CSV rows (list of strings): the header, then one row per owner
     """
-    rows = []
-
     # Header
-    rows.append([
+    yield [
         'Matrikkelenhet',
         'Kommune',
         'Gårdsnummer',
@@ -661,13 +624,13 @@ def format_output_csv(results: List[Dict[str, Any]]) -> List[List[str]]:
         'Eierforhold Type',
         'Is Current',
         'Error'
-    ])
+    ]
 
     # Data rows - one row per owner
     for result in results:
         if result['owners']:
             for owner in result['owners']:
-                rows.append([
+                yield [
                     result['matrikkelenhet'],
                     str(result['ident']['kommune']),
                     str(result['ident']['gardsnummer']),
@@ -684,10 +647,10 @@ def format_output_csv(results: List[Dict[str, Any]]) -> List[List[str]]:
                     owner.get('eierforhold_type', '') if owner.get('eierforhold_type') else '',
                     'Yes' if owner.get('is_current', True) else 'No',
                     result['error'] if result['error'] else ''
-                ])
+                ]
         else:
             # No owners - still add a row
-            rows.append([
+            yield [
                 result['matrikkelenhet'],
                 str(result['ident']['kommune']),
                 str(result['ident']['gardsnummer']),
@@ -697,12 +660,55 @@ def format_output_csv(results: List[Dict[str, Any]]) -> List[List[str]]:
                 str(result['matrikkelenhet_id']) if result['matrikkelenhet_id'] else '',
                 '', '', '', '', '', '', '', '',  # Empty owner fields
                 result['error'] if result['error'] else ''
-            ])
+            ]
+
+
+def write_output(out: TextIO, results: Iterable[Dict[str, Any]], args: argparse.Namespace, multiple: bool = False) -> Tuple[int, int]:
+    """Write results to out in the format selected by args, one result at a time.
+
+    Args:
+        out: Text stream to write to
+        results: Result dictionaries (a list, or the batch_lookup generator)
+        args: Parsed command line arguments (csv, json, verbose, raw)
+        multiple: If True, write a batch (JSON array, separated text blocks)
+
+    Returns:
+        Tuple of (number of results, number of results with an error)
+    """
+    counts = [0, 0]
 
-    return rows
+    def counted(results: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        for result in results:
+            counts[0] += 1
+            if result.get('error'):
+                counts[1] += 1
+            yield result
+
+    if args.csv:
+        # CSV rows are written as they are generated
+        csv.writer(out, lineterminator='\n').writerows(iter_csv_rows(counted(results)))
+    elif args.json and not multiple:
+        for result in counted(results):
+            out.write(format_output_json(result))
+            out.write("\n")
+    elif args.json:
+        # Same layout as dumping the whole list with indent=2, one element at a time
+        out.write("[")
+        for i, result in enumerate(counted(results)):
+            element = dumps_json(result)
+            out.write(",\n" if i else "\n")
+            out.write(textwrap.indent(element, "  "))
+        out.write("\n]\n" if counts[0] else "]\n")
+    else:
+        # Text output, with a blank line between results in batch mode
+        for result in counted(results):
+            out.write(format_output_text(result, verbose=args.verbose, raw=args.raw))
+            out.write("\n\n" if multiple else "\n")
+
+    return counts[0], counts[1]
 
 
-def parse_input(input_str: str) -> Optional[MatrikkelIdent]:
+def parse_input(input_str: str) -> Optional["MatrikkelIdent"]:
     """Parse input string or return None if invalid.
 
     Args:
@@ -711,6 +717,8 @@ def parse_input(input_str: str) -> Optional[MatrikkelIdent]:
     Returns:
         MatrikkelIdent object or None
     """
+    from services.matrikkel_owner_service import parse_matrikkelenhet_string
+
     # Try parsing as formatted string first
     ident = parse_matrikkelenhet_string(input_str)
     if ident:
@@ -720,18 +728,49 @@ def parse_input(input_str: str) -> Optional[MatrikkelIdent]:
     return None
 
 
-def read_input_file(file_path: Path) -> List[str]:
-    """Read matrikkelenhet identifiers from a file.
+class InputReadError(Exception):
+    """Raised when the input file cannot be opened, read or decoded."""
+
+
+def read_input_file(file_path: Path) -> Iterator[str]:
+    """Read matrikkelenhet identifiers from a file, one line at a time.
 
     Args:
         file_path: Path to input file
 
-    Returns:
-        List of matrikkelenhet strings (one per line, whitespace stripped)
+    Yields:
+        Matrikkelenhet strings (whitespace stripped), skipping blank and comment lines
+
+    Raises:
+        InputReadError: If the file cannot be opened, read or decoded
+    """
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line and line[0] != '#':
+                    yield line
+    except (OSError, UnicodeDecodeError) as e:
+        raise InputReadError(f"Error reading file {file_path}: {e}") from e
+
+
+def iter_file_idents(file_path: Path) -> Iterator["MatrikkelIdent"]:
+    """Parse matrikkelenhet identifiers from a file as it is read.
+
+    Lines that cannot be parsed are reported on stderr and skipped.
+
+    Args:
+        file_path: Path to input file
+
+    Yields:
+        MatrikkelIdent objects
     """
-    with open(file_path, 'r', encoding='utf-8') as f:
-        lines = [line.strip() for line in f if line.strip() and not line.strip().startswith('#')]
-    return lines
+    for line in read_input_file(file_path):
+        ident = parse_input(line)
+        if ident:
+            yield ident
+        else:
+            print(f"Warning: Could not parse '{line}' from file, skipping", file=sys.stderr)
 
 
 def main():
@@ -839,6 +878,12 @@ Examples:
 
     args = parser.parse_args()
 
+    # Arguments are valid: now load .env and the Matrikkel client stack
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    from services.matrikkel_owner_service import get_matrikkel_config
+
     # Get configuration
     config = get_matrikkel_config()
     if not config:
@@ -853,42 +898,39 @@ Examples:
         config.base_url = "https://prodtest.matrikkel.no/matrikkelapi/wsapi/v1"
 
     # Parse input
-    idents: List[MatrikkelIdent] = []
-
     if args.file:
-        # Batch mode from file
-        try:
-            input_lines = read_input_file(args.file)
-            for line in input_lines:
-                ident = parse_input(line)
-                if ident:
-                    idents.append(ident)
-                else:
-                    print(f"Warning: Could not parse '{line}' from file, skipping", file=sys.stderr)
-        except Exception as e:
-            print(f"Error reading file {args.file}: {e}", file=sys.stderr)
-            sys.exit(1)
-    elif args.matrikkel:
+        # Batch mode from file; lines are parsed as the lookup consumes them
+        idents = iter_file_idents(args.file)
+    else:
         # Single lookup from string
         ident = parse_input(args.matrikkel)
         if not ident:
             print(f"Error: Could not parse matrikkelenhet '{args.matrikkel}'", file=sys.stderr)
             sys.exit(1)
-        idents.append(ident)
+        idents = iter([ident])
+
+    # Read ahead two idents to choose between a single and a batch lookup
+    try:
+        head = list(islice(idents, 2))
+    except InputReadError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
 
-    if not idents:
+    if not head:
         print("Error: No valid matrikkelenhet identifiers found", file=sys.stderr)
         sys.exit(1)
 
+    multiple = len(head) > 1
+
     # Perform lookup
-    if len(idents) == 1:
+    if not multiple:
         # Single lookup
-        result = lookup_matrikkelenhet(idents[0], config, verbose=args.verbose, debug=args.debug, raw=args.raw, include_historical=args.historical)
+        result = lookup_matrikkelenhet(head[0], config, verbose=args.verbose, debug=args.debug, raw=args.raw, include_historical=args.historical)
         results = [result]
     else:
-        # Batch lookup
+        # Batch lookup (generator; results are written as each chunk completes)
         results = batch_lookup(
-            idents,
+            chain(head, idents),
             config,
             verbose=args.verbose,
             debug=args.debug,
@@ -897,42 +939,25 @@ Examples:
             include_historical=args.historical
         )
 
-    # Format output
-    output_lines = []
-
-    if args.csv:
-        # CSV output
-        csv_rows = format_output_csv(results)
-        output_lines = [",".join(row) for row in csv_rows]
-    elif args.json:
-        # JSON output
-        if len(results) == 1:
-            output_lines = [format_output_json(results[0])]
+    # Write output; the rest of the input file is read while writing
+    try:
+        if args.output:
+            try:
+                with open(args.output, 'w', encoding='utf-8', newline='') as f:
+                    total, errors = write_output(f, results, args, multiple=multiple)
+            except InputReadError:
+                raise
+            except Exception as e:
+                print(f"Error writing to file {args.output}: {e}", file=sys.stderr)
+                sys.exit(1)
         else:
-            output_lines = [json.dumps(results, indent=2, ensure_ascii=False)]
-    else:
-        # Text output
-        for result in results:
-            output_lines.append(format_output_text(result, verbose=args.verbose, raw=args.raw))
-            if len(results) > 1:
-                output_lines.append("")  # Separator between results
-
-    output_text = "\n".join(output_lines)
-
-    # Write output
-    if args.output:
-        try:
-            with open(args.output, 'w', encoding='utf-8') as f:
-                f.write(output_text)
-        except Exception as e:
-            print(f"Error writing to file {args.output}: {e}", file=sys.stderr)
-            sys.exit(1)
-    else:
-        print(output_text)
+            total, errors = write_output(sys.stdout, results, args, multiple=multiple)
+    except InputReadError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
 
     # Determine exit code
-    errors = sum(1 for r in results if r.get('error'))
-    if errors == len(results):
+    if errors == total:
         sys.exit(1)  # All failed
     elif errors > 0:
         sys.exit(2)  # Partial success
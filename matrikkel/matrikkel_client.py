@@ -4,13 +4,18 @@ This module provides a client for interacting with the Matrikkel API (Statens ka
 It supports querying matrikkelenhet (property units) and retrieving owner information.
 """
 
-from typing import List, Any, Optional, Tuple
+from typing import Callable, List, Any, Optional, Tuple
 from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
 from zeep import Client, Settings
+from zeep.exceptions import Fault, TransportError
 from zeep.transports import Transport
 import requests
 from requests.auth import HTTPBasicAuth
 
+# Sentinel for getattr() defaults, so a field set to None is not mistaken for a missing one
+_MISSING = object()
+
 
 @dataclass
 class MatrikkelConfig:
@@ -24,6 +29,7 @@ class MatrikkelConfig:
     locale: str = "nb_NO"
     koordinatsystem_kode_id: int = 25833
     bruk_originale_koordinater: bool = False
+    max_concurrent_requests: int = 10  # Parallel API calls in batch methods
 
 
 @dataclass
@@ -65,6 +71,11 @@ class MatrikkelClient:
         self._session: Optional[requests.Session] = None
         self._matrikkelenhet_client: Optional[Client] = None
         self._store_client: Optional[Client] = None
+        # zeep types and contexts are resolved once per client and reused per call
+        self._matrikkelenhet_id_builder: Optional[Callable[[int], Any]] = None
+        self._matrikkelenhet_ident_type: Optional[Any] = None
+        self._matrikkelenhet_context: Optional[Any] = None
+        self._store_context: Optional[Any] = None
 
     def _get_session(self) -> requests.Session:
         """Get or create a reusable session with authentication."""
@@ -120,6 +131,29 @@ class MatrikkelClient:
                 continue
         return None
 
+    @staticmethod
+    def _get_field(obj: Any, name: str, getter_name: Optional[str] = None) -> Any:
+        """Get a field from a zeep object, falling back to a getter method.
+
+        Uses one getattr() per name instead of hasattr() followed by getattr().
+
+        Args:
+            obj: Object to read from
+            name: Attribute name (e.g. 'eierforhold')
+            getter_name: Optional getter method name (e.g. 'getEierforhold')
+
+        Returns:
+            The attribute value, the getter's return value, or None if neither exists
+        """
+        value = getattr(obj, name, _MISSING)
+        if value is not _MISSING:
+            return value
+        if getter_name:
+            getter = getattr(obj, getter_name, None)
+            if getter is not None:
+                return getter()
+        return None
+
     @staticmethod
     def _extract_id_value(obj: Any) -> int:
         """Extract ID value from various ID object formats."""
@@ -154,6 +188,47 @@ class MatrikkelClient:
             koordinatsystemKodeId=KoordinatsystemKodeId(self.config.koordinatsystem_kode_id),
         )
 
+    def _get_store_context(self) -> Any:
+        """Get or create the MatrikkelContext for StoreService calls."""
+        if self._store_context is None:
+            self._store_context = self._create_matrikkel_context(self._get_store_client())
+        return self._store_context
+
+    def _make_matrikkelenhet_id(self, matrikkel_id_value: Any) -> Any:
+        """Create a MatrikkelenhetId object for StoreService getObject calls.
+
+        The constructor keywords depend on the WSDL; the variants are tried on
+        the first call only, and the one that works is reused afterwards.
+
+        Args:
+            matrikkel_id_value: Numeric matrikkelenhet ID
+
+        Returns:
+            MatrikkelenhetId object
+        """
+        value = int(matrikkel_id_value)
+        if self._matrikkelenhet_id_builder is not None:
+            return self._matrikkelenhet_id_builder(value)
+
+        MatrikkelenhetId = self._get_matrikkelenhet_client().get_type("ns1:MatrikkelenhetId")
+
+        # Create the MatrikkelenhetId object - try different parameter patterns
+        builders = [
+            lambda v: MatrikkelenhetId(id=v, objectType='Matrikkelenhet'),
+            lambda v: MatrikkelenhetId(value=v),
+        ]
+        for builder in builders:
+            try:
+                matrikkel_id_obj = builder(value)
+            except (TypeError, AttributeError):
+                continue
+            self._matrikkelenhet_id_builder = builder
+            return matrikkel_id_obj
+
+        matrikkel_id_obj = MatrikkelenhetId(value)
+        self._matrikkelenhet_id_builder = MatrikkelenhetId
+        return matrikkel_id_obj
+
     @staticmethod
     def _extract_list_items(list_obj: Any) -> List[Any]:
         """Extract items from various list formats (zeep list objects)."""
@@ -171,6 +246,72 @@ class MatrikkelClient:
 
         return []
 
+    def _map_concurrently(self, func, items: List[Any]) -> List[Any]:
+        """Apply func to each item using up to config.max_concurrent_requests threads.
+
+        Results are returned in the same order as items.
+        """
+        max_workers = min(self.config.max_concurrent_requests, len(items))
+        if max_workers <= 1:
+            return [func(item) for item in items]
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(func, items))
+
+    def get_objects(self, object_ids: List[Any], ctx: Any) -> List[Any]:
+        """Fetch several objects from StoreService in one getObjects call.
+
+        Returned objects are matched to the requested IDs by their id value,
+        since the response order is not guaranteed. IDs missing from the
+        response (or all of them, if the bulk call returns a SOAP fault or an
+        HTTP error) are fetched with one getObject call each.
+
+        Args:
+            object_ids: List of ID objects (e.g. PersonId from eierforhold.eierId)
+            ctx: MatrikkelContext for the store client
+
+        Returns:
+            List in the same order as object_ids; each entry is the fetched
+            object, or the Exception raised while fetching it
+
+        Raises:
+            Exception: Other errors from the bulk call (e.g. timeouts), which
+                the per-ID calls would only repeat
+        """
+        if not object_ids:
+            return []
+
+        store_client = self._get_store_client()
+        results: List[Any] = [None] * len(object_ids)
+
+        if len(object_ids) > 1:
+            MatrikkelBubbleIdList = self._find_type(store_client, 'MatrikkelBubbleIdList')
+            if MatrikkelBubbleIdList:
+                try:
+                    response = store_client.service.getObjects(MatrikkelBubbleIdList(item=object_ids), ctx)
+                    by_id = {}
+                    for obj in self._extract_list_items(response):
+                        try:
+                            by_id[self._extract_id_value(obj.id)] = obj
+                        except (AttributeError, TypeError, ValueError):
+                            continue
+                    for i, object_id in enumerate(object_ids):
+                        try:
+                            results[i] = by_id.get(self._extract_id_value(object_id))
+                        except (AttributeError, TypeError, ValueError):
+                            pass
+                except (Fault, TransportError) as e:
+                    print(f"Warning: getObjects failed for {len(object_ids)} objects, fetching one at a time: {e}")
+
+        for i, object_id in enumerate(object_ids):
+            if results[i] is not None:
+                continue
+            try:
+                results[i] = store_client.service.getObject(object_id, ctx)
+            except Exception as e:
+                results[i] = e
+        return results
+
     def find_matrikkelenhet_id(self, ident: MatrikkelIdent) -> Tuple[Any, Client]:
         """Find matrikkelenhet ID for a given identifier.
 
@@ -187,9 +328,9 @@ class MatrikkelClient:
         client = self._get_matrikkelenhet_client()
 
         # Get types - using known namespace prefixes for MatrikkelenhetServiceWS
-        MatrikkelenhetIdent = client.get_type("ns1:MatrikkelenhetIdent")
-        MatrikkelContext = client.get_type("ns2:MatrikkelContext")
-        KoordinatsystemKodeId = client.get_type("ns3:KoordinatsystemKodeId")
+        if self._matrikkelenhet_ident_type is None:
+            self._matrikkelenhet_ident_type = client.get_type("ns1:MatrikkelenhetIdent")
+        MatrikkelenhetIdent = self._matrikkelenhet_ident_type
 
         # Always include festenummer and seksjonsnummer, defaulting to 0 if None
         # This prevents null values from being serialized (which causes Java backend errors)
@@ -201,13 +342,17 @@ class MatrikkelClient:
             seksjonsnummer=int(ident.seksjonsnummer if ident.seksjonsnummer is not None else 0),
         )
 
-        ctx = MatrikkelContext(
-            klientIdentifikasjon=self.config.klient_identifikasjon,
-            systemVersion=self.config.system_version,
-            locale=self.config.locale,
-            brukOriginaleKoordinater=self.config.bruk_originale_koordinater,
-            koordinatsystemKodeId=KoordinatsystemKodeId(self.config.koordinatsystem_kode_id),
-        )
+        if self._matrikkelenhet_context is None:
+            MatrikkelContext = client.get_type("ns2:MatrikkelContext")
+            KoordinatsystemKodeId = client.get_type("ns3:KoordinatsystemKodeId")
+            self._matrikkelenhet_context = MatrikkelContext(
+                klientIdentifikasjon=self.config.klient_identifikasjon,
+                systemVersion=self.config.system_version,
+                locale=self.config.locale,
+                brukOriginaleKoordinater=self.config.bruk_originale_koordinater,
+                koordinatsystemKodeId=KoordinatsystemKodeId(self.config.koordinatsystem_kode_id),
+            )
+        ctx = self._matrikkelenhet_context
 
         result = client.service.findMatrikkelenhetIdForIdent(
             matrikkelenhetIdent=matrikkelenhet_ident,
@@ -227,17 +372,17 @@ class MatrikkelClient:
             If successful, MatrikkelenhetId is returned and Exception is None.
             If failed, MatrikkelenhetId is None and Exception contains the error.
         """
-        results = []
-        client = None  # Will be created on first call
+        # Create the client up front so worker threads share it
+        self._get_matrikkelenhet_client()
 
-        for ident in idents:
+        def find_one(ident: MatrikkelIdent) -> Tuple[MatrikkelIdent, Any, Optional[Exception]]:
             try:
-                matrikkelenhet_id, client = self.find_matrikkelenhet_id(ident)
-                results.append((ident, matrikkelenhet_id, None))
+                matrikkelenhet_id, _ = self.find_matrikkelenhet_id(ident)
+                return (ident, matrikkelenhet_id, None)
             except Exception as e:
-                results.append((ident, None, e))
+                return (ident, None, e)
 
-        return results
+        return self._map_concurrently(find_one, idents)
 
     def get_owner_information(self, matrikkelenhet_id: Any, debug: bool = False, include_historical: bool = False) -> List[OwnerInfo]:
         """Get owner information for a matrikkelenhet.
@@ -255,23 +400,13 @@ class MatrikkelClient:
             Fault: If the API call fails
         """
         store_client = self._get_store_client()
-        matrikkelenhet_client = self._get_matrikkelenhet_client()
 
         # Extract ID value and create MatrikkelenhetId object
         matrikkel_id_value = self._extract_id_value(matrikkelenhet_id)
-        MatrikkelenhetId = matrikkelenhet_client.get_type("ns1:MatrikkelenhetId")
+        matrikkel_id_obj = self._make_matrikkelenhet_id(matrikkel_id_value)
 
-        # Create the MatrikkelenhetId object - try different parameter patterns
-        try:
-            matrikkel_id_obj = MatrikkelenhetId(id=int(matrikkel_id_value), objectType='Matrikkelenhet')
-        except (TypeError, AttributeError):
-            try:
-                matrikkel_id_obj = MatrikkelenhetId(value=int(matrikkel_id_value))
-            except (TypeError, AttributeError):
-                matrikkel_id_obj = MatrikkelenhetId(int(matrikkel_id_value))
-
-        # Create context
-        ctx = self._create_matrikkel_context(store_client)
+        # Get context
+        ctx = self._get_store_context()
 
         # Get the Matrikkelenhet object
         matrikkelenhet = store_client.service.getObject(matrikkel_id_obj, ctx)
@@ -282,12 +417,7 @@ class MatrikkelClient:
         owners = []
 
         # Extract eierforhold (owner relationships)
-        if hasattr(matrikkelenhet, 'eierforhold'):
-            eierforhold_list = matrikkelenhet.eierforhold
-        elif hasattr(matrikkelenhet, 'getEierforhold'):
-            eierforhold_list = matrikkelenhet.getEierforhold()
-        else:
-            return owners
+        eierforhold_list = self._get_field(matrikkelenhet, 'eierforhold', 'getEierforhold')
 
         # Extract items from the list
         items = self._extract_list_items(eierforhold_list)
@@ -364,11 +494,13 @@ class MatrikkelClient:
             # Extract ownership share/percentage
             if hasattr(eierforhold, 'andel'):
                 if eierforhold.andel:
-                    # Handle dict format like {'teller': '1', 'nevner': '2'}
-                    if isinstance(eierforhold.andel, dict):
-                        teller = eierforhold.andel.get('teller', '')
-                        nevner = eierforhold.andel.get('nevner', '')
-                        owner_info.andel = f"{teller}/{nevner}" if teller and nevner else str(eierforhold.andel)
+                    # Handle dict format like {'teller': '1', 'nevner': '2'} and the
+                    # zeep Brok object with teller/nevner attributes
+                    if isinstance(eierforhold.andel, dict) or hasattr(eierforhold.andel, 'teller'):
+                        andel = eierforhold.andel
+                        teller = andel.get('teller', '') if isinstance(andel, dict) else getattr(andel, 'teller', '')
+                        nevner = andel.get('nevner', '') if isinstance(andel, dict) else getattr(andel, 'nevner', '')
+                        owner_info.andel = f"{teller}/{nevner}" if teller and nevner else str(andel)
                     else:
                         owner_info.andel = str(eierforhold.andel)
                 else:
@@ -377,28 +509,16 @@ class MatrikkelClient:
                 owner_info.andel = str(eierforhold.getAndel()) if eierforhold.getAndel() else None
 
             # Get eierId
-            eier_id = None
-            if hasattr(eierforhold, 'eierId'):
-                eier_id = eierforhold.eierId
-            elif hasattr(eierforhold, 'getEierId'):
-                eier_id = eierforhold.getEierId()
+            eier_id = self._get_field(eierforhold, 'eierId', 'getEierId')
 
             if eier_id:
                 # eierId is already a PersonId object - use it directly
                 try:
                     person = store_client.service.getObject(eier_id, ctx)
 
-                    # Extract name
-                    if hasattr(person, 'navn'):
-                        owner_info.navn = person.navn
-                    elif hasattr(person, 'getNavn'):
-                        owner_info.navn = person.getNavn()
-
-                    # Extract address if available
-                    if hasattr(person, 'adresse'):
-                        owner_info.adresse = person.adresse
-                    elif hasattr(person, 'getAdresse'):
-                        owner_info.adresse = person.getAdresse()
+                    # Extract name and address if available
+                    owner_info.navn = self._get_field(person, 'navn', 'getNavn')
+                    owner_info.adresse = self._get_field(person, 'adresse', 'getAdresse')
 
                     owners.append(owner_info)
                 except Exception as e:
@@ -425,16 +545,19 @@ class MatrikkelClient:
             If successful, List[OwnerInfo] is returned and Exception is None.
             If failed, List[OwnerInfo] is None and Exception contains the error.
         """
-        results = []
+        # Create the clients and context up front so worker threads share them
+        self._get_store_client()
+        self._get_matrikkelenhet_client()
+        self._get_store_context()
 
-        for matrikkelenhet_id in matrikkelenhet_ids:
+        def get_one(matrikkelenhet_id: Any) -> Tuple[Any, Optional[List[OwnerInfo]], Optional[Exception]]:
             try:
                 owners = self.get_owner_information(matrikkelenhet_id, debug=debug, include_historical=include_historical)
-                results.append((matrikkelenhet_id, owners, None))
+                return (matrikkelenhet_id, owners, None)
             except Exception as e:
-                results.append((matrikkelenhet_id, None, e))
+                return (matrikkelenhet_id, None, e)
 
-        return results
+        return self._map_concurrently(get_one, matrikkelenhet_ids)
 
     def close(self):
         """Close all connections and clean up resources."""
@@ -443,6 +566,10 @@ class MatrikkelClient:
             self._session = None
         self._matrikkelenhet_client = None
         self._store_client = None
+        self._matrikkelenhet_id_builder = None
+        self._matrikkelenhet_ident_type = None
+        self._matrikkelenhet_context = None
+        self._store_context = None
 
     def __enter__(self):
         """Context manager entry."""
@@ -0,0 +1,37 @@
+-- Partial spatial index for ruteinfopunkt endpoint-name lookups
+-- Used by build_ruteinfopunkt_query() in services/route_endpoints.py
+-- (lookup_name_in_ruteinfopunkt and query_routes.py --test-ruteinfopunkt)
+--
+-- NOTE: This should be run in the stiflyt-db repository as part of
+-- database setup/migration, not in this application repository.
+--
+-- stiflyt.ruteinfopunkt is a view; create the index on its underlying table.
+-- Pass it as a psql variable, e.g.:
+--   psql -v ruteinfopunkt_table=<schema>.<table> -f scripts/ruteinfopunkt_indexes.sql
+--
+-- IMPORTANT: The index expression and WHERE clause must match the query
+-- literally (same ST_Transform expression, same tilrettelegging list),
+-- otherwise the planner cannot use the partial index.
+
+-- Check existing indexes on the underlying table
+SELECT
+    indexname,
+    indexdef
+FROM pg_indexes
+WHERE format('%I.%I', schemaname, tablename) = :'ruteinfopunkt_table';
+
+-- Spatial index limited to named hytter ('12', '42', '43', '44')
+-- and parkeringsplasser ('22')
+CREATE INDEX IF NOT EXISTS ruteinfopunkt_poi_spgist
+ON :ruteinfopunkt_table
+USING SPGIST ((ST_Transform(posisjon::geometry, 25833)))
+WHERE informasjon IS NOT NULL
+AND tilrettelegging IN ('12', '42', '43', '44', '22');
+
+-- Optional: if a stored 25833 column (e.g. posisjon_25833) is added to the
+-- table, index that column instead and switch the query to use it:
+--   CREATE INDEX ruteinfopunkt_poi_spgist ON <table> USING SPGIST (posisjon_25833)
+--   WHERE informasjon IS NOT NULL AND tilrettelegging IN ('12', '42', '43', '44', '22');
+
+-- Analyze table to update statistics
+ANALYZE :ruteinfopunkt_table;
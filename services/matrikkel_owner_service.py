@@ -1,5 +1,6 @@
 """Service for fetching owner information from Matrikkel API."""
 import os
+import re
 from typing import List, Dict, Optional, Tuple, Any
 from collections import defaultdict
 from dotenv import load_dotenv
@@ -9,6 +10,10 @@ from matrikkel.matrikkel_client import MatrikkelClient, MatrikkelConfig, Matrikk
 # This ensures .env is loaded even if database.py hasn't been imported yet
 load_dotenv()
 
+# "kommune-gardsnummer/bruksnummer[/festenummer]", compiled once; anything after a
+# further '/' is ignored and an empty festenummer means none
+MATRIKKELENHET_PATTERN = re.compile(r'\s*(\d+)\s*-\s*(\d+)\s*/\s*(\d+)\s*(?:/\s*(\d*)\s*(?:/.*)?)?')
+
 
 def get_matrikkel_config() -> Optional[MatrikkelConfig]:
     """
@@ -60,33 +65,18 @@ def parse_matrikkelenhet_string(matrikkel_str: str) -> Optional[MatrikkelIdent]:
     if not matrikkel_str or 'Umatrikulert' in matrikkel_str:
         return None
 
-    try:
-        # Split on '-' to separate kommune from rest
-        parts = matrikkel_str.split('-', 1)
-        if len(parts) != 2:
-            return None
-
-        kommune = int(parts[0])
-        rest = parts[1]
-
-        # Split on '/' to get gardsnummer, bruksnummer, festenummer
-        numbers = rest.split('/')
-        if len(numbers) < 2:
-            return None
-
-        gardsnummer = int(numbers[0])
-        bruksnummer = int(numbers[1])
-        festenummer = int(numbers[2]) if len(numbers) > 2 and numbers[2] else None
-
-        return MatrikkelIdent(
-            kommune=kommune,
-            gardsnummer=gardsnummer,
-            bruksnummer=bruksnummer,
-            festenummer=festenummer
-        )
-    except (ValueError, IndexError):
+    match = MATRIKKELENHET_PATTERN.fullmatch(matrikkel_str)
+    if not match:
         return None
 
+    kommune, gardsnummer, bruksnummer, festenummer = match.groups()
+    return MatrikkelIdent(
+        kommune=int(kommune),
+        gardsnummer=int(gardsnummer),
+        bruksnummer=int(bruksnummer),
+        festenummer=int(festenummer) if festenummer else None
+    )
+
 
 def format_owner_info(owners: List[OwnerInfo]) -> str:
     """
@@ -265,70 +255,40 @@ def fetch_owners_for_matrikkelenheter(
                 return [(item, None, None) for item in matrikkelenhet_items]
 
             # Step 2: Find matrikkelenhet IDs in batch (only for unique idents)
-            unique_ident_list = list(unique_idents.values())
-            matrikkelenhet_id_results = client.find_matrikkelenhet_ids_batch(unique_ident_list)
-
-            # Step 3: Map results back to ident keys and get owner information
-            ident_key_to_matrikkelenhet_id: Dict[tuple, Any] = {}
-            ident_key_to_error: Dict[tuple, Exception] = {}
-
-            for ident, matrikkelenhet_id, error in matrikkelenhet_id_results:
-                # Find which ident_key this ident corresponds to
-                ident_key = (
-                    ident.kommune,
-                    ident.gardsnummer,
-                    ident.bruksnummer,
-                    ident.festenummer if ident.festenummer is not None else 0
-                )
+            ident_keys = list(unique_idents.keys())
+            matrikkelenhet_id_results = client.find_matrikkelenhet_ids_batch(list(unique_idents.values()))
+
+            # Step 3: Batch results come back in input order, so pair them with the
+            # ident keys by position and keep one (owner_info, error) per key
+            ident_key_to_result: Dict[tuple, Tuple[Optional[str], Optional[Exception]]] = {}
+            found: List[Tuple[tuple, Any]] = []  # (ident_key, matrikkelenhet_id)
+
+            for ident_key, (_, matrikkelenhet_id, error) in zip(ident_keys, matrikkelenhet_id_results):
                 if matrikkelenhet_id and error is None:
-                    ident_key_to_matrikkelenhet_id[ident_key] = matrikkelenhet_id
+                    found.append((ident_key, matrikkelenhet_id))
                 else:
-                    ident_key_to_error[ident_key] = error
+                    # Error finding matrikkelenhet ID
+                    ident_key_to_result[ident_key] = (None, error)
 
             # Step 4: Get owners in batch (only for unique matrikkelenhet IDs)
             # Only fetch current owners (not historical) - default behavior
-            unique_matrikkelenhet_ids = list(ident_key_to_matrikkelenhet_id.values())
-            owner_results = client.get_owners_batch(unique_matrikkelenhet_ids, include_historical=False)
-
-            # Step 5: Map owner results back to ident keys
-            matrikkelenhet_id_to_owners: Dict[Any, List[OwnerInfo]] = {}
-            matrikkelenhet_id_to_error: Dict[Any, Exception] = {}
+            owner_results = client.get_owners_batch(
+                [matrikkelenhet_id for _, matrikkelenhet_id in found],
+                include_historical=False
+            )
 
-            for matrikkelenhet_id, owners, error in owner_results:
+            # Step 5: Format owners (or record the error) per ident key
+            for (ident_key, _), (_, owners, error) in zip(found, owner_results):
                 if owners is not None and error is None:
-                    matrikkelenhet_id_to_owners[matrikkelenhet_id] = owners
+                    ident_key_to_result[ident_key] = (format_owner_info(owners), None)
                 else:
-                    matrikkelenhet_id_to_error[matrikkelenhet_id] = error
+                    ident_key_to_result[ident_key] = (None, error)
 
-            # Step 6: Map results back to all original items
-            # For each unique ident_key, get the owner info and apply to all items with that key
+            # Step 6: Apply each unique result to all original items with that key
             for ident_key, items in ident_to_items.items():
-                if ident_key in ident_key_to_error:
-                    # Error finding matrikkelenhet ID
-                    error = ident_key_to_error[ident_key]
-                    for item in items:
-                        results.append((item, None, error))
-                elif ident_key in ident_key_to_matrikkelenhet_id:
-                    matrikkelenhet_id = ident_key_to_matrikkelenhet_id[ident_key]
-                    if matrikkelenhet_id in matrikkelenhet_id_to_error:
-                        # Error getting owners
-                        error = matrikkelenhet_id_to_error[matrikkelenhet_id]
-                        for item in items:
-                            results.append((item, None, error))
-                    elif matrikkelenhet_id in matrikkelenhet_id_to_owners:
-                        # Success - format owners and apply to all items with this ident
-                        owners = matrikkelenhet_id_to_owners[matrikkelenhet_id]
-                        formatted_owners = format_owner_info(owners)
-                        for item in items:
-                            results.append((item, formatted_owners, None))
-                    else:
-                        # No owners found
-                        for item in items:
-                            results.append((item, None, None))
-                else:
-                    # Should not happen, but handle gracefully
-                    for item in items:
-                        results.append((item, None, None))
+                formatted_owners, error = ident_key_to_result.get(ident_key, (None, None))
+                for item in items:
+                    results.append((item, formatted_owners, error))
 
             # Handle items that couldn't be parsed
             for item in items_without_ident:
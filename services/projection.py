@@ -0,0 +1,52 @@
+"""
+WGS84 to EPSG:25833 projection in pure Python.
+
+Lets lookups send query points to PostGIS already in EPSG:25833 (and lets the
+in-process ruteinfopunkt index work in meters) without a pyproj dependency.
+"""
+import math
+from typing import Tuple
+
+# EPSG:25833 (ETRS89 / UTM zone 33N) on the GRS80 ellipsoid
+_UTM_A = 6378137.0
+_UTM_F = 1 / 298.257222101
+_UTM_K0 = 0.9996
+_UTM_FALSE_EASTING = 500000.0
+_UTM_LON0 = math.radians(15.0)
+_UTM_N = _UTM_F / (2 - _UTM_F)
+_UTM_E = math.sqrt(_UTM_F * (2 - _UTM_F))
+_UTM_RECTIFYING_RADIUS = _UTM_A / (1 + _UTM_N) * (1 + _UTM_N ** 2 / 4 + _UTM_N ** 4 / 64)
+_UTM_ALPHA = (
+    _UTM_N / 2 - 2 * _UTM_N ** 2 / 3 + 5 * _UTM_N ** 3 / 16 + 41 * _UTM_N ** 4 / 180,
+    13 * _UTM_N ** 2 / 48 - 3 * _UTM_N ** 3 / 5 + 557 * _UTM_N ** 4 / 1440,
+    61 * _UTM_N ** 3 / 240 - 103 * _UTM_N ** 4 / 140,
+    49561 * _UTM_N ** 4 / 161280,
+)
+
+
+def wgs84_to_utm33(lon: float, lat: float) -> Tuple[float, float]:
+    """
+    Project a WGS84 coordinate to EPSG:25833 (Krüger series, sub-millimeter accuracy).
+
+    Args:
+        lon: Longitude in degrees
+        lat: Latitude in degrees
+
+    Returns:
+        Tuple of (easting, northing) in meters
+    """
+    phi = math.radians(lat)
+    dlon = math.radians(lon) - _UTM_LON0
+    sin_phi = math.sin(phi)
+    t = math.sinh(math.atanh(sin_phi) - _UTM_E * math.atanh(_UTM_E * sin_phi))
+    xi_prime = math.atan2(t, math.cos(dlon))
+    eta_prime = math.atanh(math.sin(dlon) / math.sqrt(1 + t * t))
+
+    xi = xi_prime
+    eta = eta_prime
+    for j, alpha in enumerate(_UTM_ALPHA, start=1):
+        xi += alpha * math.sin(2 * j * xi_prime) * math.cosh(2 * j * eta_prime)
+        eta += alpha * math.cos(2 * j * xi_prime) * math.sinh(2 * j * eta_prime)
+
+    scale = _UTM_K0 * _UTM_RECTIFYING_RADIUS
+    return _UTM_FALSE_EASTING + scale * eta, scale * xi
@@ -3,9 +3,73 @@ Service for looking up route endpoint names (start and end points).
 Looks up names from ruteinfopunkt in turrutebasen first, then falls back to stedsnavn database.
 """
 import json
+import os
 from typing import Optional, Dict, Any, Tuple
 from psycopg.rows import dict_row
 from .database import ROUTE_SCHEMA, validate_schema_name
+from .projection import wgs84_to_utm33
+
+
+# tilrettelegging codes searched in ruteinfopunkt: hytter ('12' Hytte, '42' betjent,
+# '43' selvbetjent, '44' ubetjent) first, then '22' Parkeringsplass
+RUTEINFOPUNKT_TILRETTELEGGING = ['12', '42', '43', '44', '22']
+
+# Sort priority per tilrettelegging code (lower first)
+TILRETTELEGGING_PRIORITY = {'12': 1, '42': 1, '43': 1, '44': 1, '22': 2}
+
+# Inlined as literals (not a bound array) so the WHERE clause matches the predicate of
+# the partial index in scripts/ruteinfopunkt_indexes.sql and the planner can use it
+RUTEINFOPUNKT_TILRETTELEGGING_SQL = ", ".join(f"'{code}'" for code in RUTEINFOPUNKT_TILRETTELEGGING)
+
+# ORDER BY key built from TILRETTELEGGING_PRIORITY: hytter first, parkeringsplass last.
+# Evaluated only for the few rows ST_DWithin leaves, so a stored priority column
+# would not save a measurable sort; the view would also have to expose it
+_PRIORITY_SQL = "CASE r.tilrettelegging {} ELSE 3 END".format(
+    " ".join(f"WHEN '{code}' THEN {priority}" for code, priority in TILRETTELEGGING_PRIORITY.items())
+)
+
+# Set STIFLYT_POI_INDEX=1 to look up ruteinfopunkt names in an in-process index
+# (services/ruteinfopunkt_index.py) instead of querying PostGIS for every point
+RUTEINFOPUNKT_INDEX_ENABLED = os.getenv("STIFLYT_POI_INDEX", "") == "1"
+
+
+def build_ruteinfopunkt_query(schema_quoted: str) -> str:
+    """
+    Build the nearest-ruteinfopunkt query (hytter before parkering, then by distance).
+
+    The query point is passed already projected to EPSG:25833 (see wgs84_to_utm33),
+    so PostGIS does no CRS math for it. The ST_DWithin expression and
+    the informasjon/tilrettelegging filters match the partial spatial index in
+    scripts/ruteinfopunkt_indexes.sql, so candidates come from the index and
+    ST_Distance is only evaluated for the few rows that pass.
+
+    Parameters, in order: x, y (EPSG:25833), radius in meters and row limit.
+
+    Args:
+        schema_quoted: Quoted schema containing the ruteinfopunkt view
+
+    Returns:
+        SQL query string
+    """
+    return f"""
+        WITH q AS (
+            SELECT ST_SetSRID(ST_MakePoint(%s, %s), 25833) AS geom
+        )
+        SELECT
+            r.objid,
+            r.informasjon as navn,
+            r.tilrettelegging,
+            ST_Distance(ST_Transform(r.posisjon::geometry, 25833), q.geom) as distance_meters
+        FROM {schema_quoted}.ruteinfopunkt r
+        CROSS JOIN q
+        WHERE ST_DWithin(ST_Transform(r.posisjon::geometry, 25833), q.geom, %s)
+        AND r.informasjon IS NOT NULL
+        AND r.tilrettelegging IN ({RUTEINFOPUNKT_TILRETTELEGGING_SQL})
+        ORDER BY
+            {_PRIORITY_SQL},
+            distance_meters ASC
+        LIMIT %s
+    """
 
 
 def extract_route_endpoints(route_geometry_geojson: Dict[str, Any]) -> Tuple[Optional[Tuple[float, float]], Optional[Tuple[float, float]]]:
@@ -54,6 +118,12 @@ def extract_route_endpoints(route_geometry_geojson: Dict[str, Any]) -> Tuple[Opt
     return None, None
 
 
+# The lookup queries below run with prepare=True: get_route_endpoint_names looks up
+# both endpoints on the same connection, so the second call skips parse and plan.
+# Explicit per-query preparation (rather than prepare_threshold=0 on every
+# connection) keeps other queries usable behind transaction-pooling proxies.
+
+
 def lookup_name_in_ruteinfopunkt(conn, point_lon: float, point_lat: float, rutenummer: Optional[str] = None, search_radius_meters: float = 100.0) -> Optional[Dict[str, Any]]:
     """
     Look up a name for a point in the ruteinfopunkt view in stiflyt schema.
@@ -89,56 +159,37 @@ def lookup_name_in_ruteinfopunkt(conn, point_lon: float, point_lat: float, ruten
                     SELECT FROM information_schema.views
                     WHERE table_schema = %s AND table_name = 'ruteinfopunkt'
                 ) as exists
-            """, (ROUTE_SCHEMA,))
+            """, (ROUTE_SCHEMA,), prepare=True)
             result = cur.fetchone()
             view_exists = result.get('exists') if result else False
 
             if not view_exists:
                 return None
 
-            # Use the stable view - columns are: informasjon (for name) and posisjon (for geometry)
-            schema_quoted = quote_identifier(ROUTE_SCHEMA)
-            table_quoted = quote_identifier('ruteinfopunkt')
-
-            query = f"""
-                SELECT
-                    objid,
-                    informasjon as navn,
-                    tilrettelegging,
-                    ST_Distance(
-                        ST_Transform(ST_SetSRID(ST_MakePoint(%s, %s), 4326), 25833),
-                        ST_Transform(posisjon::geometry, 25833)
-                    ) as distance_meters
-                FROM {schema_quoted}.{table_quoted}
-                WHERE ST_DWithin(
-                    ST_Transform(posisjon::geometry, 25833),
-                    ST_Transform(ST_SetSRID(ST_MakePoint(%s, %s), 4326), 25833),
-                    %s
-                )
-                AND informasjon IS NOT NULL
-                AND tilrettelegging = ANY(%s)
-                ORDER BY
-                    CASE
-                        WHEN tilrettelegging IN ('12', '42', '43', '44') THEN 1  -- Hytter first
-                        WHEN tilrettelegging = '22' THEN 2  -- Parkeringsplass last
-                        ELSE 3
-                    END,
-                    distance_meters ASC
-                LIMIT 1
-            """
-
-            # Filter values: '12' (Hytte), '42' (Hytte betjent), '43' (Hytte selvbetjent), '44' (Hytte ubetjent), '22' (Parkeringsplass)
-            filter_values = ['12', '42', '43', '44', '22']
-            cur.execute(query, (point_lon, point_lat, point_lon, point_lat, search_radius_meters, filter_values))
-            result = cur.fetchone()
-
-            if result and result.get('navn'):
-                return {
-                    'name': str(result['navn']),
-                    'distance_meters': float(result['distance_meters']) if result.get('distance_meters') is not None else None,
-                    'source': 'ruteinfopunkt',
-                    'tilrettelegging': result.get('tilrettelegging')
-                }
+            index = None
+            if RUTEINFOPUNKT_INDEX_ENABLED:
+                # In-process grid over the (few thousand) named hytter/parkering points;
+                # None while it cannot be loaded, then the PostGIS query below is used
+                from .ruteinfopunkt_index import get_ruteinfopunkt_index
+
+                index = get_ruteinfopunkt_index(conn, quote_identifier(ROUTE_SCHEMA))
+
+            if index is not None:
+                matches = index.nearest(point_lon, point_lat, search_radius_meters)
+                result = matches[0] if matches else None
+            else:
+                # Use the stable view - columns are: informasjon (for name) and posisjon (for geometry)
+                query = build_ruteinfopunkt_query(quote_identifier(ROUTE_SCHEMA))
+                cur.execute(query, (*wgs84_to_utm33(point_lon, point_lat), search_radius_meters, 1), prepare=True)
+                result = cur.fetchone()
+
+        if result and result.get('navn'):
+            return {
+                'name': str(result['navn']),
+                'distance_meters': float(result['distance_meters']) if result.get('distance_meters') is not None else None,
+                'source': 'ruteinfopunkt',
+                'tilrettelegging': result.get('tilrettelegging')
+            }
     except Exception as e:
         try:
             conn.rollback()
@@ -185,7 +236,7 @@ def lookup_name_in_stedsnavn(conn, point_lon: float, point_lat: float, search_ra
                             ),
                             25833
                         ),
-                        ST_Transform(ST_SetSRID(ST_MakePoint(%s, %s), 4326), 25833)
+                        ST_SetSRID(ST_MakePoint(%s, %s), 25833)
                     ) as distance_meters
                 FROM public.stedsnavn sn
                 JOIN public.skrivemate sm ON sn.objid = sm.stedsnavn_fk
@@ -203,7 +254,7 @@ def lookup_name_in_stedsnavn(conn, point_lon: float, point_lat: float, search_ra
                         ),
                         25833
                     ),
-                    ST_Transform(ST_SetSRID(ST_MakePoint(%s, %s), 4326), 25833),
+                    ST_SetSRID(ST_MakePoint(%s, %s), 25833),
                     %s
                 )
                 AND sm.komplettskrivemate IS NOT NULL
@@ -211,7 +262,8 @@ def lookup_name_in_stedsnavn(conn, point_lon: float, point_lat: float, search_ra
                 LIMIT 1;
             """
 
-            cur.execute(query, [point_lon, point_lat, point_lon, point_lat, search_radius_meters])
+            x, y = wgs84_to_utm33(point_lon, point_lat)
+            cur.execute(query, [x, y, x, y, search_radius_meters], prepare=True)
             result = cur.fetchone()
 
             if result and result.get('navn'):
@@ -259,9 +311,9 @@ def lookup_name_in_anchor_nodes(conn, point_lon: float, point_lat: float, search
                     SELECT FROM information_schema.tables
                     WHERE table_schema = %s AND table_name = 'anchor_nodes'
                 )
-            """, (ROUTE_SCHEMA,))
+            """, (ROUTE_SCHEMA,), prepare=True)
             result = cur.fetchone()
-            table_exists = result[0] if result else False
+            table_exists = result.get('exists') if result else False
             if not table_exists:
                 return None
 
@@ -276,20 +328,21 @@ def lookup_name_in_anchor_nodes(conn, point_lon: float, point_lat: float, search
                     navn_kilde,
                     navn_distance_m,
                     ST_Distance(
-                        ST_Transform(ST_SetSRID(ST_MakePoint(%s, %s), 4326), 25833),
+                        ST_SetSRID(ST_MakePoint(%s, %s), 25833),
                         ST_Transform(geom, 25833)
                     ) as distance_meters
                 FROM {schema_quoted}.{table_quoted}
                 WHERE navn IS NOT NULL
                   AND ST_DWithin(
                       ST_Transform(geom, 25833),
-                      ST_Transform(ST_SetSRID(ST_MakePoint(%s, %s), 4326), 25833),
+                      ST_SetSRID(ST_MakePoint(%s, %s), 25833),
                       %s
                   )
                 ORDER BY distance_meters ASC
                 LIMIT 1
             """
-            cur.execute(query, (point_lon, point_lat, point_lon, point_lat, search_radius_meters))
+            x, y = wgs84_to_utm33(point_lon, point_lat)
+            cur.execute(query, (x, y, x, y, search_radius_meters), prepare=True)
             result = cur.fetchone()
 
             if result and result.get('navn'):
@@ -326,7 +379,8 @@ def lookup_endpoint_name(conn, point_lon: float, point_lat: float, rutenummer: O
     1. First try anchor_nodes (already has names found via stedsnavn/ruteinfopunkt)
     2. Then check ruteinfopunkt directly
     3. Finally check stedsnavn directly
-    4. Prefer ruteinfopunkt over stedsnavn if both are found
+
+    Stops at the first source with a match.
 
     Args:
         conn: Database connection
@@ -345,22 +399,13 @@ def lookup_endpoint_name(conn, point_lon: float, point_lat: float, rutenummer: O
     if anchor_node_result:
         return anchor_node_result
 
-    # Check both ruteinfopunkt and stedsnavn directly
+    # Then ruteinfopunkt, preferred over stedsnavn (more specific to the route), so
+    # stedsnavn is only queried when ruteinfopunkt has no match
     ruteinfopunkt_result = lookup_name_in_ruteinfopunkt(conn, point_lon, point_lat, rutenummer, search_radius_meters=search_radius)
-    stedsnavn_result = lookup_name_in_stedsnavn(conn, point_lon, point_lat, search_radius_meters=search_radius)
-
-    # Prefer ruteinfopunkt if both are found (more specific to the route)
-    if ruteinfopunkt_result and stedsnavn_result:
-        return ruteinfopunkt_result
-
-    # Return whichever is found
     if ruteinfopunkt_result:
         return ruteinfopunkt_result
 
-    if stedsnavn_result:
-        return stedsnavn_result
-
-    return None
+    return lookup_name_in_stedsnavn(conn, point_lon, point_lat, search_radius_meters=search_radius)
 
 
 def get_route_endpoint_names(conn, route_geometry_geojson: Dict[str, Any], rutenummer: Optional[str] = None) -> Dict[str, Optional[Dict[str, Any]]]:
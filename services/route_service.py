@@ -948,29 +948,21 @@ def search_places(query: str, limit: int = 20):
     return results[:limit]
 
 
-def get_complete_route(conn, rutenummer, include_geometry=True, include_segments=False, include_endpoint_names=True):
+def get_route_metadata(conn, rutenummer):
     """
-    Get a complete route by combining all segments with the same rutenummer.
-    Includes endpoint names from place name lookup.
+    Get route metadata (rutenavn, vedlikeholdsansvarlig) for a rutenummer.
 
     Args:
         conn: Database connection
         rutenummer: Route number
-        include_geometry: If True, include GeoJSON geometry (default: True)
-        include_segments: If True, include individual segment details (default: False)
-        include_endpoint_names: If True, lookup and include from/to names (default: True)
 
     Returns:
-        dict with complete route information, or None if route not found
+        dict with rutenummer, rutenavn and vedlikeholdsansvarlig, or None if route not found
     """
-    from .route_geometry import get_corrected_route_geometry
-    from .route_endpoints import get_route_endpoint_names, extract_route_endpoints
-
     # Validate schema name
     if not validate_schema_name(ROUTE_SCHEMA):
         raise ValueError(f"Invalid ROUTE_SCHEMA: {ROUTE_SCHEMA}")
 
-    # First, check if route exists and get metadata
     route_metadata_query = f"""
         SELECT DISTINCT
             fi.rutenummer,
@@ -983,16 +975,44 @@ def get_complete_route(conn, rutenummer, include_geometry=True, include_segments
 
     with conn.cursor(row_factory=dict_row) as cur:
         cur.execute(route_metadata_query, (rutenummer,))
-        metadata_row = cur.fetchone()
+        return cur.fetchone()
 
-        if not metadata_row:
-            return None  # Route not found
 
-        rutenavn = metadata_row.get('rutenavn')
-        vedlikeholdsansvarlig = metadata_row.get('vedlikeholdsansvarlig')
+def get_complete_route(conn, rutenummer, include_geometry=True, include_segments=False, include_endpoint_names=True,
+                       route_metadata=None, route_data=None):
+    """
+    Get a complete route by combining all segments with the same rutenummer.
+    Includes endpoint names from place name lookup.
+
+    Args:
+        conn: Database connection
+        rutenummer: Route number
+        include_geometry: If True, include GeoJSON geometry (default: True)
+        include_segments: If True, include individual segment details (default: False)
+        include_endpoint_names: If True, lookup and include from/to names (default: True)
+        route_metadata: Optional result of get_route_metadata(), if already loaded
+        route_data: Optional result of get_corrected_route_geometry(), if already loaded
+
+    Returns:
+        dict with complete route information, or None if route not found
+    """
+    from .route_geometry import get_corrected_route_geometry
+
+    # Validate schema name
+    if not validate_schema_name(ROUTE_SCHEMA):
+        raise ValueError(f"Invalid ROUTE_SCHEMA: {ROUTE_SCHEMA}")
+
+    # First, check if route exists and get metadata
+    metadata_row = route_metadata if route_metadata is not None else get_route_metadata(conn, rutenummer)
+    if not metadata_row:
+        return None  # Route not found
+
+    rutenavn = metadata_row.get('rutenavn')
+    vedlikeholdsansvarlig = metadata_row.get('vedlikeholdsansvarlig')
 
     # Get corrected route geometry (combines all segments)
-    route_data = get_corrected_route_geometry(conn, rutenummer)
+    if route_data is None:
+        route_data = get_corrected_route_geometry(conn, rutenummer)
 
     if not route_data:
         return None  # No segments found
@@ -1083,28 +1103,32 @@ def get_complete_route(conn, rutenummer, include_geometry=True, include_segments
     if include_segments:
         segments = []
         segments_info = route_data.get('segments_info', [])
+
+        # Get route info for all segments in one query instead of one query per segment
+        segment_routes_query = f"""
+            SELECT DISTINCT
+                fi.fotrute_fk,
+                fi.rutenummer,
+                fi.rutenavn,
+                fi.vedlikeholdsansvarlig
+            FROM {ROUTE_SCHEMA}.fotruteinfo fi
+            WHERE fi.fotrute_fk = ANY(%s)
+        """
+        with conn.cursor(row_factory=dict_row) as cur:
+            cur.execute(segment_routes_query, ([seg_info.get('objid') for seg_info in segments_info],))
+            route_rows = cur.fetchall()
+
+        routes_by_objid = {}
+        for route_row in route_rows:
+            routes_by_objid.setdefault(route_row['fotrute_fk'], []).append({
+                'rutenummer': route_row['rutenummer'],
+                'rutenavn': route_row.get('rutenavn'),
+                'vedlikeholdsansvarlig': route_row.get('vedlikeholdsansvarlig')
+            })
+
         for seg_info in segments_info:
             objid = seg_info.get('objid')
-            # Get route info for this segment
-            segment_routes_query = f"""
-                SELECT DISTINCT
-                    fi.rutenummer,
-                    fi.rutenavn,
-                    fi.vedlikeholdsansvarlig
-                FROM {ROUTE_SCHEMA}.fotruteinfo fi
-                WHERE fi.fotrute_fk = %s
-            """
-            with conn.cursor(row_factory=dict_row) as cur:
-                cur.execute(segment_routes_query, (objid,))
-                route_rows = cur.fetchall()
-
-            route_infos = []
-            for route_row in route_rows:
-                route_infos.append({
-                    'rutenummer': route_row['rutenummer'],
-                    'rutenavn': route_row.get('rutenavn'),
-                    'vedlikeholdsansvarlig': route_row.get('vedlikeholdsansvarlig')
-                })
+            route_infos = routes_by_objid.get(objid, [])
 
             segment_geom = seg_info.get('geometry') if include_geometry else None
             segments.append({
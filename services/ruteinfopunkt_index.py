@@ -0,0 +1,192 @@
+"""
+In-process spatial index over named ruteinfopunkt (hytter and parkering).
+
+Endpoint-name lookups run twice per route (start and end point). Instead of a
+PostGIS ST_DWithin round trip per point, the candidate points are loaded once
+into a uniform grid in EPSG:25833 and searched in Python. The index is rebuilt
+in the background after RUTEINFOPUNKT_INDEX_TTL seconds so edits in the
+database are picked up.
+
+Opt-in with STIFLYT_POI_INDEX=1 (see lookup_name_in_ruteinfopunkt). When enabled
+it replaces the PostGIS query and its partial index for these lookups.
+"""
+import math
+import os
+import threading
+import time
+from typing import Optional, Dict, Any, List, Tuple
+
+from .projection import wgs84_to_utm33
+from .route_endpoints import RUTEINFOPUNKT_TILRETTELEGGING_SQL, TILRETTELEGGING_PRIORITY
+
+# Seconds before the index is reloaded from the database
+RUTEINFOPUNKT_INDEX_TTL = int(os.getenv("RUTEINFOPUNKT_INDEX_TTL", "3600"))
+
+# Seconds to wait after a failed load before trying again (PostGIS is used meanwhile)
+RUTEINFOPUNKT_INDEX_RETRY = 60
+
+# Grid cell size in meters; lookups use radii of 100-500 m, so a query touches few cells
+GRID_CELL_SIZE = 1000.0
+
+
+class RuteinfopunktIndex:
+    """Grid index over ruteinfopunkt positions in EPSG:25833."""
+
+    def __init__(self, rows: List[Tuple[Any, float, float, str, str]]):
+        """
+        Build the grid.
+
+        Args:
+            rows: (objid, x, y, navn, tilrettelegging) tuples, coordinates in EPSG:25833
+        """
+        self.rows = rows
+        self.built_at = time.monotonic()
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        for i, (_, x, y, _, _) in enumerate(rows):
+            key = (math.floor(x / GRID_CELL_SIZE), math.floor(y / GRID_CELL_SIZE))
+            self._cells.setdefault(key, []).append(i)
+
+    def nearest(self, point_lon: float, point_lat: float, search_radius_meters: float, limit: int = 1) -> List[Dict[str, Any]]:
+        """
+        Find points within the radius, hytter before parkering, then by distance.
+
+        Args:
+            point_lon: Longitude of the point (WGS84)
+            point_lat: Latitude of the point (WGS84)
+            search_radius_meters: Search radius in meters
+            limit: Maximum number of results
+
+        Returns:
+            List of dicts with objid, navn, tilrettelegging and distance_meters
+        """
+        x, y = wgs84_to_utm33(point_lon, point_lat)
+        min_cx = math.floor((x - search_radius_meters) / GRID_CELL_SIZE)
+        max_cx = math.floor((x + search_radius_meters) / GRID_CELL_SIZE)
+        min_cy = math.floor((y - search_radius_meters) / GRID_CELL_SIZE)
+        max_cy = math.floor((y + search_radius_meters) / GRID_CELL_SIZE)
+
+        matches = []
+        rows = self.rows
+        cells = self._cells
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                for i in cells.get((cx, cy), ()):
+                    distance = math.hypot(rows[i][1] - x, rows[i][2] - y)
+                    if distance <= search_radius_meters:
+                        matches.append((TILRETTELEGGING_PRIORITY.get(rows[i][4], 3), distance, i))
+
+        matches.sort()
+        return [
+            {
+                'objid': rows[i][0],
+                'navn': rows[i][3],
+                'tilrettelegging': rows[i][4],
+                'distance_meters': distance,
+            }
+            for _, distance, i in matches[:limit]
+        ]
+
+
+_index: Optional[RuteinfopunktIndex] = None
+_index_failed_at: Optional[float] = None
+_index_lock = threading.Lock()
+
+
+def load_ruteinfopunkt_index(conn, schema_quoted: str) -> RuteinfopunktIndex:
+    """
+    Load named hytter/parkering ruteinfopunkt from the database into a new index.
+
+    Args:
+        conn: Database connection
+        schema_quoted: Quoted schema containing the ruteinfopunkt view
+
+    Returns:
+        RuteinfopunktIndex
+    """
+    # Binary COPY streams the rows without per-value text parsing; objid is cast to
+    # text because its type is not needed here (lookups only return name/distance)
+    copy_sql = f"""
+        COPY (
+            SELECT
+                r.objid::text,
+                ST_X(p.geom),
+                ST_Y(p.geom),
+                r.informasjon::text,
+                r.tilrettelegging::text
+            FROM {schema_quoted}.ruteinfopunkt r
+            CROSS JOIN LATERAL (SELECT ST_Transform(r.posisjon::geometry, 25833) AS geom OFFSET 0) p
+            WHERE r.informasjon IS NOT NULL
+            AND r.posisjon IS NOT NULL
+            AND r.tilrettelegging IN ({RUTEINFOPUNKT_TILRETTELEGGING_SQL})
+        ) TO STDOUT (FORMAT BINARY)
+    """
+    with conn.cursor() as cur:
+        with cur.copy(copy_sql) as copy:
+            copy.set_types(['text', 'float8', 'float8', 'text', 'text'])
+            rows = list(copy.rows())
+    return RuteinfopunktIndex(rows)
+
+
+def _reload_ruteinfopunkt_index(schema_quoted: str) -> None:
+    """Rebuild the index on its own connection (background thread; releases _index_lock)."""
+    global _index, _index_failed_at
+    from .database import db_connection
+
+    try:
+        with db_connection() as conn:
+            index = load_ruteinfopunkt_index(conn, schema_quoted)
+        _index = index
+        _index_failed_at = None
+        print(f"Reloaded ruteinfopunkt index: {len(index.rows)} points")
+    except Exception as e:
+        _index_failed_at = time.monotonic()
+        print(f"Could not reload ruteinfopunkt index, keeping the current one: {e}")
+    finally:
+        _index_lock.release()
+
+
+def get_ruteinfopunkt_index(conn, schema_quoted: str) -> Optional[RuteinfopunktIndex]:
+    """
+    Get the process-wide index, loading it on first use.
+
+    Once the index is older than the TTL it is rebuilt in a background thread
+    while lookups keep using the current one, so no request waits for the
+    reload. Only the first load runs on the request path; lookups arriving
+    while it runs use PostGIS instead of waiting. A failed load is remembered
+    for RUTEINFOPUNKT_INDEX_RETRY seconds before it is tried again.
+
+    Args:
+        conn: Database connection (used only for the first load)
+        schema_quoted: Quoted schema containing the ruteinfopunkt view
+
+    Returns:
+        RuteinfopunktIndex, or None if it is not loaded (yet)
+    """
+    global _index, _index_failed_at
+    now = time.monotonic()
+    failed_recently = _index_failed_at is not None and now - _index_failed_at < RUTEINFOPUNKT_INDEX_RETRY
+
+    index = _index
+    if index is not None:
+        if now - index.built_at >= RUTEINFOPUNKT_INDEX_TTL and not failed_recently and _index_lock.acquire(blocking=False):
+            threading.Thread(
+                target=_reload_ruteinfopunkt_index, args=(schema_quoted,),
+                name="ruteinfopunkt-index-reload", daemon=True
+            ).start()
+        return index
+
+    if failed_recently or not _index_lock.acquire(blocking=False):
+        return None
+    try:
+        index = load_ruteinfopunkt_index(conn, schema_quoted)
+        _index = index
+        _index_failed_at = None
+    except Exception as e:
+        conn.rollback()
+        _index_failed_at = time.monotonic()
+        print(f"Could not load ruteinfopunkt index, using PostGIS lookups: {e}")
+        return None
+    finally:
+        _index_lock.release()
+    print(f"Loaded ruteinfopunkt index: {len(index.rows)} points")
+    return index
@@ -1,6 +1,10 @@
 """Startup checks for backend – validate database structure before serving requests."""
 
-from typing import Any
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
 
 from services.database import db_connection
 from scripts.validate_database_structure import (  # type: ignore
@@ -13,6 +17,79 @@ from scripts.validate_database_structure import (  # type: ignore
 )
 
 
+# Result of the last successful validation, keyed by database; lets reloads and
+# extra workers skip the full introspection while the schema is unchanged
+STARTUP_CACHE_FILE = Path(os.getenv("XDG_CACHE_HOME", Path.home() / ".cache")) / "stiflyt" / "startup.json"
+
+# One catalog query summarizing everything validation looks at: tables/views and
+# their columns, constraints in the schema, and the PostGIS version
+FINGERPRINT_QUERY = """
+    SELECT current_database() || '@' || COALESCE(inet_server_addr()::text, 'local') AS database,
+           md5(concat_ws('|',
+               (SELECT string_agg(c.relname || '.' || a.attname || ':' || a.atttypid::text || ':' || c.relkind,
+                                  ',' ORDER BY c.relname, a.attnum)
+                FROM pg_catalog.pg_class c
+                JOIN pg_catalog.pg_attribute a ON a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+                WHERE c.relnamespace = to_regnamespace(%s)),
+               (SELECT string_agg(con.conname || ':' || con.contype, ',' ORDER BY con.conname)
+                FROM pg_catalog.pg_constraint con
+                WHERE con.connamespace = to_regnamespace(%s)),
+               (SELECT extversion FROM pg_catalog.pg_extension WHERE extname = 'postgis')
+           )) AS fingerprint
+"""
+
+
+def _fingerprint(conn, schema: str) -> Optional[Dict[str, str]]:
+    """
+    Compute a fingerprint of the database objects checked at startup.
+
+    Args:
+        conn: Database connection
+        schema: Schema to fingerprint
+
+    Returns:
+        Dict with 'database' and 'fingerprint', or None if it could not be computed
+    """
+    try:
+        with conn.cursor() as cur:
+            cur.execute(FINGERPRINT_QUERY, (schema, schema))
+            row = cur.fetchone()
+    except Exception as e:
+        print(f"Could not compute schema fingerprint, running full startup checks: {e}")
+        conn.rollback()
+        return None
+    if not row or row[1] is None:
+        return None
+    return {"database": row[0], "fingerprint": row[1]}
+
+
+def _load_startup_cache() -> Dict[str, Any]:
+    """Read the startup cache file (empty dict if missing or unreadable)."""
+    try:
+        with open(STARTUP_CACHE_FILE, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def _save_startup_cache(fingerprint: Dict[str, str]) -> None:
+    """Record a successful validation for the fingerprinted database."""
+    cache = _load_startup_cache()
+    cache[fingerprint["database"]] = {
+        "fingerprint": fingerprint["fingerprint"],
+        "checked_at": time.time(),
+    }
+    try:
+        STARTUP_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = STARTUP_CACHE_FILE.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, STARTUP_CACHE_FILE)  # Atomic, so concurrent workers never read a partial file
+    except OSError as e:
+        print(f"Could not write startup check cache {STARTUP_CACHE_FILE}: {e}")
+
+
 def run_startup_checks() -> None:
     """
     Run critical startup checks.
@@ -20,11 +97,25 @@ def run_startup_checks() -> None:
     - Validates that required schemas, tables/views and columns exist.
     - Fails fast (raises RuntimeError) if validation has any errors.
     - Aborts application startup if any required tables/views are missing.
+    - Skips the full validation when the schema fingerprint matches the last
+      successful run (see STARTUP_CACHE_FILE), or entirely when
+      STIFLYT_SKIP_STARTUP_CHECKS=1 (e.g. in CI).
     """
+    if os.getenv("STIFLYT_SKIP_STARTUP_CHECKS", "") == "1":
+        print("Skipping database startup checks (STIFLYT_SKIP_STARTUP_CHECKS=1)")
+        return
+
     result = ValidationResult()
 
     try:
         with db_connection() as conn:
+            fingerprint = _fingerprint(conn, 'stiflyt')
+            if fingerprint is not None:
+                cached = _load_startup_cache().get(fingerprint["database"])
+                if cached and cached.get("fingerprint") == fingerprint["fingerprint"]:
+                    print("Database schema unchanged since last successful startup check, skipping validation")
+                    return
+
             # PostGIS must be present
             validate_postgis_extension(conn, result)
 
@@ -105,6 +196,9 @@ def run_startup_checks() -> None:
             message = "\n".join(summary_lines)
             raise RuntimeError(message)
 
+        if fingerprint is not None:
+            _save_startup_cache(fingerprint)
+
     except RuntimeError:
         # Re-raise RuntimeError (validation failures)
         raise
@@ -0,0 +1,34 @@
+"""Tests for the pure-Python WGS84 -> EPSG:25833 projection."""
+import pytest
+
+from services.projection import wgs84_to_utm33
+
+# (lon, lat) -> (easting, northing), from pyproj 3.7.2:
+# Transformer.from_crs(4326, 25833, always_xy=True).transform(lon, lat)
+REFERENCE_POINTS = [
+    ((15.0, 60.0), (500000.0000, 6651411.1902)),  # Central meridian
+    ((10.7522, 59.9139), (262560.4822, 6649443.5840)),  # Oslo
+    ((5.3221, 60.3913), (-32117.3906, 6734201.5915)),  # Bergen, west of the zone
+    ((18.9553, 69.6492), (653421.1876, 7731721.0829)),  # Tromsø
+    ((29.0, 70.5), (1017527.1396, 7881599.3969)),  # Far east of the zone
+    ((8.0, 58.0), (86688.3252, 6450163.2432)),
+    ((7.710764899, 61.809237843), (116400.0100, 6874478.0000)),
+]
+
+
+@pytest.mark.parametrize("lonlat, expected", REFERENCE_POINTS)
+def test_matches_pyproj(lonlat, expected):
+    easting, northing = wgs84_to_utm33(*lonlat)
+    assert easting == pytest.approx(expected[0], abs=1e-3)
+    assert northing == pytest.approx(expected[1], abs=1e-3)
+
+
+def test_origin():
+    assert wgs84_to_utm33(15.0, 0.0) == pytest.approx((500000.0, 0.0), abs=1e-6)
+
+
+def test_symmetric_about_central_meridian():
+    west = wgs84_to_utm33(15.0 - 4.5, 63.0)
+    east = wgs84_to_utm33(15.0 + 4.5, 63.0)
+    assert west[0] - 500000.0 == pytest.approx(500000.0 - east[0], abs=1e-6)
+    assert west[1] == pytest.approx(east[1], abs=1e-6)
@@ -0,0 +1,61 @@
+"""Tests for query-routes argument handling."""
+import pytest
+
+from cli.query_routes import build_parser, translate_legacy_argv
+
+# Old single-parser argv -> subcommand argv
+LEGACY_ARGV = [
+    (["--complete-route", "bre10"], ["complete-route", "bre10"]),
+    (["--complete-route=bre10", "--format", "json"], ["complete-route", "bre10", "--format", "json"]),
+    (["--format", "csv", "--complete-route", "bre10"], ["complete-route", "bre10", "--format", "csv"]),
+    (["--find-available", "--rutenummer-prefix", "bre"], ["find-available", "--rutenummer-prefix", "bre"]),
+    (
+        ["--rutenummer-prefix", "bre", "--find-available", "--api-url", "http://x"],
+        ["find-available", "--rutenummer-prefix", "bre", "--api-url", "http://x"],
+    ),
+    (
+        ["--test-ruteinfopunkt", "7.71", "61.80", "--test-radius", "200"],
+        ["test-point", "7.71", "61.80", "--test-radius", "200"],
+    ),
+    (["--rutenummer-prefix", "bre"], ["query", "--rutenummer-prefix", "bre"]),
+    (["--vedlikeholdsansvarlig", "DNT Oslo"], ["query", "--vedlikeholdsansvarlig", "DNT Oslo"]),
+]
+
+# Already in subcommand form (or top-level help): passed through unchanged
+CURRENT_ARGV = [
+    [],
+    ["-h"],
+    ["--help"],
+    ["query", "--rutenummer-prefix", "bre"],
+    ["complete-route", "bre10"],
+    ["find-available", "--rutenummer-prefix", "bre"],
+    ["test-point", "7.71", "61.80"],
+]
+
+
+@pytest.mark.parametrize("argv, expected", LEGACY_ARGV)
+def test_translate_legacy_argv(argv, expected):
+    assert translate_legacy_argv(argv) == expected
+
+
+@pytest.mark.parametrize("argv", CURRENT_ARGV)
+def test_translate_leaves_subcommands_unchanged(argv):
+    assert translate_legacy_argv(argv) == argv
+
+
+def test_translate_does_not_modify_input():
+    argv = ["--complete-route", "bre10"]
+    translate_legacy_argv(argv)
+    assert argv == ["--complete-route", "bre10"]
+
+
+@pytest.mark.parametrize("argv, cmd", [
+    (["--complete-route", "bre10", "--api-url", "http://x", "--timeout", "5"], "complete-route"),
+    (["--find-available", "--rutenummer-prefix", "bre", "--api-url", "http://x", "--timeout", "5"], "find-available"),
+    (["--find-available", "--rutenummer-prefix", "bre", "--format", "csv"], "find-available"),
+    (["--test-ruteinfopunkt", "7.71", "61.80", "--format", "csv", "--api-url", "http://x"], "test-point"),
+    (["--rutenummer-prefix", "bre", "--format", "ndjson", "--all"], "query"),
+])
+def test_legacy_argv_parses(argv, cmd):
+    args = build_parser().parse_args(translate_legacy_argv(argv))
+    assert args.cmd == cmd